@@ -0,0 +1,149 @@
+"""Import-time report for the app entry points
+
+Runs the imports of each target in a fresh interpreter under
+``python -X importtime`` and reports the median cumulative import time and
+the heaviest modules it pulls in. Targets are module names (``startive_core``)
+or script paths (``streamlit-app.py``), for which only the module-level
+import statements are executed, so nothing is rendered:
+
+    python benchmarks/import_time.py app.py streamlit-app.py --output before.json
+    python benchmarks/import_time.py app.py streamlit-app.py --output after.json
+    python benchmarks/import_time.py compare before.json after.json
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from startive_bench import version_info  # noqa: E402
+
+DEFAULT_TARGETS = ['app.py', 'streamlit-app.py', 'startive_core', 'ml_pipeline']
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def import_code(target):
+    """Python source that performs the imports of ``target``"""
+    if not target.endswith('.py'):
+        return f"import {target}"
+    with open(os.path.join(REPO_ROOT, target)) as fh:
+        tree = ast.parse(fh.read(), filename=target)
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return '\n'.join(ast.unparse(node) for node in imports) or 'pass'
+
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us, depth) for every line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def run_once(code):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def measure(target, repeat=5, startup=()):
+    """Median total and per-module cumulative import time (ms) over ``repeat`` runs"""
+    code = import_code(target)
+    # A module target is one top-level import, so break it down by what it imports
+    listed_depth = 0 if target.endswith('.py') else 1
+    totals, per_module = [], {}
+    for _ in range(repeat):
+        rows = [(m, cum, depth) for m, _, cum, depth in run_once(code) if m not in startup]
+        totals.append(sum(cum for _, cum, depth in rows if depth == 0) / 1000)
+        for module, cumulative, depth in rows:
+            if depth == listed_depth:
+                per_module.setdefault(module, []).append(cumulative / 1000)
+    modules = sorted(
+        ({'module': m, 'cumulative_ms': float(np.median(v))} for m, v in per_module.items()),
+        key=lambda row: row['cumulative_ms'], reverse=True,
+    )
+    return {
+        'target': target,
+        'total_ms': float(np.median(totals)),
+        'min_ms': float(np.min(totals)),
+        'modules': modules,
+    }
+
+
+def interpreter_startup_modules():
+    """Modules the interpreter imports before any target code runs"""
+    return {m for m, _, _, _ in run_once('pass')}
+
+
+def compare(baseline_path, candidate_path):
+    """Print the change in median import time per target"""
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    with open(candidate_path) as fh:
+        candidate = json.load(fh)
+    base = {r['target']: r for r in baseline['results']}
+    print(f"{'target':<24} {'before ms':>10} {'after ms':>10} {'change':>9}")
+    for r in candidate['results']:
+        b = base.get(r['target'])
+        if b is None:
+            continue
+        change = (r['total_ms'] / b['total_ms'] - 1) * 100 if b['total_ms'] else 0.0
+        print(f"{r['target']:<24} {b['total_ms']:>10.1f} {r['total_ms']:>10.1f} {change:>+8.1f}%")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'compare':
+        parser = argparse.ArgumentParser(description='Compare two import-time reports')
+        parser.add_argument('baseline')
+        parser.add_argument('candidate')
+        args = parser.parse_args(argv[1:])
+        compare(args.baseline, args.candidate)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('targets', nargs='*', default=DEFAULT_TARGETS)
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per target')
+    parser.add_argument('--top', type=int, default=10, help='Heaviest imports to list per target')
+    parser.add_argument('--output', help='Write JSON results here')
+    args = parser.parse_args(argv)
+
+    startup = interpreter_startup_modules()
+    results = []
+    for target in args.targets:
+        result = measure(target, args.repeat, startup)
+        results.append(result)
+        print(f"{target:<24} {result['total_ms']:>9.1f} ms (min {result['min_ms']:.1f} ms)")
+        for row in result['modules'][:args.top]:
+            print(f"    {row['cumulative_ms']:>9.1f} ms  {row['module']}")
+
+    if args.output:
+        report = {
+            'benchmark': 'import_time',
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'version': version_info(),
+            'config': {'targets': args.targets, 'repeat': args.repeat},
+            'results': results,
+        }
+        with open(args.output, 'w') as fh:
+            fh.write(json.dumps(report, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""Scaling benchmark for the ML analysis pipeline
+
+Generates synthetic bank marketing datasets of increasing rows, extra columns
+and category cardinality, then runs the same pipeline functions the
+streamlit-app.py page uses (load, profile, preprocess, split, fit each
+classifier, evaluate, permutation importance, charts) and records wall time
+and tracemalloc peak memory per stage:
+
+    python benchmarks/ml_pipeline_bench.py --rows 1000 10000 100000 --cardinality 5 50 --output before.json
+    python benchmarks/ml_pipeline_bench.py ... --output after.json
+    python benchmarks/ml_pipeline_bench.py compare before.json after.json
+
+Models are trained and evaluated through ml_pipeline.train_model and
+evaluate_models, and numeric charts aggregate the same row sample, exactly
+as on the page. tracemalloc slows allocation-heavy stages down; pass
+--no-memory for clean timings. Work done in joblib worker processes is timed
+but not counted in the peak memory, so importance runs with --n-jobs 1 by
+default.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ml_charts import (  # noqa: E402
+    box_figure,
+    box_stats,
+    category_counts,
+    category_histogram_figure,
+    histogram_counts,
+    numeric_histogram_figure,
+)
+from ml_estimators import DEFAULT_TIME_BUDGETS, MODELS  # noqa: E402
+from ml_exploration import DEFAULT_PLOT_SAMPLE_SIZE, profile_frame, sample_for_plots  # noqa: E402
+from ml_importance import feature_groups, permutation_importance  # noqa: E402
+from ml_metrics import confusion_matrix_figure, curves_figure  # noqa: E402
+from ml_pipeline import evaluate_models, load_data, preprocess_data, split_features, train_model  # noqa: E402
+from ml_sample_data import make_bank_data  # noqa: E402
+from startive_bench import version_info  # noqa: E402
+
+# Models ticked by default on the app page
+DEFAULT_MODELS = ['Logistic Regression', 'Decision Tree', 'Random Forest', 'Gradient Boosting']
+TARGET = 'deposit'
+
+
+class StageRecorder:
+    """Collects wall time and peak traced memory for each named stage"""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, **extra):
+        if self.memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            seconds = time.perf_counter() - start
+            row = {'stage': name, 'seconds': seconds}
+            if self.memory:
+                row['peak_mb'] = (tracemalloc.get_traced_memory()[1] - base) / 1e6
+            row.update(extra)
+            self.stages.append(row)
+
+
+def run_pipeline(csv_path, models, time_budgets, recorder, n_jobs=1, test_size=0.2, random_state=42):
+    """Drive the app's pipeline on one CSV file, one recorder stage per step"""
+    with recorder.stage('load_data'):
+        df = load_data(csv_path)
+
+    with recorder.stage('profile'):
+        stats = profile_frame(df)
+
+    preprocess_options = {'one_hot': True, 'drop_first': True}
+    with recorder.stage('preprocess_data'):
+        df_processed, target_encoded = preprocess_data(df, TARGET, drop_first=preprocess_options['drop_first'])
+
+    with recorder.stage('split') as info:
+        X, y = split_features(df_processed, TARGET, target_encoded)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size, random_state=random_state
+        )
+        info['features'] = X.shape[1]
+
+    fitted = {}
+    for model_name in models:
+        with recorder.stage(f'fit.{model_name}') as info:
+            entry = train_model(model_name, df, TARGET, target_encoded, X_train, y_train, preprocess_options,
+                                random_state, time_budgets.get(model_name))
+            fit_info = entry['fit_info']
+            info.update(engine=fit_info['engine'], iterations=fit_info['iterations'],
+                        stopped_by=fit_info['stopped_by'])
+        fitted[model_name] = entry['model']
+        preprocessor = entry['preprocessor']
+
+    with recorder.stage('evaluate') as info:
+        results = evaluate_models(fitted, X_test, y_test, preprocessor.target_classes)
+        info['accuracy'] = dict(zip(results['accuracy']['Model'], results['accuracy']['Accuracy (%)']))
+
+    groups = feature_groups(list(X.columns), preprocessor.categories)
+    for model_name, model in fitted.items():
+        with recorder.stage(f'importance.{model_name}'):
+            permutation_importance(model, X_test, y_test, groups, random_state=random_state, n_jobs=n_jobs)
+
+    # Figures are serialized because the JSON payload is what Streamlit ships to the browser
+    figures = {
+        'chart.histogram': lambda: category_histogram_figure(category_counts(stats.value_counts('job')), 'job'),
+        'chart.box': lambda: box_figure(box_stats(sample_for_plots(df['balance'], DEFAULT_PLOT_SAMPLE_SIZE)),
+                                        'balance'),
+        'chart.numeric_histogram': lambda: numeric_histogram_figure(
+            *histogram_counts(sample_for_plots(df['balance'], DEFAULT_PLOT_SAMPLE_SIZE)), 'balance'),
+        'chart.confusion_matrices': lambda: confusion_matrix_figure(
+            results['model_names'], results['labels'], results['confusion_matrices']),
+        'chart.curves': lambda: curves_figure(results['curves']),
+    }
+    for name, build in figures.items():
+        if name == 'chart.curves' and results['curves'] is None:
+            continue
+        with recorder.stage(name) as info:
+            info['payload_kb'] = len(build().to_json()) / 1024
+
+
+def dataset_grid(args):
+    for rows, numeric, categorical, cardinality in itertools.product(
+        args.rows, args.numeric, args.categorical, args.cardinality
+    ):
+        yield {'rows': rows, 'extra_numeric': numeric, 'extra_categorical': categorical, 'cardinality': cardinality}
+
+
+def dataset_label(config):
+    return (f"{config['rows']}r+{config['extra_numeric']}n+{config['extra_categorical']}c"
+            f"/k{config['cardinality']}")
+
+
+def run_benchmark(args):
+    work_dir = tempfile.mkdtemp(prefix='ml-bench-')
+    time_budgets = dict(DEFAULT_TIME_BUDGETS)
+    if args.time_budget is not None:
+        time_budgets = {name: args.time_budget for name in time_budgets}
+    if args.memory:
+        tracemalloc.start()
+
+    results = []
+    for config in dataset_grid(args):
+        label = dataset_label(config)
+        df = make_bank_data(
+            config['rows'], config['extra_numeric'], config['extra_categorical'],
+            config['cardinality'], seed=args.seed,
+        )
+        csv_path = os.path.join(work_dir, 'data.csv')
+        df.to_csv(csv_path, index=False)
+        file_mb = os.path.getsize(csv_path) / 1e6
+        del df
+
+        recorder = StageRecorder(memory=args.memory)
+        start = time.perf_counter()
+        run_pipeline(csv_path, args.models, time_budgets, recorder, n_jobs=args.n_jobs, random_state=args.seed)
+        total = time.perf_counter() - start
+        for row in recorder.stages:
+            results.append({'dataset': label, **config, **row})
+        print(f"{label:<24} {file_mb:>8.1f} MB csv  {total:>8.2f}s total", file=sys.stderr)
+        os.remove(csv_path)
+
+    if args.memory:
+        tracemalloc.stop()
+    return {
+        'benchmark': 'ml_pipeline',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'version': version_info(),
+        'config': {
+            'rows': args.rows,
+            'extra_numeric': args.numeric,
+            'extra_categorical': args.categorical,
+            'cardinality': args.cardinality,
+            'models': args.models,
+            'time_budgets': time_budgets,
+            'n_jobs': args.n_jobs,
+            'memory': args.memory,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+
+
+def scaling_table(results, value='seconds'):
+    """Stages as rows, datasets as columns, in the order they were run"""
+    frame = pd.DataFrame(results)
+    table = frame.pivot(index='stage', columns='dataset', values=value)
+    table = table.reindex(index=frame['stage'].drop_duplicates(), columns=frame['dataset'].drop_duplicates())
+    table.loc['total'] = table.sum()
+    return table
+
+
+def compare(baseline_path, candidate_path):
+    """Print per-stage time changes between two result files"""
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    with open(candidate_path) as fh:
+        candidate = json.load(fh)
+    base = {(r['dataset'], r['stage']): r for r in baseline['results']}
+    print(f"{'dataset':<24} {'stage':<32} {'seconds':>20}")
+    for r in candidate['results']:
+        b = base.get((r['dataset'], r['stage']))
+        if b is None:
+            continue
+        change = (r['seconds'] / b['seconds'] - 1) * 100 if b['seconds'] else 0.0
+        print(f"{r['dataset']:<24} {r['stage']:<32} {r['seconds']:>10.3f} ({change:+6.1f}%)")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'compare':
+        parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+        parser.add_argument('baseline')
+        parser.add_argument('candidate')
+        args = parser.parse_args(argv[1:])
+        compare(args.baseline, args.candidate)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10_000, 100_000])
+    parser.add_argument('--numeric', type=int, nargs='+', default=[0], help='Extra numeric columns')
+    parser.add_argument('--categorical', type=int, nargs='+', default=[0], help='Extra categorical columns')
+    parser.add_argument('--cardinality', type=int, nargs='+', default=[5], help='Levels per categorical column')
+    parser.add_argument('--models', nargs='+', default=DEFAULT_MODELS, choices=list(MODELS))
+    parser.add_argument('--time-budget', type=float, help='Override the per-model time budget (seconds)')
+    parser.add_argument('--n-jobs', type=int, default=1)
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='Skip tracemalloc')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write JSON results here')
+    parser.add_argument('--csv', help='Write the per-stage results as CSV here')
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args)
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.3f}'.format):
+        print("\nSeconds per stage")
+        print(scaling_table(report['results']))
+        if args.memory:
+            print("\nPeak traced memory per stage (MB)")
+            print(scaling_table(report['results'], 'peak_mb').drop('total'))
+    if args.output:
+        with open(args.output, 'w') as fh:
+            fh.write(json.dumps(report, indent=2, default=float) + '\n')
+    if args.csv:
+        pd.DataFrame(report['results']).to_csv(args.csv, index=False)
+
+
+if __name__ == '__main__':
+    main()
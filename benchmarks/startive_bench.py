@@ -0,0 +1,410 @@
+"""Synthetic-load benchmark for the Startive data layer
+
+Seeds a fresh SQLite database with a vectorized generator, then measures
+throughput and latency percentiles of the startive_core hot paths single-threaded
+and with concurrent threads. Results are written as JSON so runs from
+different versions can be compared:
+
+    python benchmarks/startive_bench.py --users 1000 --transactions 200000 --threads 1 4 8 --output before.json
+    python benchmarks/startive_bench.py ... --output after.json
+    python benchmarks/startive_bench.py compare before.json after.json
+
+Pass --shards N to spread the per-user tables over N files as STARTIVE_SHARDS does,
+and --processes to measure writers that don't share a GIL.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import savings_series  # noqa: E402
+import spending_stream  # noqa: E402
+import startive_export  # noqa: E402
+
+CATEGORIES = ["Groceries", "Dining", "Entertainment", "Utilities", "Rent", "Transportation", "Shopping", "Other"]
+RISK_LEVELS = ["conservative", "moderate", "aggressive"]
+ALLOCATIONS = ["high-yield savings", "ETF", "crypto"]
+CHAT_QUESTIONS = [
+    "How much can I save this month?",
+    "What investment strategy would you recommend?",
+    "How am I doing on my goals?",
+]
+BENCH_PASSWORD = "benchmark-password"
+
+
+def load_core(db_path, shards=1):
+    """Import the Startive data layer against ``db_path``, split over ``shards`` files"""
+    import startive_core
+    startive_core.DB_PATH = db_path
+    startive_core.SHARD_COUNT = shards
+    return startive_core
+
+
+def seed_database(core, n_users, n_transactions, goals_per_user, history_days, seed=0):
+    """Bulk-load users, then each shard's transactions, round-up savings (and their daily rollup) and goals
+
+    Spending analytics state is backfilled from the seeded transactions.
+    """
+    rng = np.random.default_rng(seed)
+    core.init_db()
+    conn = sqlite3.connect(core.DB_PATH)
+    c = conn.cursor()
+
+    password_hash = core.hash_password(BENCH_PASSWORD)
+    risks = rng.choice(RISK_LEVELS, n_users)
+    c.executemany(
+        "INSERT INTO users (id, username, email, password_hash, risk_preference) VALUES (?, ?, ?, ?, ?)",
+        ((i, f"user{i}", f"user{i}@example.com", password_hash, str(risks[i - 1])) for i in range(1, n_users + 1)),
+    )
+    conn.commit()
+    conn.close()
+
+    user_ids = rng.integers(1, n_users + 1, n_transactions)
+    amounts = np.round(rng.lognormal(mean=3.0, sigma=1.0, size=n_transactions), 2)
+    fractions = np.round(amounts - np.floor(amounts), 2)
+    roundups = np.where(fractions > 0, np.round(1 - fractions, 2), 0.0)
+    categories = rng.choice(CATEGORIES, n_transactions)
+    start = datetime.now() - timedelta(days=history_days)
+    offsets = np.sort(rng.integers(0, history_days * 86400, n_transactions))
+    dates = np.array([(start + timedelta(seconds=int(s))).strftime('%Y-%m-%d %H:%M:%S') for s in offsets])
+    allocations = rng.choice(ALLOCATIONS, n_transactions, p=[0.5, 0.4, 0.1])
+
+    n_goals = n_users * goals_per_user
+    goal_users = np.repeat(np.arange(1, n_users + 1), goals_per_user)
+    targets = np.round(rng.uniform(100, 10000, n_goals), 2)
+    current = np.round(targets * rng.uniform(0, 1, n_goals), 2)
+    goal_names = np.array([f"Goal {i}" for i in range(n_goals)])
+
+    shard_of_user = np.array([core.shard_index(user_id) for user_id in range(n_users + 1)])
+    for index, path in enumerate(core.shard_paths()):
+        rows = shard_of_user[user_ids] == index
+        conn = sqlite3.connect(path)
+        c = conn.cursor()
+        c.executemany(
+            "INSERT INTO transactions (user_id, amount, category, description, transaction_date, roundup_amount) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            zip(user_ids[rows].tolist(), amounts[rows].tolist(), categories[rows].tolist(),
+                categories[rows].tolist(), dates[rows].tolist(), roundups[rows].tolist()),
+        )
+
+        saved = rows & (roundups > 0)
+        c.executemany(
+            "INSERT INTO savings (user_id, amount, source, saving_date, allocation_type) VALUES (?, ?, 'roundup', ?, ?)",
+            zip(user_ids[saved].tolist(), roundups[saved].tolist(), dates[saved].tolist(), allocations[saved].tolist()),
+        )
+
+        goal_rows = shard_of_user[goal_users] == index
+        c.executemany(
+            "INSERT INTO goals (user_id, name, target_amount, current_amount) VALUES (?, ?, ?, ?)",
+            zip(goal_users[goal_rows].tolist(), goal_names[goal_rows].tolist(),
+                targets[goal_rows].tolist(), current[goal_rows].tolist()),
+        )
+
+        core.rebuild_savings_rollup(c)
+        conn.commit()
+        conn.close()
+        spending_stream.backfill(path)
+
+
+def make_operations(core, n_users, seed=0):
+    """Benchmark operations; each takes a per-call RNG so threads don't share state"""
+    def random_user(rng):
+        return int(rng.integers(1, n_users + 1))
+
+    def init_db(rng):
+        # What every Streamlit rerun paid before schema setup was cached per process
+        core.init_db()
+
+    def add_transaction(rng):
+        amount = round(float(rng.lognormal(3.0, 1.0)), 2)
+        core.add_transaction(random_user(rng), amount, str(rng.choice(CATEGORIES)), "benchmark")
+
+    def process_outbox(rng):
+        # One worker batch; add_transaction runs first and leaves its round-ups queued
+        core.process_outbox()
+
+    def authenticate_user(rng):
+        user = core.authenticate_user(f"user{random_user(rng)}@example.com", BENCH_PASSWORD)
+        assert user is not None
+
+    def dashboard_reads(rng):
+        # Same helper calls the Dashboard page makes on every rerun
+        user_id = random_user(rng)
+        core.get_total_savings(user_id)
+        core.get_savings_by_date(user_id)
+        core.get_savings_opportunities(user_id)
+        core.get_transactions(user_id)
+        core.get_goals(user_id)
+
+    transactions_by_user = {}
+
+    def analyze_spending(rng):
+        user_id = random_user(rng) % 50 + 1
+        if user_id not in transactions_by_user:
+            transactions_by_user[user_id] = core.get_transactions(user_id, limit=100)
+        core.analyze_spending(transactions_by_user[user_id])
+
+    def savings_charts(rng):
+        # What a Dashboard or Savings chart costs on a cache miss, over the whole history
+        df = savings_series.daily_series(core.get_savings_by_date(random_user(rng)))
+        savings_series.growth_points(df)
+        savings_series.period_totals(df)
+
+    def savings_opportunities(rng):
+        core.get_savings_opportunities(random_user(rng))
+
+    def transaction_history(rng):
+        # The on-demand full history: archive blocks plus the hot rows
+        core.get_transaction_history(random_user(rng))
+
+    def export_csv(rng):
+        # A user's whole transaction history streamed to CSV, as the Profile download builds it
+        startive_export.export_bytes(random_user(rng), 'transactions', 'csv')
+
+    def export_parquet(rng):
+        startive_export.export_bytes(random_user(rng), 'transactions', 'parquet')
+
+    def ai_chatbot_response(rng):
+        core.ai_chatbot_response(CHAT_QUESTIONS[int(rng.integers(len(CHAT_QUESTIONS)))], random_user(rng))
+
+    return {
+        'init_db': init_db,
+        'add_transaction': add_transaction,
+        'process_outbox': process_outbox,
+        'authenticate_user': authenticate_user,
+        'dashboard_reads': dashboard_reads,
+        'analyze_spending': analyze_spending,
+        'transaction_history': transaction_history,
+        'savings_opportunities': savings_opportunities,
+        'savings_charts': savings_charts,
+        'export_csv': export_csv,
+        'export_parquet': export_parquet,
+        'ai_chatbot_response': ai_chatbot_response,
+    }
+
+
+def call_operation(op, count, seed):
+    """Call ``op`` ``count`` times; returns (latencies in seconds, error count)"""
+    rng = np.random.default_rng(seed)
+    latencies, errors = [], 0
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            op(rng)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def process_worker(db_path, shards, n_users, name, count, seed):
+    """One writer process: its own interpreter and connections, so no GIL or lock is shared"""
+    core = load_core(db_path, shards)
+    return call_operation(make_operations(core, n_users, seed)[name], count, seed)
+
+
+def split_ops(n_ops, workers):
+    return [n_ops // workers + (1 if i < n_ops % workers else 0) for i in range(workers)]
+
+
+def run_operation(op, n_ops, threads, seed=0):
+    """Run ``n_ops`` calls of ``op`` spread across ``threads`` threads"""
+    counts = split_ops(n_ops, threads)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(call_operation, [op] * threads, counts, [seed + i for i in range(threads)]))
+    wall = time.perf_counter() - start
+    return summarize(results, n_ops, wall, threads=threads)
+
+
+def run_operation_processes(core, n_users, name, n_ops, processes, seed=0):
+    """Run ``n_ops`` calls of operation ``name`` spread across ``processes`` processes
+
+    Wall time starts once every process has imported the data layer, so
+    interpreter start-up is not counted.
+    """
+    counts = split_ops(n_ops, processes)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # Warm every worker up with a no-op call first
+        list(pool.map(process_worker, [core.DB_PATH] * processes, [core.SHARD_COUNT] * processes,
+                      [n_users] * processes, ['init_db'] * processes, [1] * processes, range(processes)))
+        start = time.perf_counter()
+        results = list(pool.map(process_worker, [core.DB_PATH] * processes, [core.SHARD_COUNT] * processes,
+                                [n_users] * processes, [name] * processes, counts,
+                                [seed + i for i in range(processes)]))
+        wall = time.perf_counter() - start
+    return summarize(results, n_ops, wall, threads=1, processes=processes)
+
+
+def summarize(results, n_ops, wall, threads=1, processes=1):
+    latencies = np.concatenate([np.array(lat) for lat, _ in results]) * 1000
+    errors = sum(err for _, err in results)
+    return {
+        'threads': threads,
+        'processes': processes,
+        'ops': n_ops,
+        'errors': errors,
+        'seconds': wall,
+        'throughput_ops_s': n_ops / wall if wall else float('inf'),
+        'mean_ms': float(latencies.mean()),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+    }
+
+
+def version_info():
+    try:
+        commit = subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmark(args):
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='startive-bench-'), 'startive.db')
+    core = load_core(db_path, args.shards)
+    # Seeding needs empty files; never delete an existing database (say, the app's own) unless asked to
+    paths = {db_path, *core.shard_paths()}
+    existing = sorted(path for path in paths | {core.archive_path(path) for path in paths} if os.path.exists(path))
+    if existing and not args.overwrite:
+        raise SystemExit(f"Refusing to overwrite {', '.join(existing)}; pass --overwrite or choose another --db")
+    for path in existing:
+        os.remove(path)
+
+    start = time.perf_counter()
+    seed_database(core, args.users, args.transactions, args.goals, args.days, seed=args.seed)
+    seed_seconds = time.perf_counter() - start
+    print(f"Seeded {args.users} users, {args.transactions} transactions, {args.users * args.goals} goals "
+          f"over {args.shards} shard(s) in {seed_seconds:.2f}s ({db_path})", file=sys.stderr)
+
+    if args.archive_after is not None:
+        import startive_archive
+        start = time.perf_counter()
+        moved = startive_archive.run(args.archive_after)
+        print(f"Archived {sum(sum(m.values()) for m in moved.values())} rows older than {args.archive_after} days "
+              f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    operations = make_operations(core, args.users, seed=args.seed)
+    selected = args.operations or list(operations)
+    results = []
+    for name in selected:
+        runs = [(threads, 1) for threads in args.threads] + [(1, processes) for processes in args.processes]
+        for threads, processes in runs:
+            if processes > 1:
+                result = run_operation_processes(core, args.users, name, args.ops, processes, seed=args.seed)
+            else:
+                result = run_operation(operations[name], args.ops, threads, seed=args.seed)
+            result['operation'] = name
+            results.append(result)
+            print(f"{name:<22} threads={threads:<3} processes={processes:<3} "
+                  f"{result['throughput_ops_s']:>9.1f} ops/s  "
+                  f"p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms p99={result['p99_ms']:.2f}ms "
+                  f"errors={result['errors']}", file=sys.stderr)
+
+    return {
+        'benchmark': 'startive',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'version': version_info(),
+        'config': {
+            'users': args.users,
+            'transactions': args.transactions,
+            'goals_per_user': args.goals,
+            'history_days': args.days,
+            'shards': args.shards,
+            'archive_after_days': args.archive_after,
+            'ops': args.ops,
+            'threads': args.threads,
+            'processes': args.processes,
+            'seed': args.seed,
+        },
+        'seed_seconds': seed_seconds,
+        'results': results,
+    }
+
+
+def compare(baseline_path, candidate_path):
+    """Print throughput and p95 changes between two result files"""
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    with open(candidate_path) as fh:
+        candidate = json.load(fh)
+    def run_key(r):
+        return r['operation'], r['threads'], r.get('processes', 1)
+
+    base = {run_key(r): r for r in baseline['results']}
+    print(f"{'operation':<22} {'threads':>7} {'procs':>5} {'ops/s':>18} {'p95 ms':>18}")
+    for r in candidate['results']:
+        b = base.get(run_key(r))
+        if b is None:
+            continue
+        tput = (r['throughput_ops_s'] / b['throughput_ops_s'] - 1) * 100
+        p95 = (r['p95_ms'] / b['p95_ms'] - 1) * 100 if b['p95_ms'] else 0.0
+        print(f"{r['operation']:<22} {r['threads']:>7} {r.get('processes', 1):>5} "
+              f"{r['throughput_ops_s']:>9.1f} ({tput:+6.1f}%) {r['p95_ms']:>8.2f} ({p95:+6.1f}%)")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'compare':
+        parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+        parser.add_argument('baseline')
+        parser.add_argument('candidate')
+        args = parser.parse_args(argv[1:])
+        compare(args.baseline, args.candidate)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', help='Database file to create (default: a temporary file)')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Delete an existing --db, its shards and archives before seeding')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--transactions', type=int, default=100_000)
+    parser.add_argument('--goals', type=int, default=3, help='Goals per user')
+    parser.add_argument('--days', type=int, default=730, help='Days of transaction history')
+    parser.add_argument('--shards', type=int, default=1, help='Per-user table shards (STARTIVE_SHARDS)')
+    parser.add_argument('--archive-after', type=int, metavar='DAYS',
+                        help='Run startive_archive.py with this horizon after seeding')
+    parser.add_argument('--ops', type=int, default=1000, help='Calls per operation and thread count')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--processes', type=int, nargs='+', default=[],
+                        help='Also run each operation across this many processes (threads share one GIL)')
+    parser.add_argument('--operations', nargs='+', help='Subset of operations to run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write JSON results here (default: stdout)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            fh.write(payload + '\n')
+    else:
+        print(payload)
+
+
+if __name__ == '__main__':
+    main()
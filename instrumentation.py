@@ -0,0 +1,154 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Number of recent samples per operation used for the rolling percentiles
+WINDOW_SIZE = int(os.environ.get('PERF_WINDOW_SIZE', '1000'))
+# Optional export target: every sample is appended to PERF_EXPORT_PATH as JSON lines,
+# or the summary is rewritten there in Prometheus text format when PERF_EXPORT_FORMAT=prometheus
+EXPORT_PATH = os.environ.get('PERF_EXPORT_PATH')
+EXPORT_FORMAT = os.environ.get('PERF_EXPORT_FORMAT', 'jsonl')
+# JSON-lines samples are buffered and appended by flush(), or as soon as this many are waiting,
+# so a timed call never pays for a file open
+JSONL_BATCH_SIZE = 1000
+
+PERCENTILES = (50, 90, 95, 99)
+
+_lock = threading.Lock()
+_samples = {}
+_totals = {}
+_pending = []
+# Held across a whole batch write, so batches land in the order they were taken
+_export_lock = threading.Lock()
+
+
+def panel_enabled():
+    """Whether the in-app Performance panel should be offered"""
+    return os.environ.get('PERF_PANEL', '').lower() in ('1', 'true', 'yes')
+
+
+def record(name, seconds):
+    """Add one timing sample for ``name``"""
+    with _lock:
+        if name not in _samples:
+            _samples[name] = deque(maxlen=WINDOW_SIZE)
+            _totals[name] = [0, 0.0]
+        _samples[name].append(seconds)
+        _totals[name][0] += 1
+        _totals[name][1] += seconds
+        if EXPORT_PATH and EXPORT_FORMAT == 'jsonl':
+            _pending.append((time.time(), name, seconds))
+            batch_full = len(_pending) >= JSONL_BATCH_SIZE
+        else:
+            batch_full = False
+    if batch_full:
+        write_jsonl(EXPORT_PATH)
+
+
+@contextmanager
+def timer(name):
+    """Time the enclosed block under ``name``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name=None):
+    """Decorator that times every call of the wrapped function"""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summary():
+    """Rolling percentiles (milliseconds) per operation, slowest p95 first"""
+    with _lock:
+        snapshot = {name: (np.array(s), *_totals[name]) for name, s in _samples.items()}
+    rows = []
+    for name, (window, count, total) in snapshot.items():
+        row = {'operation': name, 'calls': count, 'total_s': total, 'mean_ms': total / count * 1000}
+        for p, value in zip(PERCENTILES, np.percentile(window, PERCENTILES)):
+            row[f"p{p}_ms"] = value * 1000
+        row['max_ms'] = window.max() * 1000
+        rows.append(row)
+    columns = ['operation', 'calls', 'total_s', 'mean_ms'] + [f"p{p}_ms" for p in PERCENTILES] + ['max_ms']
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(rows, columns=columns).sort_values('p95_ms', ascending=False).reset_index(drop=True)
+
+
+def reset():
+    """Forget every sample, including those not yet exported"""
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+        _pending.clear()
+
+
+def write_jsonl(path=None):
+    """Append the buffered samples to the JSON-lines export in one write"""
+    with _export_lock:
+        with _lock:
+            batch = _pending[:]
+            _pending.clear()
+        if not batch:
+            return
+        pid = os.getpid()
+        lines = ''.join(
+            json.dumps({'ts': ts, 'operation': name, 'seconds': seconds, 'pid': pid}) + '\n'
+            for ts, name, seconds in batch
+        )
+        with open(path or EXPORT_PATH, 'a') as fh:
+            fh.write(lines)
+
+
+def prometheus_text():
+    """Current summary in Prometheus text exposition format"""
+    lines = [
+        '# HELP app_operation_seconds Rolling latency of instrumented operations.',
+        '# TYPE app_operation_seconds summary',
+    ]
+    for row in summary().to_dict('records'):
+        op = row['operation'].replace('\\', '\\\\').replace('"', '\\"')
+        for p in PERCENTILES:
+            lines.append(f'app_operation_seconds{{operation="{op}",quantile="{p / 100}"}} {row[f"p{p}_ms"] / 1000:.6f}')
+        lines.append(f'app_operation_seconds_sum{{operation="{op}"}} {row["total_s"]:.6f}')
+        lines.append(f'app_operation_seconds_count{{operation="{op}"}} {row["calls"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path=None):
+    """Rewrite the Prometheus text file atomically so scrapers never see a partial file"""
+    path = path or EXPORT_PATH
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as fh:
+        fh.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def flush():
+    """Write buffered JSON-lines samples or refresh the Prometheus file, whichever export is configured"""
+    if EXPORT_PATH and EXPORT_FORMAT == 'prometheus':
+        write_prometheus(EXPORT_PATH)
+    elif EXPORT_PATH:
+        write_jsonl(EXPORT_PATH)
+
+
+# Workers and batch jobs never reach a page's closing flush()
+atexit.register(flush)
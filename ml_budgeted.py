@@ -0,0 +1,24 @@
+# Imports scikit-learn at module level; ml_evaluation imports this module only when a search runs
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+
+from ml_estimators import fit_with_budget
+
+
+class BudgetedClassifier(ClassifierMixin, BaseEstimator):
+    """Classifier fitted through fit_with_budget, so search candidates keep the model's time budget
+
+    Search spaces address the wrapped estimator's parameters as ``estimator__<name>``.
+    """
+
+    def __init__(self, estimator, time_budget=None):
+        self.estimator = estimator
+        self.time_budget = time_budget
+
+    def fit(self, X, y):
+        self.estimator_ = clone(self.estimator)
+        self.fit_info_ = fit_with_budget(self.estimator_, X, y, self.time_budget)
+        self.classes_ = self.estimator_.classes_
+        return self
+
+    def predict(self, X):
+        return self.estimator_.predict(X)
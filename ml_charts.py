@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# Upper bounds that keep figure payloads constant regardless of row count
+MAX_CATEGORIES = 50
+DEFAULT_BINS = 50
+MAX_OUTLIERS = 500
+
+
+def category_counts(counts, max_categories=MAX_CATEGORIES):
+    """Fold category counts beyond the top ``max_categories`` into 'Other'"""
+    counts = counts.sort_values(ascending=False)
+    if counts.size > max_categories:
+        other = counts.iloc[max_categories - 1:].sum()
+        counts = counts.iloc[:max_categories - 1]
+        counts = pd.concat([counts, pd.Series({'Other': other})])
+    return counts
+
+
+def histogram_counts(values, bins=DEFAULT_BINS):
+    """Bin edges and counts for a numeric column"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return np.array([0]), np.array([0.0, 1.0])
+    counts, edges = np.histogram(values, bins=bins)
+    return counts, edges
+
+
+def box_stats(values, max_outliers=MAX_OUTLIERS, random_state=0):
+    """Quartiles, Tukey whiskers and a bounded sample of outliers for a numeric column"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    n_outliers = outliers.size
+    if n_outliers > max_outliers:
+        rng = np.random.default_rng(random_state)
+        outliers = rng.choice(outliers, size=max_outliers, replace=False)
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': inside.min(),
+        'upperfence': inside.max(),
+        'mean': values.mean(),
+        'outliers': outliers,
+        'n_outliers': n_outliers,
+    }
+
+
+def category_histogram_figure(counts, column):
+    """Bar chart drawn from precomputed category counts"""
+    import plotly.graph_objects as go
+    from plotly.colors import qualitative
+
+    colors = qualitative.Plotly
+    fig = go.Figure(go.Bar(
+        x=counts.index.astype(str),
+        y=counts.values,
+        marker_color=[colors[i % len(colors)] for i in range(counts.size)],
+    ))
+    fig.update_layout(title=f"{column} Distribution", xaxis_title=column, yaxis_title='count')
+    return fig
+
+
+def numeric_histogram_figure(counts, edges, column):
+    """Histogram drawn from precomputed bin counts"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+    ))
+    fig.update_layout(title=f"{column} Distribution", xaxis_title=column, yaxis_title='count', bargap=0)
+    return fig
+
+
+def box_figure(stats, column):
+    """Box plot drawn from precomputed box statistics"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    if stats is None:
+        fig.update_layout(title=f"{column} Distribution")
+        return fig
+    fig.add_trace(go.Box(
+        x=[column],
+        q1=[stats['q1']],
+        median=[stats['median']],
+        q3=[stats['q3']],
+        lowerfence=[stats['lowerfence']],
+        upperfence=[stats['upperfence']],
+        mean=[stats['mean']],
+        name=column,
+        boxpoints=False,
+    ))
+    if stats['outliers'].size:
+        fig.add_trace(go.Scatter(
+            x=[column] * stats['outliers'].size,
+            y=stats['outliers'],
+            mode='markers',
+            name='outliers',
+            marker={'size': 4},
+        ))
+    title = f"{column} Distribution"
+    if stats['n_outliers'] > stats['outliers'].size:
+        title += f" ({stats['outliers'].size:,} of {stats['n_outliers']:,} outliers shown)"
+    fig.update_layout(title=title, yaxis_title=column, showlegend=False)
+    return fig
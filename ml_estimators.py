@@ -0,0 +1,162 @@
+import importlib
+import time
+import warnings
+
+import numpy as np
+
+# Estimator class (imported on first use, so unselected models cost nothing at startup) and
+# hyperparameters for each model the app offers; together with the data and split settings
+# they form the registry key
+MODELS = {
+    'Logistic Regression': ('sklearn.linear_model.LogisticRegression', {'max_iter': 500}),
+    'Decision Tree': ('sklearn.tree.DecisionTreeClassifier', {}),
+    'Random Forest': ('sklearn.ensemble.RandomForestClassifier', {'n_estimators': 100}),
+    'Gradient Boosting': ('sklearn.ensemble.GradientBoostingClassifier', {
+        'validation_fraction': 0.1, 'n_iter_no_change': 10,
+    }),
+    'SVM': ('sklearn.svm.SVC', {'kernel': 'linear'}),
+    'Neural Network': ('sklearn.neural_network.MLPClassifier', {
+        'hidden_layer_sizes': (100, 100), 'max_iter': 300,
+        'early_stopping': True, 'validation_fraction': 0.1, 'n_iter_no_change': 10,
+    }),
+}
+
+# Default wall-clock budget (seconds) for the models that can run away on large data
+DEFAULT_TIME_BUDGETS = {
+    'Gradient Boosting': 120,
+    'SVM': 120,
+    'Neural Network': 120,
+}
+
+# Above these training-set sizes the exact estimator is swapped for a scalable equivalent
+LARGE_DATASET_ROWS = {
+    'Gradient Boosting': 10_000,
+    'SVM': 10_000,
+}
+
+# Estimators whose iteration limit is capped to what the time budget affords: (parameter, iterations
+# the cost probe runs). An SMO iteration of SVC is too cheap to time on its own, so it probes a
+# thousand; GradientBoostingClassifier is instead stopped by a per-stage monitor
+CAPPED_LIMIT_PARAMS = {
+    'HistGradientBoostingClassifier': ('max_iter', 1),
+    'MLPClassifier': ('max_iter', 1),
+    'SVC': ('max_iter', 1000),
+}
+
+
+def model_spec(model_name):
+    """Import the estimator class of ``model_name``; returns (estimator_cls, params)"""
+    path, params = MODELS[model_name]
+    module_name, class_name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name), params
+
+
+def build_estimator(model_name, estimator_cls, params, n_samples, random_state):
+    """Create the estimator to fit, switching to a scalable engine for large n
+
+    Returns (estimator, engine_name).
+    """
+    threshold = LARGE_DATASET_ROWS.get(model_name)
+    if threshold is not None and n_samples > threshold:
+        if estimator_cls.__name__ == 'GradientBoostingClassifier':
+            from sklearn.ensemble import HistGradientBoostingClassifier
+            estimator = HistGradientBoostingClassifier(
+                max_iter=params.get('n_estimators', 100),
+                learning_rate=params.get('learning_rate', 0.1),
+                early_stopping=True,
+                validation_fraction=params.get('validation_fraction', 0.1),
+                n_iter_no_change=params.get('n_iter_no_change', 10),
+                random_state=random_state,
+            )
+            return estimator, 'HistGradientBoostingClassifier'
+        if estimator_cls.__name__ == 'SVC' and params.get('kernel') == 'linear':
+            # Same linear decision function as SVC(kernel='linear'), but O(n) with liblinear
+            from sklearn.svm import LinearSVC
+            return LinearSVC(random_state=random_state), 'LinearSVC'
+    return estimator_cls(random_state=random_state, **params), estimator_cls.__name__
+
+
+def _fit_gradient_boosting(model, X, y, deadline):
+    """Fit a GradientBoostingClassifier, stopping after the stage that passes ``deadline``"""
+    out_of_time = []
+
+    def monitor(stage, estimator, local_vars):
+        if time.perf_counter() > deadline:
+            out_of_time.append(stage)
+            return True
+        return False
+
+    model.fit(X, y, monitor=monitor)
+    if out_of_time:
+        return model.n_estimators_, 'time budget'
+    if model.n_estimators_ < model.n_estimators:
+        return model.n_estimators_, 'early stopping'
+    return model.n_estimators_, 'iteration limit'
+
+
+def _fit_capped(model, X, y, time_budget, limit_param, probe_iterations=1):
+    """Fit once with the iteration limit lowered to what ``time_budget`` affords
+
+    The cost of an iteration is measured with a ``probe_iterations`` fit of a
+    clone, which also counts setup such as MLP initialization or histogram
+    binning, so the estimate errs towards fewer iterations. A negative limit
+    (SVC's default) means no limit.
+    """
+    from sklearn.base import clone
+    from sklearn.exceptions import ConvergenceWarning
+
+    configured = getattr(model, limit_param)
+    limit = configured if configured >= 0 else float('inf')
+    probe_start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        clone(model).set_params(**{limit_param: probe_iterations}).fit(X, y)
+    probe_seconds = time.perf_counter() - probe_start
+    per_iteration = probe_seconds / probe_iterations
+    cap = int(min(limit, max(probe_iterations, (time_budget - probe_seconds) / per_iteration)))
+
+    model.set_params(**{limit_param: cap})
+    try:
+        with warnings.catch_warnings():
+            if cap < limit:
+                # Running out of budget is reported as the stop reason, not as non-convergence
+                warnings.simplefilter('ignore', ConvergenceWarning)
+            model.fit(X, y)
+    finally:
+        model.set_params(**{limit_param: configured})
+    # SVC reports one count per one-vs-one problem, each bounded by the cap
+    iterations = int(max(np.atleast_1d(model.n_iter_)))
+    if iterations < cap:
+        return iterations, 'early stopping'
+    return iterations, 'time budget' if cap < limit else 'iteration limit'
+
+
+def fit_with_budget(model, X, y, time_budget=None):
+    """Fit ``model`` within ``time_budget`` seconds where the estimator allows it
+
+    Every model is fitted in a single call, so validation-based early stopping
+    behaves exactly as in an unbudgeted fit. Gradient boosting checks the
+    budget after each stage through its ``monitor`` hook; HistGradientBoosting,
+    MLP and SVC models have their iteration limit capped to what a short
+    probe fit says the budget affords. Other estimators are fitted and only timed.
+
+    Returns a dict describing the fit: seconds, iterations and stop reason.
+    """
+    start = time.perf_counter()
+    name = type(model).__name__
+
+    if time_budget and name == 'GradientBoostingClassifier':
+        iterations, stopped_by = _fit_gradient_boosting(model, X, y, start + time_budget)
+    elif time_budget and name in CAPPED_LIMIT_PARAMS:
+        iterations, stopped_by = _fit_capped(model, X, y, time_budget, *CAPPED_LIMIT_PARAMS[name])
+    else:
+        model.fit(X, y)
+        iterations = getattr(model, 'n_iter_', None)
+        if iterations is not None and not isinstance(iterations, int):
+            iterations = int(max(iterations))
+        stopped_by = 'completed'
+    return {
+        'seconds': time.perf_counter() - start,
+        'iterations': None if iterations is None else int(iterations),
+        'stopped_by': stopped_by,
+    }
@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+
+from ml_estimators import fit_with_budget
+
+# scikit-learn, scipy and joblib are imported inside the functions so the page loads without them
+
+
+def search_space(estimator_name):
+    """Parameter distributions for the estimator class actually being fitted, or None"""
+    from scipy.stats import loguniform, randint
+
+    spaces = {
+        'LogisticRegression': {'C': loguniform(1e-3, 1e2)},
+        'DecisionTreeClassifier': {
+            'max_depth': [None, 3, 5, 10, 20],
+            'min_samples_leaf': randint(1, 50),
+        },
+        'RandomForestClassifier': {
+            'n_estimators': randint(50, 300),
+            'max_depth': [None, 5, 10, 20],
+            'max_features': ['sqrt', 'log2', None],
+        },
+        'GradientBoostingClassifier': {
+            'learning_rate': loguniform(0.01, 0.3),
+            'max_depth': randint(2, 6),
+            'n_estimators': randint(50, 300),
+        },
+        'HistGradientBoostingClassifier': {
+            'learning_rate': loguniform(0.01, 0.3),
+            'max_leaf_nodes': randint(15, 63),
+        },
+        'SVC': {'C': loguniform(1e-2, 1e2)},
+        'LinearSVC': {'C': loguniform(1e-2, 1e2)},
+        'MLPClassifier': {
+            'alpha': loguniform(1e-5, 1e-1),
+            'learning_rate_init': loguniform(1e-4, 1e-2),
+        },
+    }
+    return spaces.get(estimator_name)
+
+
+def make_splitter(y, n_splits=5, random_state=42):
+    """Stratified k-fold when every class has enough members, plain k-fold otherwise"""
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    _, counts = np.unique(y, return_counts=True)
+    if counts.min() >= n_splits:
+        return StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+
+
+def make_folds(y, n_splits=5, random_state=42):
+    """Train/test row indices for every fold"""
+    y = np.asarray(y)
+    splitter = make_splitter(y, n_splits, random_state)
+    return [(train_idx, test_idx) for train_idx, test_idx in splitter.split(np.zeros(len(y)), y)]
+
+
+def prepare_folds(X, y, folds):
+    """Materialize every fold once as float arrays so all models reuse them"""
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    return [
+        {'X_train': X[train_idx], 'y_train': y[train_idx], 'X_test': X[test_idx], 'y_test': y[test_idx]}
+        for train_idx, test_idx in folds
+    ]
+
+
+def _fit_fold(model_name, estimator, fold_index, fold, time_budget=None):
+    from sklearn.base import clone
+    from sklearn.metrics import accuracy_score
+
+    start = time.perf_counter()
+    model = clone(estimator)
+    fit_with_budget(model, fold['X_train'], fold['y_train'], time_budget)
+    score = accuracy_score(fold['y_test'], model.predict(fold['X_test']))
+    return model_name, fold_index, score, time.perf_counter() - start
+
+
+def cross_validate_models(estimators, prepared_folds, n_jobs=-1, on_result=None, time_budgets=None):
+    """Score every (model, fold) pair in parallel across all cores
+
+    ``estimators`` maps model names to unfitted estimators; each fold is
+    fitted within the model's entry in ``time_budgets``, as in training.
+    ``on_result`` is called with (model_name, fold_index, accuracy, seconds)
+    as each fold finishes, in completion order. Returns {model_name: [accuracy per fold]}.
+    """
+    from joblib import Parallel, delayed
+
+    time_budgets = time_budgets or {}
+    scores = {name: [np.nan] * len(prepared_folds) for name in estimators}
+    tasks = (
+        delayed(_fit_fold)(name, estimator, i, fold, time_budgets.get(name))
+        for name, estimator in estimators.items()
+        for i, fold in enumerate(prepared_folds)
+    )
+    for name, i, score, seconds in Parallel(n_jobs=n_jobs, return_as='generator_unordered')(tasks):
+        scores[name][i] = score
+        if on_result is not None:
+            on_result(name, i, score, seconds)
+    return scores
+
+
+def search_hyperparameters(estimator, X, y, folds, strategy='randomized', n_iter=20,
+                           random_state=42, n_jobs=-1, time_budget=None):
+    """Randomized or successive-halving search over ``search_space``
+
+    Randomized search reuses the precomputed ``folds``. Successive halving
+    trains on growing subsamples, so it gets an equivalent splitter instead.
+    With a ``time_budget`` every candidate fit is bounded by it, through
+    BudgetedClassifier. Returns the fitted search object, or None if there
+    is no search space.
+    """
+    space = search_space(type(estimator).__name__)
+    if not space:
+        return None
+    if time_budget:
+        from ml_budgeted import BudgetedClassifier
+
+        estimator = BudgetedClassifier(estimator, time_budget)
+        space = {f'estimator__{name}': values for name, values in space.items()}
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV, RandomizedSearchCV
+
+    if strategy == 'halving':
+        search = HalvingRandomSearchCV(
+            estimator, space, n_candidates=n_iter, factor=3,
+            cv=make_splitter(y, len(folds), random_state),
+            scoring='accuracy', random_state=random_state, n_jobs=n_jobs,
+        )
+    else:
+        search = RandomizedSearchCV(
+            estimator, space, n_iter=n_iter, cv=folds,
+            scoring='accuracy', random_state=random_state, n_jobs=n_jobs,
+        )
+    search.fit(X, y)
+    return search
@@ -0,0 +1,202 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Default number of rows handled per streaming chunk and aggregated per numeric chart
+DEFAULT_CHUNK_SIZE = 250_000
+DEFAULT_PLOT_SAMPLE_SIZE = 50_000
+
+
+def file_fingerprint(file):
+    """Fingerprint an uploaded file (or path) by hashing its raw bytes"""
+    digest = hashlib.sha256()
+    if isinstance(file, str):
+        with open(file, 'rb') as fh:
+            for block in iter(lambda: fh.read(1 << 20), b''):
+                digest.update(block)
+    else:
+        digest.update(file.getvalue())
+    return digest.hexdigest()
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch with bounded memory
+
+    Level ``h`` holds items of weight ``2**h``. The top level may hold ``k``
+    items and each level below it two thirds as many as the one above (at
+    least 2). A level that outgrows its capacity is sorted and every other
+    item is promoted to the next level, so memory stays under ``3 * k`` plus
+    two items per level, however long the stream.
+    """
+
+    def __init__(self, k=2048, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+
+    def capacity(self, h):
+        return max(2, int(self.k * (2 / 3) ** (len(self.levels) - 1 - h)))
+
+    def size(self):
+        return sum(level.size for level in self.levels)
+
+    def _compress(self):
+        # Adding a level lowers every capacity below it, so those levels are checked again
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if level.size <= self.capacity(h):
+                h += 1
+                continue
+            level = np.sort(level)
+            # Keep an even number of items for promotion; the odd one stays
+            keep = level[:level.size % 2]
+            promoted = level[keep.size:][self.rng.integers(2)::2]
+            grown = h + 1 == len(self.levels)
+            if grown:
+                self.levels.append(np.empty(0))
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h = 0 if grown else h + 1
+
+    def quantiles(self, qs):
+        items = np.concatenate(self.levels)
+        if not items.size:
+            return [np.nan] * len(qs)
+        weights = np.concatenate([np.full(level.size, 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        cumulative = np.cumsum(weights) / weights.sum()
+        idx = np.searchsorted(cumulative, qs, side='left')
+        return items[np.clip(idx, 0, items.size - 1)].tolist()
+
+
+class ColumnStats:
+    """Running statistics for a single column, merged chunk by chunk"""
+
+    def __init__(self, name, numeric):
+        self.name = name
+        self.numeric = numeric
+        self.count = 0
+        self.nulls = 0
+        # Numeric: min/max and Chan's parallel mean/variance accumulators
+        self.min = np.inf
+        self.max = -np.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch() if numeric else None
+        # Categorical: exact value counts
+        self.value_counts = None if numeric else pd.Series(dtype='int64')
+
+    def update(self, series):
+        nulls = int(series.isna().sum())
+        self.nulls += nulls
+        if self.numeric:
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            n = values.size
+            if n:
+                chunk_mean = values.mean()
+                chunk_m2 = ((values - chunk_mean) ** 2).sum()
+                total = self.count + n
+                delta = chunk_mean - self.mean
+                self.mean += delta * n / total
+                self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+                self.count = total
+                self.min = min(self.min, values.min())
+                self.max = max(self.max, values.max())
+                self.sketch.update(values)
+        else:
+            self.count += len(series) - nulls
+            counts = series.value_counts()
+            self.value_counts = self.value_counts.add(counts, fill_value=0).astype('int64')
+
+    def summary(self):
+        row = {'count': self.count, 'missing': self.nulls}
+        if self.numeric:
+            has_values = self.count > 0
+            q25, q50, q75 = self.sketch.quantiles([0.25, 0.5, 0.75])
+            row.update({
+                'mean': self.mean if has_values else np.nan,
+                'std': np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan,
+                'min': self.min if has_values else np.nan,
+                '25%': q25,
+                '50%': q50,
+                '75%': q75,
+                'max': self.max if has_values else np.nan,
+            })
+        else:
+            row['unique'] = int(self.value_counts.size)
+            if self.value_counts.size:
+                row['top'] = self.value_counts.idxmax()
+                row['freq'] = int(self.value_counts.max())
+        return row
+
+
+class ExplorationStats:
+    """Streaming data-exploration statistics for a whole dataset"""
+
+    def __init__(self):
+        self.rows = 0
+        self.dtypes = None
+        self.columns = {}
+
+    def update(self, chunk):
+        if self.dtypes is None:
+            self.dtypes = chunk.dtypes
+            for col, dtype in chunk.dtypes.items():
+                numeric = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+                self.columns[col] = ColumnStats(col, numeric)
+        self.rows += len(chunk)
+        for col, stats in self.columns.items():
+            stats.update(chunk[col])
+
+    def missing(self):
+        """Null counts per column, equivalent to ``df.isnull().sum()``"""
+        return pd.Series({col: stats.nulls for col, stats in self.columns.items()}, dtype='int64')
+
+    def describe(self):
+        """Approximate ``df.describe(include='all').T`` from the streamed statistics"""
+        columns = ['count', 'unique', 'top', 'freq', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        table = pd.DataFrame.from_dict(
+            {col: stats.summary() for col, stats in self.columns.items()}, orient='index'
+        )
+        return table.reindex(columns=[c for c in columns if c in table.columns])
+
+    def value_counts(self, column):
+        """Exact category counts for a categorical column"""
+        return self.columns[column].value_counts.sort_values(ascending=False)
+
+
+def iter_chunks(df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield row slices of a DataFrame without copying"""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def profile_chunks(chunks):
+    """Compute exploration statistics in one pass over an iterable of DataFrames"""
+    stats = ExplorationStats()
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def profile_frame(df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compute exploration statistics for an in-memory DataFrame"""
+    return profile_chunks(iter_chunks(df, chunk_size))
+
+
+def sample_for_plots(data, sample_size=DEFAULT_PLOT_SAMPLE_SIZE, random_state=0):
+    """Return at most ``sample_size`` rows of a DataFrame or Series for plotting"""
+    if sample_size and len(data) > sample_size:
+        return data.sample(n=sample_size, random_state=random_state)
+    return data
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# Permutation importance is estimated on at most this many test rows
+MAX_IMPORTANCE_ROWS = 10_000
+
+
+def feature_groups(feature_columns, categories=None):
+    """Map each original feature to the model columns derived from it
+
+    One-hot dummy columns (``{col}_{value}``) are grouped back under their
+    source column using the categories frozen at training time; every other
+    column is its own group.
+    """
+    column_set = set(feature_columns)
+    groups = {}
+    claimed = set()
+    for col, cats in (categories or {}).items():
+        dummies = [f"{col}_{cat}" for cat in cats if f"{col}_{cat}" in column_set]
+        if dummies:
+            groups[col] = [feature_columns.index(d) for d in dummies]
+            claimed.update(dummies)
+    for i, col in enumerate(feature_columns):
+        if col not in claimed:
+            groups[col] = [i]
+    return groups
+
+
+def _group_importance(model, X, y, baseline, name, indices, n_repeats, seed):
+    from sklearn.metrics import accuracy_score
+
+    rng = np.random.default_rng(seed)
+    drops = []
+    X_permuted = X.copy()
+    for _ in range(n_repeats):
+        # Shuffle all columns of a group with the same permutation so dummy rows stay one-hot
+        perm = rng.permutation(X.shape[0])
+        X_permuted[:, indices] = X[perm][:, indices]
+        drops.append(baseline - accuracy_score(y, model.predict(X_permuted)))
+        X_permuted[:, indices] = X[:, indices]
+    return name, float(np.mean(drops)), float(np.std(drops))
+
+
+def permutation_importance(model, X, y, groups, n_repeats=5, random_state=42, n_jobs=-1,
+                           max_rows=MAX_IMPORTANCE_ROWS):
+    """Grouped permutation importance, one parallel task per original feature
+
+    Returns a DataFrame with the mean and std accuracy drop per feature,
+    sorted from most to least important.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.metrics import accuracy_score
+
+    feature_names = list(X.columns) if hasattr(X, 'columns') else None
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    if X.shape[0] > max_rows:
+        rows = np.random.default_rng(random_state).choice(X.shape[0], max_rows, replace=False)
+        X, y = X[rows], y[rows]
+
+    # Estimators fitted on DataFrames warn when given bare arrays, so keep the column names
+    predictor = _FramePredictor(model, feature_names) if feature_names is not None else model
+    baseline = accuracy_score(y, predictor.predict(X))
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_group_importance)(predictor, X, y, baseline, name, indices, n_repeats, random_state + i)
+        for i, (name, indices) in enumerate(groups.items())
+    )
+    importances = pd.DataFrame(results, columns=['Feature', 'Importance', 'Std'])
+    return importances.sort_values('Importance', ascending=False).reset_index(drop=True)
+
+
+class _FramePredictor:
+    """Wraps a model so permuted arrays are predicted with the training column names"""
+
+    def __init__(self, model, columns):
+        self.model = model
+        self.columns = columns
+
+    def predict(self, X):
+        return self.model.predict(pd.DataFrame(X, columns=self.columns))
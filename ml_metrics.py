@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+# Curves are downsampled to this many points so figure size doesn't grow with the test set
+MAX_CURVE_POINTS = 100
+# Cell annotations are dropped above this many classes to keep the heatmaps readable
+MAX_ANNOTATED_CLASSES = 15
+
+
+def stack_predictions(y_true, predictions):
+    """Encode true labels and every model's predictions into one integer matrix
+
+    Returns (classes, y_true_idx of shape (n,), pred_idx of shape (models, n)).
+    """
+    y_true = np.asarray(y_true)
+    preds = np.vstack([np.asarray(p) for p in predictions.values()])
+    classes, encoded = np.unique(np.concatenate([y_true, preds.ravel()]), return_inverse=True)
+    y_true_idx = encoded[:y_true.size]
+    pred_idx = encoded[y_true.size:].reshape(preds.shape)
+    return classes, y_true_idx, pred_idx
+
+
+def confusion_matrices(y_true_idx, pred_idx, n_classes):
+    """Confusion matrices for all models in a single bincount, shape (models, k, k)"""
+    n_models = pred_idx.shape[0]
+    k = n_classes
+    flat = np.arange(n_models)[:, None] * k * k + y_true_idx[None, :] * k + pred_idx
+    return np.bincount(flat.ravel(), minlength=n_models * k * k).reshape(n_models, k, k)
+
+
+def per_class_metrics(cms):
+    """Precision, recall, F1 and support per model and class from stacked confusion matrices"""
+    tp = np.diagonal(cms, axis1=1, axis2=2).astype(float)
+    predicted = cms.sum(axis=1)
+    support = cms.sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return precision, recall, f1, support
+
+
+def metrics_table(model_names, labels, cms):
+    """Long-format per-class metrics for every model"""
+    precision, recall, f1, support = per_class_metrics(cms)
+    n_models, k = precision.shape
+    return pd.DataFrame({
+        'Model': np.repeat(model_names, k),
+        'Class': np.tile(np.asarray(labels, dtype=str), n_models),
+        'Precision': precision.ravel(),
+        'Recall': recall.ravel(),
+        'F1': f1.ravel(),
+        'Support': support.ravel(),
+    })
+
+
+def _downsample(x, y, max_points=MAX_CURVE_POINTS):
+    if x.size <= max_points:
+        return x, y
+    idx = np.unique(np.linspace(0, x.size - 1, max_points).astype(int))
+    return x[idx], y[idx]
+
+
+def one_vs_rest_curves(y_true, scores, score_classes, labels):
+    """ROC and precision-recall curves for every class of one model
+
+    ``scores`` has shape (n, k) with columns ordered like ``score_classes``
+    (the model's ``classes_``); ``labels`` are their display names. All
+    classes are handled together by sorting the score matrix column-wise once.
+    Returns (curves DataFrame, ROC AUC per class).
+    """
+    n, k = scores.shape
+    order = np.argsort(-scores, axis=0, kind='stable')
+    sorted_scores = np.take_along_axis(scores, order, axis=0)
+    positives = np.asarray(y_true)[order] == np.asarray(score_classes)[None, :]
+    # Tied scores form one threshold: every row of a tie run takes the counts at the run's last row,
+    # so the curve steps across the whole run instead of through an arbitrary order within it
+    run_end = np.vstack([sorted_scores[1:] != sorted_scores[:-1], np.ones((1, k), dtype=bool)])
+    rows = np.arange(n)[:, None]
+    end_row = np.minimum.accumulate(np.where(run_end, rows, n - 1)[::-1], axis=0)[::-1]
+    tps = np.take_along_axis(np.cumsum(positives, axis=0), end_row, axis=0)
+    predicted = end_row + 1
+    fps = predicted - tps
+    n_pos = positives.sum(axis=0)
+    n_neg = n - n_pos
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpr = np.where(n_pos > 0, tps / n_pos, 0.0)
+        fpr = np.where(n_neg > 0, fps / n_neg, 0.0)
+        precision = tps / predicted
+    # Prepend the (0, 0) ROC origin so the curve and its area start at the corner
+    tpr = np.vstack([np.zeros(k), tpr])
+    fpr = np.vstack([np.zeros(k), fpr])
+    auc = ((fpr[1:] - fpr[:-1]) * (tpr[1:] + tpr[:-1]) / 2).sum(axis=0)
+
+    frames = []
+    for j in range(k):
+        # One point per distinct threshold; the repeated rows inside tie runs add nothing
+        ends = run_end[:, j]
+        fx, fy = _downsample(fpr[1:, j][ends], tpr[1:, j][ends])
+        fx, fy = np.r_[0.0, fx], np.r_[0.0, fy]
+        rx, ry = _downsample(tpr[1:, j][ends], precision[:, j][ends])
+        label = str(labels[j])
+        frames.append(pd.DataFrame({'Curve': 'ROC', 'Class': label, 'x': fx, 'y': fy}))
+        frames.append(pd.DataFrame({'Curve': 'Precision-Recall', 'Class': label, 'x': rx, 'y': ry}))
+    return pd.concat(frames, ignore_index=True), auc
+
+
+def scores_for(model, X):
+    """Class scores from predict_proba or decision_function, shape (n, k), or None"""
+    if hasattr(model, 'predict_proba'):
+        try:
+            return model.predict_proba(X)
+        except AttributeError:
+            pass
+    if hasattr(model, 'decision_function'):
+        scores = np.asarray(model.decision_function(X))
+        if scores.ndim == 1:
+            scores = np.column_stack([-scores, scores])
+        return scores
+    return None
+
+
+def confusion_matrix_figure(model_names, labels, cms, normalize=False):
+    """All confusion matrices as one faceted heatmap"""
+    import plotly.express as px
+
+    z = cms.astype(float)
+    if normalize:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.nan_to_num(z / z.sum(axis=2, keepdims=True))
+    labels = [str(label) for label in labels]
+    if len(labels) > MAX_ANNOTATED_CLASSES:
+        text_auto = False
+    else:
+        text_auto = '.2f' if normalize else True
+    fig = px.imshow(
+        z,
+        x=labels,
+        y=labels,
+        facet_col=0,
+        facet_col_wrap=min(3, len(model_names)),
+        facet_col_spacing=0.06,
+        color_continuous_scale='Viridis',
+        text_auto=text_auto,
+        labels={'x': 'Predicted', 'y': 'Actual', 'color': 'Share' if normalize else 'Count'},
+        aspect='auto',
+    )
+    # Facet titles default to "facet_col=0"; replace them with the model names
+    for annotation in fig.layout.annotations:
+        index = int(annotation.text.split('=')[-1])
+        annotation.text = model_names[index]
+    rows = int(np.ceil(len(model_names) / min(3, len(model_names))))
+    fig.update_layout(title='Confusion Matrices', height=max(350, 320 * rows))
+    return fig
+
+
+def curves_figure(curves):
+    """ROC and precision-recall curves for all models in one faceted figure"""
+    import plotly.express as px
+
+    fig = px.line(
+        curves, x='x', y='y', color='Class',
+        facet_col='Curve', facet_row='Model',
+        labels={'x': '', 'y': ''},
+    )
+    fig.update_yaxes(range=[0, 1.02])
+    fig.update_xaxes(range=[0, 1])
+    fig.update_layout(title='ROC (FPR vs TPR) and Precision-Recall (Recall vs Precision)',
+                      height=max(350, 260 * curves['Model'].nunique()))
+    return fig
@@ -0,0 +1,204 @@
+"""Headless ML analysis pipeline behind streamlit-app.py
+
+Loading, preprocessing, registry-backed training and evaluation with no
+Streamlit dependency; the page only adds caching, widgets and charts.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timer
+from ml_estimators import MODELS, build_estimator, fit_with_budget, model_spec
+from ml_metrics import confusion_matrices, metrics_table, one_vs_rest_curves, scores_for, stack_predictions
+from ml_registry import make_key
+from ml_scoring import FittedPreprocessor
+
+
+def load_data(file):
+    return pd.read_csv(file)
+
+
+def preprocess_data(data, target, drop_first=True):
+    """One-hot encode categorical features and integer-encode a categorical target
+
+    Returns (processed DataFrame, name of the encoded target column).
+    """
+    # Create a copy of the dataframe
+    df_processed = data.copy()
+
+    # Get categorical columns (excluding target if it's categorical)
+    cat_cols = df_processed.select_dtypes(include=['object']).columns
+    cat_cols = [col for col in cat_cols if col != target]
+
+    # One-hot encode categorical variables
+    for col in cat_cols:
+        df_processed = pd.concat([
+            df_processed,
+            pd.get_dummies(df_processed[col], prefix=col, drop_first=drop_first)
+        ], axis=1)
+        df_processed = df_processed.drop(col, axis=1)
+
+    # Handle target column if it's categorical
+    if df_processed[target].dtype == 'object':
+        df_processed[f"{target}_encoded"] = pd.factorize(df_processed[target])[0]
+        target_encoded = f"{target}_encoded"
+    else:
+        target_encoded = target
+
+    return df_processed, target_encoded
+
+
+def split_features(df_processed, target, target_encoded):
+    """Feature matrix and label vector, dropping the raw and encoded target columns"""
+    X = df_processed.drop([target, target_encoded] if target != target_encoded else [target_encoded], axis=1)
+    y = df_processed[target_encoded]
+    return X, y
+
+
+def training_key(dataset, preprocess_options, target, test_size, random_state, model_name, time_budget=None):
+    """Registry key pinning the data, split, hyperparameters and time budget of one model"""
+    return make_key(
+        dataset=dataset,
+        preprocessing=preprocess_options,
+        target=target,
+        test_size=test_size,
+        random_state=random_state,
+        model=model_name,
+        params=MODELS[model_name][1],
+        time_budget=time_budget,
+    )
+
+
+def train_model(model_name, data, target, target_encoded, X_train, y_train, preprocess_options,
+                random_state=42, time_budget=None):
+    """Fit one model and capture the preprocessing needed to score new data with it
+
+    Returns the registry entry: {'model', 'preprocessor', 'fit_info'}.
+    """
+    estimator_cls, params = model_spec(model_name)
+    model, engine = build_estimator(model_name, estimator_cls, params, X_train.shape[0], random_state)
+    with timer(f'fit.{model_name}'):
+        fit_info = fit_with_budget(model, X_train, y_train, time_budget)
+    fit_info['engine'] = engine
+    preprocessor = FittedPreprocessor.from_training(
+        data, target, X_train.columns,
+        one_hot=preprocess_options['one_hot'],
+        drop_first=preprocess_options['drop_first'],
+        encode_target=target_encoded != target,
+    )
+    return {'model': model, 'preprocessor': preprocessor, 'fit_info': fit_info}
+
+
+def train_models(registry, model_names, data, target, target_encoded, X_train, y_train, dataset,
+                 preprocess_options, test_size, random_state=42, time_budgets=None):
+    """Yield (model_name, registry_key, entry), reusing fitted models from the registry"""
+    time_budgets = time_budgets or {}
+    for model_name in model_names:
+        key = training_key(dataset, preprocess_options, target, test_size, random_state,
+                           model_name, time_budgets.get(model_name))
+        entry = registry.get(key)
+        if entry is None:
+            entry = train_model(model_name, data, target, target_encoded, X_train, y_train,
+                                preprocess_options, random_state, time_budgets.get(model_name))
+            registry.put(key, entry, metadata={
+                'model_name': model_name,
+                'target': target,
+                'dataset': dataset,
+                'trained_at': datetime.now().isoformat(timespec='seconds'),
+            })
+        yield model_name, key, entry
+
+
+def evaluate_models(models, X_test, y_test, target_classes=None):
+    """Accuracy, confusion matrices, per-class metrics and ROC/PR curves for fitted models
+
+    ``target_classes`` maps encoded labels back to their display names.
+    Returns a dict of result tables; 'curves' and 'auc' are None when no
+    model exposes class scores.
+    """
+    from sklearn.metrics import accuracy_score
+
+    def class_label(c):
+        return target_classes[int(c)] if target_classes is not None else c
+
+    predictions = {name: model.predict(X_test) for name, model in models.items()}
+    accuracy = pd.DataFrame({
+        'Model': list(predictions),
+        'Accuracy (%)': [accuracy_score(y_test, y_pred) * 100 for y_pred in predictions.values()],
+    }).sort_values('Accuracy (%)', ascending=False).reset_index(drop=True)
+
+    model_names = list(predictions)
+    classes, y_true_idx, pred_idx = stack_predictions(y_test, predictions)
+    cms = confusion_matrices(y_true_idx, pred_idx, len(classes))
+    labels = [class_label(c) for c in classes]
+
+    curve_frames = []
+    auc_rows = []
+    for model_name, model in models.items():
+        scores = scores_for(model, X_test)
+        if scores is None:
+            continue
+        score_classes = model.classes_
+        score_labels = [class_label(c) for c in score_classes]
+        curves, auc = one_vs_rest_curves(y_test, scores, score_classes, score_labels)
+        if len(score_classes) == 2:
+            # Binary: the positive class curve says it all
+            curves = curves[curves['Class'] == str(score_labels[1])]
+            auc = auc[1:]
+            score_labels = score_labels[1:]
+        curve_frames.append(curves.assign(Model=model_name))
+        auc_rows.extend({'Model': model_name, 'Class': str(label), 'ROC AUC': value}
+                        for label, value in zip(score_labels, auc))
+
+    return {
+        'accuracy': accuracy,
+        'model_names': model_names,
+        'classes': classes,
+        'labels': labels,
+        'confusion_matrices': cms,
+        'class_metrics': metrics_table(model_names, labels, cms),
+        'curves': pd.concat(curve_frames, ignore_index=True) if curve_frames else None,
+        'auc': pd.DataFrame(auc_rows).pivot(index='Class', columns='Model', values='ROC AUC') if auc_rows else None,
+    }
+
+
+def fit_summary(fit_infos):
+    """Which estimator actually ran for each model, and why it stopped"""
+    return pd.DataFrame([
+        {
+            'Model': name,
+            'Engine': info['engine'],
+            'Iterations': info['iterations'],
+            'Stopped by': info['stopped_by'],
+            'Fit time (s)': round(info['seconds'], 2),
+        }
+        for name, info in fit_infos.items()
+    ])
+
+
+def build_estimators(model_names, n_samples, random_state=42):
+    """Unfitted estimators for cross-validation, sized for ``n_samples`` training rows"""
+    estimators = {}
+    for model_name in model_names:
+        estimator_cls, params = model_spec(model_name)
+        estimators[model_name], _ = build_estimator(model_name, estimator_cls, params, n_samples, random_state)
+    return estimators
+
+
+def cv_summary(cv_scores):
+    """Mean and spread of the fold accuracies per model, best first"""
+    return pd.DataFrame({
+        'Model': list(cv_scores.keys()),
+        'Mean Accuracy (%)': [np.mean(v) * 100 for v in cv_scores.values()],
+        'Std (%)': [np.std(v) * 100 for v in cv_scores.values()],
+    }).sort_values('Mean Accuracy (%)', ascending=False).reset_index(drop=True)
+
+
+def best_params(search):
+    """A search's best parameters as plain Python values, named as on the model itself"""
+    return {
+        k.removeprefix('estimator__'): v.item() if hasattr(v, 'item') else v
+        for k, v in search.best_params_.items()
+    }
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+from importlib.metadata import version
+
+# Read from the package metadata so building a key doesn't import scikit-learn; joblib is
+# imported on the first load or store for the same reason
+SKLEARN_VERSION = version('scikit-learn')
+
+# Registry location and size limit can be overridden from the environment
+DEFAULT_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', 'model_registry')
+DEFAULT_MAX_BYTES = int(float(os.environ.get('MODEL_REGISTRY_MAX_MB', '512')) * 1024 * 1024)
+
+
+def make_key(**config):
+    """Stable registry key for a training configuration
+
+    The key covers everything that changes the fitted estimator: dataset
+    fingerprint, preprocessing options, target, split parameters and model
+    hyperparameters. The scikit-learn version is included so pickles from
+    another version are never loaded.
+    """
+    config = dict(config, sklearn_version=SKLEARN_VERSION)
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ModelRegistry:
+    """On-disk store of fitted estimators with least-recently-used eviction"""
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.joblib")
+
+    def _metadata_path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key):
+        """Load an entry, or return None if it isn't in the registry or can't be read
+
+        An unreadable entry (truncated, corrupt, or pickled against code that
+        has since changed) is removed, so the model is simply trained again.
+        """
+        import joblib
+
+        path = self._path(key)
+        try:
+            entry = joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._remove(path)
+            return None
+        # Touch the file so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def put(self, key, entry, metadata=None):
+        """Store an entry and evict old ones if the registry is over its size limit
+
+        ``metadata`` is a small JSON-serializable dict saved next to the entry
+        so saved models can be listed without unpickling them.
+        """
+        import joblib
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if metadata is not None:
+            with open(tmp_path, 'w') as fh:
+                json.dump(dict(metadata, key=key), fh, default=str)
+            os.replace(tmp_path, self._metadata_path(key))
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def list_models(self):
+        """Metadata of stored entries, most recently used first"""
+        models = []
+        for path, _, _ in reversed(self.entries()):
+            try:
+                with open(self._metadata_path(os.path.basename(path)[:-len('.joblib')])) as fh:
+                    models.append(json.load(fh))
+            except FileNotFoundError:
+                continue
+        return models
+
+    def entries(self):
+        """List (path, size, last_used) for every stored entry, oldest first"""
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.joblib'):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return sorted(entries, key=lambda e: e[2])
+
+    def evict(self):
+        """Remove least-recently-used entries until the registry fits in ``max_bytes``"""
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            # Always keep the most recent entry, even if it alone exceeds the limit
+            for path, size, _ in entries[:-1]:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def _remove(self, path):
+        for p in (path, path[:-len('.joblib')] + '.json'):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
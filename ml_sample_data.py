@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+JOBS = ['admin', 'blue-collar', 'technician', 'services', 'management']
+
+
+def make_bank_data(n_rows=100, extra_numeric=0, extra_categorical=0, cardinality=None, seed=None):
+    """Synthetic bank marketing data with optional extra columns
+
+    The base columns match the app's sample dataset. ``extra_numeric`` and
+    ``extra_categorical`` add ``num_{i}`` / ``cat_{i}`` columns; ``cardinality``
+    sets the number of levels of the extra categorical columns and of ``job``
+    (which keeps its five real job names when left unset).
+    """
+    rng = np.random.default_rng(seed)
+    if cardinality is None:
+        jobs = JOBS
+    else:
+        jobs = JOBS[:cardinality] + [f"job_{i}" for i in range(len(JOBS), cardinality)]
+    data = {
+        'age': rng.integers(18, 95, n_rows),
+        'job': rng.choice(jobs, n_rows),
+        'marital': rng.choice(['married', 'single', 'divorced'], n_rows),
+        'education': rng.choice(['primary', 'secondary', 'tertiary'], n_rows),
+        'balance': rng.integers(-1000, 50000, n_rows),
+        'housing': rng.choice(['yes', 'no'], n_rows),
+        'loan': rng.choice(['yes', 'no'], n_rows),
+        'contact': rng.choice(['cellular', 'telephone'], n_rows),
+        'duration': rng.integers(0, 5000, n_rows),
+        'campaign': rng.integers(1, 50, n_rows),
+    }
+    for i in range(extra_numeric):
+        data[f"num_{i}"] = rng.normal(0, 1, n_rows)
+    levels = [f"level_{j}" for j in range(cardinality or 5)]
+    for i in range(extra_categorical):
+        data[f"cat_{i}"] = rng.choice(levels, n_rows)
+    # Longer calls convert more often, so models have some signal to learn
+    p_yes = 1 / (1 + np.exp(-(data['duration'] - 2500) / 800))
+    data['deposit'] = np.where(rng.random(n_rows) < p_yes, 'yes', 'no')
+    return pd.DataFrame(data)
@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SCORING_CHUNK_SIZE = 50_000
+
+
+class FittedPreprocessor:
+    """Training-time preprocessing replayed on new data
+
+    Categories are frozen when the model is trained, so one-hot columns line
+    up with the training features no matter which values appear in a chunk.
+    """
+
+    def __init__(self, feature_columns, categories, drop_first, target, target_classes):
+        self.feature_columns = list(feature_columns)
+        self.categories = categories
+        self.drop_first = drop_first
+        self.target = target
+        self.target_classes = target_classes
+
+    @classmethod
+    def from_training(cls, data, target, feature_columns, one_hot=True, drop_first=True, encode_target=True):
+        """Capture the preprocessing applied to ``data`` before training"""
+        categories = {}
+        if one_hot:
+            for col in data.select_dtypes(include=['object']).columns:
+                if col != target:
+                    categories[col] = sorted(data[col].dropna().unique())
+        target_classes = None
+        if encode_target:
+            # Same ordering as pd.factorize in preprocess_data
+            target_classes = list(pd.factorize(data[target])[1])
+        return cls(feature_columns, categories, drop_first, target, target_classes)
+
+    def transform(self, chunk):
+        """Turn a raw chunk into a feature matrix with the training columns"""
+        chunk = chunk.drop(columns=[self.target], errors='ignore')
+        for col, cats in self.categories.items():
+            if col not in chunk.columns:
+                continue
+            # Values unseen in training become missing, so they get no dummy column at all
+            values = pd.Categorical(chunk[col].where(chunk[col].isin(cats)), categories=cats)
+            dummies = pd.get_dummies(values, prefix=col, drop_first=self.drop_first)
+            dummies.index = chunk.index
+            chunk = pd.concat([chunk.drop(columns=[col]), dummies], axis=1)
+        return chunk.reindex(columns=self.feature_columns, fill_value=0)
+
+    def decode(self, y_pred):
+        """Map encoded predictions back to the original target labels"""
+        if self.target_classes is None:
+            return y_pred
+        classes = np.asarray(self.target_classes, dtype=object)
+        return classes[np.asarray(y_pred, dtype=int)]
+
+
+def score_chunks(model, preprocessor, chunks):
+    """Yield a predictions frame for every chunk of raw rows"""
+    row_offset = 0
+    for chunk in chunks:
+        X = preprocessor.transform(chunk)
+        y_pred = model.predict(X)
+        result = pd.DataFrame({
+            'row': np.arange(row_offset, row_offset + len(chunk)),
+            'prediction': preprocessor.decode(y_pred),
+        })
+        if hasattr(model, 'predict_proba'):
+            proba = model.predict_proba(X)
+            classes = preprocessor.decode(model.classes_)
+            for i, cls in enumerate(classes):
+                result[f"proba_{cls}"] = proba[:, i]
+        row_offset += len(chunk)
+        yield result
+
+
+def score_csv(model, preprocessor, source, output, chunk_size=DEFAULT_SCORING_CHUNK_SIZE, progress=None):
+    """Stream a CSV through ``model`` and write predictions to ``output``
+
+    Only one chunk of input and output is held in memory at a time.
+    ``progress`` is called with (rows_scored, elapsed_seconds) after every
+    chunk. Returns (rows_scored, elapsed_seconds).
+    """
+    start = time.perf_counter()
+    rows = 0
+    chunks = pd.read_csv(source, chunksize=chunk_size)
+    for i, result in enumerate(score_chunks(model, preprocessor, chunks)):
+        result.to_csv(output, index=False, header=(i == 0))
+        rows += len(result)
+        if progress is not None:
+            progress(rows, time.perf_counter() - start)
+    return rows, time.perf_counter() - start
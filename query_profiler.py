@@ -0,0 +1,264 @@
+"""SQL query profiler for the Startive SQLite layer
+
+Enable with STARTIVE_QUERY_PROFILE=1. Every statement run through a
+profiled connection is logged to STARTIVE_QUERY_LOG (JSON lines) with its
+text, parameter shape, row count and duration, and EXPLAIN QUERY PLAN is
+captured once per distinct statement. Full scans of the large per-user
+tables are flagged.
+
+Summary report:
+
+    python query_profiler.py report [--log query_profile.jsonl] [--top 20] [--slow-ms 50]
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+LOG_PATH = os.environ.get('STARTIVE_QUERY_LOG', 'query_profile.jsonl')
+# Tables whose full scans grow with a user's whole history
+WATCHED_TABLES = ('transactions', 'savings')
+_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)')
+
+_lock = threading.Lock()
+_explained = set()
+
+
+def profiling_enabled():
+    return os.environ.get('STARTIVE_QUERY_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+
+def normalize_sql(sql):
+    """Collapse whitespace so the same statement always has the same key"""
+    return ' '.join(sql.split())
+
+
+def params_shape(parameters):
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters]
+
+
+def full_scans(plan_rows):
+    """Watched tables that a query plan scans without an index"""
+    tables = []
+    for detail in plan_rows:
+        match = _SCAN_RE.search(detail)
+        if match and match.group(1) in WATCHED_TABLES and 'INDEX' not in detail:
+            tables.append(match.group(1))
+    return tables
+
+
+def _write(record, path=None):
+    line = json.dumps(record, default=str)
+    with _lock, open(path or LOG_PATH, 'a') as fh:
+        fh.write(line + '\n')
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that times statements including the row fetches SQLite does lazily"""
+
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self.connection._explain_once(sql, parameters)
+        self._pending = {
+            'ts': time.time(),
+            'sql': normalize_sql(sql),
+            'params_shape': params_shape(parameters),
+            'rows': 0,
+            'seconds': 0.0,
+        }
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending['seconds'] += time.perf_counter() - start
+            if self.rowcount > 0:
+                self._pending['rows'] = self.rowcount
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        seq_of_parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _write({
+                'ts': time.time(),
+                'sql': normalize_sql(sql),
+                'params_shape': params_shape(seq_of_parameters[0]) if seq_of_parameters else [],
+                'batch': len(seq_of_parameters),
+                'rows': max(self.rowcount, 0),
+                'duration_ms': (time.perf_counter() - start) * 1000,
+            })
+
+    def _timed_fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        if self._pending is not None:
+            self._pending['seconds'] += time.perf_counter() - start
+            if isinstance(result, list):
+                self._pending['rows'] += len(result)
+            elif result is not None:
+                self._pending['rows'] += 1
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        result = self._timed_fetch(super().fetchall)
+        self._finish()
+        return result
+
+    def __next__(self):
+        # ``for row in cursor`` fetches through here, one row at a time
+        return self._timed_fetch(super().__next__)
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def _finish(self):
+        if self._pending is None:
+            return
+        record = self._pending
+        self._pending = None
+        record['duration_ms'] = record.pop('seconds') * 1000
+        _write(record)
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connection whose cursors are profiled"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = []
+
+    def cursor(self, factory=ProfilingCursor):
+        cur = super().cursor(factory)
+        self._cursors.append(cur)
+        return cur
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def _explain_once(self, sql, parameters):
+        key = normalize_sql(sql)
+        with _lock:
+            if key in _explained:
+                return
+            _explained.add(key)
+        try:
+            # A plain cursor, so the EXPLAIN itself isn't profiled
+            rows = sqlite3.Cursor(self).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+        except sqlite3.Error:
+            return
+        plan = [row[-1] for row in rows]
+        _write({'type': 'plan', 'sql': key, 'plan': plan, 'full_scans': full_scans(plan)})
+
+    def _finish_cursors(self):
+        for cur in self._cursors:
+            cur._finish()
+        self._cursors = []
+
+    def commit(self):
+        self._finish_cursors()
+        super().commit()
+
+    def close(self):
+        self._finish_cursors()
+        super().close()
+
+
+def connect(path, **kwargs):
+    """sqlite3.connect returning a profiled connection"""
+    return sqlite3.connect(path, factory=ProfilingConnection, **kwargs)
+
+
+def load_log(path=LOG_PATH):
+    queries, plans = [], {}
+    with open(path) as fh:
+        for line in fh:
+            record = json.loads(line)
+            if record.get('type') == 'plan':
+                plans[record['sql']] = record
+            else:
+                queries.append(record)
+    return queries, plans
+
+
+def build_report(queries, plans):
+    """Aggregate logged executions per statement, slowest total time first"""
+    by_sql = {}
+    for q in queries:
+        by_sql.setdefault(q['sql'], []).append(q)
+    report = []
+    for sql, runs in by_sql.items():
+        durations = np.array([r['duration_ms'] for r in runs])
+        plan = plans.get(sql, {})
+        report.append({
+            'sql': sql,
+            'calls': len(runs),
+            'total_ms': durations.sum(),
+            'p50_ms': np.percentile(durations, 50),
+            'p95_ms': np.percentile(durations, 95),
+            'max_ms': durations.max(),
+            'avg_rows': float(np.mean([r['rows'] for r in runs])),
+            'plan': plan.get('plan', []),
+            'full_scans': plan.get('full_scans', []),
+        })
+    return sorted(report, key=lambda r: r['total_ms'], reverse=True)
+
+
+def print_report(report, top=20, slow_ms=None, out=sys.stdout):
+    print(f"{'calls':>7} {'total ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'rows':>8}  statement", file=out)
+    for row in report[:top]:
+        flag = ' [FULL SCAN: ' + ', '.join(row['full_scans']) + ']' if row['full_scans'] else ''
+        sql = row['sql'] if len(row['sql']) <= 100 else row['sql'][:97] + '...'
+        print(f"{row['calls']:>7} {row['total_ms']:>10.2f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+              f"{row['avg_rows']:>8.1f}  {sql}{flag}", file=out)
+    flagged = [row for row in report if row['full_scans']]
+    if flagged:
+        print(f"\n{len(flagged)} statement(s) scan {', '.join(WATCHED_TABLES)} without an index:", file=out)
+        for row in flagged:
+            print(f"  {row['sql']}", file=out)
+            for step in row['plan']:
+                print(f"      {step}", file=out)
+    if slow_ms is not None:
+        slow = [row for row in report if row['max_ms'] >= slow_ms]
+        print(f"\n{len(slow)} statement(s) with an execution of {slow_ms} ms or more.", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    report_cmd = sub.add_parser('report', help='Summarize a query profile log')
+    report_cmd.add_argument('--log', default=LOG_PATH)
+    report_cmd.add_argument('--top', type=int, default=20)
+    report_cmd.add_argument('--slow-ms', type=float, default=None)
+    report_cmd.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args(argv)
+
+    queries, plans = load_log(args.log)
+    report = build_report(queries, plans)
+    if args.json:
+        print(json.dumps(report, indent=2, default=float))
+    else:
+        print_report(report, top=args.top, slow_ms=args.slow_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# Date ranges offered above the savings charts, in days (None: the whole history)
+RANGES = {'1 Month': 30, '3 Months': 90, '1 Year': 365, 'All Time': None}
+# Upper bounds that keep figure payloads constant however long a user has been saving
+MAX_LINE_POINTS = 400
+MAX_BARS = 120
+# Bar resolutions from finest to coarsest: (pandas period, label, approximate days per bucket)
+RESOLUTIONS = [
+    ('D', 'Daily', 1),
+    ('W', 'Weekly', 7),
+    ('M', 'Monthly', 30.44),
+    ('Q', 'Quarterly', 91.31),
+    ('Y', 'Yearly', 365.25),
+]
+
+
+def daily_series(savings_by_date):
+    """Daily savings totals with their running total, from get_savings_by_date rows"""
+    df = pd.DataFrame(savings_by_date, columns=['date', 'total'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['cumulative'] = df['total'].cumsum()
+    return df
+
+
+def select_range(df, days=None):
+    """Rows from the last ``days`` days; the running total still counts everything before"""
+    if days is None:
+        return df
+    return df[df['date'] > pd.Timestamp.now().normalize() - pd.Timedelta(days=days)]
+
+
+def lttb(x, y, threshold):
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previous pick and the next
+    bucket's mean, so peaks and steps survive the downsampling.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    picked = np.empty(threshold, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(areas))
+        picked[i + 1] = a
+    return picked
+
+
+def growth_points(df, days=None, max_points=MAX_LINE_POINTS):
+    """Cumulative savings over the range, downsampled to at most ``max_points`` points"""
+    df = select_range(df, days)
+    picked = lttb(df['date'].to_numpy().astype('int64'), df['cumulative'].to_numpy(), max_points)
+    return df.iloc[picked][['date', 'cumulative']]
+
+
+def bar_resolution(df, days=None, max_bars=MAX_BARS):
+    """Finest (period, label) giving at most about ``max_bars`` buckets over the range"""
+    if days is None:
+        days = (df['date'].iloc[-1] - df['date'].iloc[0]).days + 1 if not df.empty else 1
+    for period, label, bucket_days in RESOLUTIONS:
+        if days / bucket_days <= max_bars:
+            return period, label
+    return RESOLUTIONS[-1][:2]
+
+
+def period_totals(df, days=None, max_bars=MAX_BARS):
+    """Savings summed per day, week or month as the range allows; returns (DataFrame, label)"""
+    df = select_range(df, days)
+    period, label = bar_resolution(df, days, max_bars)
+    if period == 'D':
+        return df[['date', 'total']], label
+    buckets = df['date'].dt.to_period(period).dt.start_time
+    totals = df.groupby(buckets)['total'].sum().rename_axis('date').reset_index()
+    return totals, label
@@ -0,0 +1,267 @@
+"""Streaming spending analytics: recurring charges and anomalous spends
+
+Every new transaction is folded into per-user state with a constant number
+of primary-key lookups, so nothing rescans history:
+
+- category_stats keeps an exponentially weighted mean and variance of the
+  amount per category; a spend several deviations above its category's
+  usual amount is recorded in spending_anomalies.
+- merchant_stats is keyed by a hash of the normalized description and
+  tracks each merchant's typical amount and the spacing between charges;
+  steady amounts at a weekly, monthly or yearly rhythm mark it recurring,
+  until no charge has arrived for 1.5 times its usual interval.
+
+startive_core runs observe_transaction as an outbox job for every
+add_transaction. Existing databases are filled with:
+
+    python spending_stream.py backfill
+"""
+
+import argparse
+import hashlib
+import math
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+# Weight of the newest observation once a series has more than 1 / STATS_ALPHA points;
+# before that every point weighs the same, so early stats are plain means
+STATS_ALPHA = 0.1
+# A spend is anomalous when it sits this many deviations above its category's usual amount
+ANOMALY_Z = 3.0
+ANOMALY_MIN_COUNT = 5
+# Charges needed before a merchant can count as recurring, and how steady it has to be
+RECURRING_MIN_COUNT = 3
+RECURRING_INTERVAL_TOLERANCE = 0.2
+RECURRING_AMOUNT_TOLERANCE = 0.15
+PERIOD_DAYS = {'weekly': 7.0, 'monthly': 30.44, 'yearly': 365.25}
+# A recurring charge counts as cancelled once its next charge is this many intervals overdue
+RECURRING_EXPIRY_INTERVALS = 1.5
+
+_NON_ALPHA_RE = re.compile(r'[^a-z]+')
+
+
+def create_spending_tables(c):
+    """Schema version 5: streaming spending state and detected anomalies"""
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS category_stats (
+        user_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        mean REAL NOT NULL,
+        var REAL NOT NULL,
+        PRIMARY KEY (user_id, category)
+    )
+    ''')
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS merchant_stats (
+        user_id INTEGER NOT NULL,
+        merchant_hash INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        category TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        mean_amount REAL NOT NULL,
+        last_amount REAL NOT NULL,
+        last_date TEXT NOT NULL,
+        mean_interval REAL,
+        interval_dev REAL,
+        period TEXT,
+        PRIMARY KEY (user_id, merchant_hash)
+    )
+    ''')
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS spending_anomalies (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        description TEXT,
+        amount REAL NOT NULL,
+        expected REAL NOT NULL,
+        zscore REAL NOT NULL,
+        transaction_date TIMESTAMP NOT NULL
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_spending_anomalies_user_date ON spending_anomalies (user_id, transaction_date)")
+
+
+def merchant_name(description):
+    """Description with case, digits and punctuation stripped, so 'NETFLIX.COM 0425' matches 'Netflix.com 0526'"""
+    return _NON_ALPHA_RE.sub(' ', (description or '').lower()).strip()
+
+
+def merchant_hash(name):
+    """Signed 64-bit key of a normalized merchant name"""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def ew_update(count, mean, var, x):
+    """Fold ``x`` into an exponentially weighted mean and variance over ``count`` earlier points"""
+    alpha = max(STATS_ALPHA, 1 / (count + 1))
+    diff = x - mean
+    increment = alpha * diff
+    return mean + increment, (1 - alpha) * (var + diff * increment)
+
+
+def days_between(earlier, later):
+    fmt = '%Y-%m-%d %H:%M:%S'
+    return (datetime.strptime(later[:19], fmt) - datetime.strptime(earlier[:19], fmt)).total_seconds() / 86400
+
+
+def recurring_period(count, mean_amount, last_amount, mean_interval, interval_dev):
+    """'weekly', 'monthly' or 'yearly' when a merchant's charges are steady enough, else None"""
+    if count < RECURRING_MIN_COUNT or not mean_interval:
+        return None
+    if abs(last_amount - mean_amount) > RECURRING_AMOUNT_TOLERANCE * abs(mean_amount):
+        return None
+    if interval_dev > RECURRING_INTERVAL_TOLERANCE * mean_interval:
+        return None
+    for period, days in PERIOD_DAYS.items():
+        if abs(mean_interval - days) <= RECURRING_INTERVAL_TOLERANCE * days:
+            return period
+    return None
+
+
+def observe_transaction(c, user_id, amount, category, description, transaction_date):
+    """Fold one transaction into the user's category and merchant state on cursor ``c``"""
+    c.execute("SELECT count, mean, var FROM category_stats WHERE user_id = ? AND category = ?", (user_id, category))
+    row = c.fetchone()
+    count, mean, var = row if row else (0, 0.0, 0.0)
+    if count >= ANOMALY_MIN_COUNT and var > 0:
+        zscore = (amount - mean) / math.sqrt(var)
+        if zscore >= ANOMALY_Z:
+            c.execute("""
+            INSERT INTO spending_anomalies (user_id, category, description, amount, expected, zscore, transaction_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, category, description, amount, mean, zscore, transaction_date))
+    mean, var = ew_update(count, mean, var, amount)
+    c.execute("""
+    INSERT INTO category_stats (user_id, category, count, mean, var) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (user_id, category) DO UPDATE SET count = excluded.count, mean = excluded.mean, var = excluded.var
+    """, (user_id, category, count + 1, mean, var))
+
+    name = merchant_name(description)
+    if not name:
+        return
+    key = merchant_hash(name)
+    c.execute("""
+    SELECT count, mean_amount, last_date, mean_interval, interval_dev
+    FROM merchant_stats WHERE user_id = ? AND merchant_hash = ?
+    """, (user_id, key))
+    row = c.fetchone()
+    if row is None:
+        c.execute("""
+        INSERT INTO merchant_stats (user_id, merchant_hash, description, category, count, mean_amount, last_amount, last_date)
+        VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+        """, (user_id, key, description, category, amount, amount, transaction_date))
+        return
+
+    count, mean_amount, last_date, mean_interval, interval_dev = row
+    gap = days_between(last_date, transaction_date)
+    if mean_interval is None:
+        mean_interval, interval_dev = gap, 0.0
+    else:
+        # count - 1 earlier gaps; the spread is a mean absolute deviation, so it stays in days
+        interval_dev, _ = ew_update(count - 1, interval_dev, 0.0, abs(gap - mean_interval))
+        mean_interval, _ = ew_update(count - 1, mean_interval, 0.0, gap)
+    mean_amount, _ = ew_update(count, mean_amount, 0.0, amount)
+    period = recurring_period(count + 1, mean_amount, amount, mean_interval, interval_dev)
+    c.execute("""
+    UPDATE merchant_stats
+    SET description = ?, count = count + 1, mean_amount = ?, last_amount = ?, last_date = ?,
+        mean_interval = ?, interval_dev = ?, period = ?
+    WHERE user_id = ? AND merchant_hash = ?
+    """, (description, mean_amount, amount, transaction_date, mean_interval, interval_dev, period, user_id, key))
+
+
+def savings_opportunities(c, user_id, anomaly_days=30):
+    """Recurring charges and recent anomalous spends of ``user_id``, read from the stored state
+
+    Nothing arrives to clear the flag of a cancelled subscription, so
+    merchants whose last charge is more than RECURRING_EXPIRY_INTERVALS
+    intervals old are left out here.
+    """
+    c.execute("""
+    SELECT description, category, mean_amount, period, last_date
+    FROM merchant_stats
+    WHERE user_id = ? AND period IS NOT NULL
+      AND julianday('now') - julianday(last_date) <= ? * mean_interval
+    """, (user_id, RECURRING_EXPIRY_INTERVALS))
+    recurring = [
+        {
+            'description': description,
+            'category': category,
+            'amount': amount,
+            'period': period,
+            'last_charged': last_date,
+            'monthly_cost': amount * PERIOD_DAYS['monthly'] / PERIOD_DAYS[period],
+        }
+        for description, category, amount, period, last_date in c.fetchall()
+    ]
+    recurring.sort(key=lambda r: r['monthly_cost'], reverse=True)
+
+    c.execute("""
+    SELECT transaction_date, category, description, amount, expected
+    FROM spending_anomalies
+    WHERE user_id = ? AND transaction_date >= datetime('now', ?)
+    ORDER BY transaction_date DESC
+    """, (user_id, f"-{anomaly_days} days"))
+    anomalies = [
+        {'transaction_date': date, 'category': category, 'description': description,
+         'amount': amount, 'expected': expected}
+        for date, category, description, amount, expected in c.fetchall()
+    ]
+
+    return {
+        'recurring': recurring,
+        'recurring_monthly': sum(r['monthly_cost'] for r in recurring),
+        'anomalies': anomalies,
+        'anomaly_excess': sum(a['amount'] - a['expected'] for a in anomalies),
+    }
+
+
+def backfill(path, chunk_size=10_000):
+    """Rebuild the spending state of one database from its hot transactions, oldest first per user
+
+    Rows already moved to the archive are not replayed.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        c = conn.cursor()
+        for table in ('category_stats', 'merchant_stats', 'spending_anomalies'):
+            c.execute(f"DELETE FROM {table}")
+        rows = conn.execute("""
+        SELECT user_id, amount, category, description, transaction_date
+        FROM transactions
+        ORDER BY user_id, transaction_date, id
+        """)
+        observed = 0
+        while True:
+            chunk = rows.fetchmany(chunk_size)
+            if not chunk:
+                break
+            for row in chunk:
+                observe_transaction(c, *row)
+            observed += len(chunk)
+        conn.commit()
+        return observed
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    # startive_core imports this module for its outbox handler
+    import startive_core
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('backfill', help='Rebuild the spending state of every shard from its transactions')
+    parser.parse_args(argv)
+
+    startive_core.init_db()
+    for path in startive_core.shard_paths():
+        print(f"{path}: observed {backfill(path)} transactions", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Archival job for old Startive transactions and savings
+
+Moves rows older than the horizon out of each database's hot tables into
+a paired archive file (startive.archive.db, startive.0-of-4.archive.db, ...)
+as zlib-compressed per-user monthly blocks, and adds their totals to the
+monthly summary tables the dashboard reads; the archived transactions'
+outbox jobs are dropped with them. Daily savings totals already live in
+savings_daily and stay there. The move is one transaction across
+the hot and archive files, so a crash never loses or duplicates rows:
+
+    python startive_archive.py run --days 365
+    python startive_archive.py status
+
+startive_core.get_transaction_history reads the archive back on demand.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import startive_core
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get('STARTIVE_ARCHIVE_AFTER_DAYS', '365'))
+
+# Archived columns and the date column that decides a row's age and month
+ARCHIVED_TABLES = {
+    'transactions': (['id', 'amount', 'category', 'description', 'transaction_date', 'roundup_amount'],
+                     'transaction_date'),
+    'savings': (['id', 'amount', 'source', 'saving_date', 'allocation_type', 'posting_key'], 'saving_date'),
+}
+
+
+def create_archive_tables(c):
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS archive.archive_blocks (
+        id INTEGER PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        row_count INTEGER NOT NULL,
+        payload BLOB NOT NULL,
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_blocks_user ON archive_blocks (table_name, user_id, month)")
+
+
+def write_block(c, table, user_id, month, columns, rows):
+    payload = zlib.compress(json.dumps({'columns': columns, 'rows': rows}).encode(), 6)
+    c.execute(
+        "INSERT INTO archive.archive_blocks (table_name, user_id, month, row_count, payload) VALUES (?, ?, ?, ?, ?)",
+        (table, user_id, month, len(rows), payload),
+    )
+
+
+def archive_table(c, table, cutoff):
+    """Block up and summarize ``table`` rows dated before ``cutoff``, then delete them; returns the row count"""
+    columns, date_column = ARCHIVED_TABLES[table]
+    # Rows stream in (user, date) order off the per-user index, so only one user-month is held at once
+    rows = c.connection.execute(f"""
+    SELECT user_id, strftime('%Y-%m', {date_column}), {', '.join(columns)}
+    FROM {table}
+    WHERE {date_column} < ?
+    ORDER BY user_id, {date_column}
+    """, (cutoff,))
+    block_key, block, archived = None, [], 0
+    for user_id, month, *values in rows:
+        if (user_id, month) != block_key:
+            if block:
+                write_block(c, table, *block_key, columns, block)
+            block_key, block = (user_id, month), []
+        block.append(values)
+        archived += 1
+    if block:
+        write_block(c, table, *block_key, columns, block)
+
+    if table == 'transactions':
+        # The archived rows' jobs can never apply again; dropping them keeps the outbox from growing with history
+        c.execute("""
+        DELETE FROM outbox
+        WHERE json_extract(payload, '$.transaction_id') IN (SELECT id FROM transactions WHERE transaction_date < ?)
+        """, (cutoff,))
+        c.execute("""
+        INSERT INTO transactions_monthly (user_id, month, category, count, amount, roundup_amount)
+        SELECT user_id, strftime('%Y-%m', transaction_date), category, COUNT(*), SUM(amount), SUM(roundup_amount)
+        FROM transactions WHERE transaction_date < ?
+        GROUP BY user_id, strftime('%Y-%m', transaction_date), category
+        ON CONFLICT (user_id, month, category) DO UPDATE SET
+            count = count + excluded.count,
+            amount = amount + excluded.amount,
+            roundup_amount = roundup_amount + excluded.roundup_amount
+        """, (cutoff,))
+    else:
+        c.execute("""
+        INSERT INTO savings_monthly (user_id, month, allocation_type, count, amount)
+        SELECT user_id, strftime('%Y-%m', saving_date), allocation_type, COUNT(*), SUM(amount)
+        FROM savings WHERE saving_date < ?
+        GROUP BY user_id, strftime('%Y-%m', saving_date), allocation_type
+        ON CONFLICT (user_id, month, allocation_type) DO UPDATE SET
+            count = count + excluded.count,
+            amount = amount + excluded.amount
+        """, (cutoff,))
+    c.execute(f"DELETE FROM {table} WHERE {date_column} < ?", (cutoff,))
+    return archived
+
+
+def archive_database(path, cutoff):
+    """Archive one hot database file; returns rows moved per table"""
+    # Post queued round-ups first, so no job is left pointing at an archived transaction
+    while startive_core.process_shard_outbox(path):
+        pass
+
+    conn = sqlite3.connect(path)
+    conn.isolation_level = None
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive", (startive_core.archive_path(path),))
+        # One transaction over both files: the rows leave the hot tables exactly when their blocks land
+        conn.execute("BEGIN IMMEDIATE")
+        c = conn.cursor()
+        create_archive_tables(c)
+        moved = {table: archive_table(c, table, cutoff) for table in ARCHIVED_TABLES}
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    if any(moved.values()):
+        # Hand the freed pages back so the hot file actually shrinks
+        conn = sqlite3.connect(path)
+        conn.execute("VACUUM")
+        conn.close()
+    return moved
+
+
+def run(days=ARCHIVE_AFTER_DAYS):
+    """Archive rows older than ``days`` in every shard; returns rows moved per file and table"""
+    startive_core.init_db()
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    return {path: archive_database(path, cutoff) for path in startive_core.shard_paths()}
+
+
+def status():
+    startive_core.init_db()
+    print(f"{'file':<40} {'hot rows':>10} {'archived':>10} {'archive MB':>11}")
+    for path in startive_core.shard_paths():
+        conn = sqlite3.connect(path)
+        hot = sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ARCHIVED_TABLES)
+        conn.close()
+        archived, size = 0, 0.0
+        archive = startive_core.archive_path(path)
+        if os.path.exists(archive):
+            conn = sqlite3.connect(archive)
+            archived = conn.execute("SELECT COALESCE(SUM(row_count), 0) FROM archive_blocks").fetchone()[0]
+            conn.close()
+            size = os.path.getsize(archive) / 1e6
+        print(f"{path:<40} {hot:>10} {archived:>10} {size:>11.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='Archive rows older than the horizon')
+    run_parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS,
+                            help='Horizon in days (default: STARTIVE_ARCHIVE_AFTER_DAYS or 365)')
+    subparsers.add_parser('status', help='Hot and archived rows per database file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        status()
+        return
+    for path, moved in run(args.days).items():
+        print(f"{path}: archived {moved}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,824 @@
+"""Startive data and analysis layer
+
+Database access, round-up savings and spending analysis with no Streamlit
+dependency, so batch jobs, workers and benchmarks can call them directly.
+app.py renders these through Streamlit.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import query_profiler
+import spending_stream
+from instrumentation import timed
+
+# Database setup
+DB_PATH = os.environ.get('STARTIVE_DB_PATH', 'startive.db')
+# With more than one shard, DB_PATH keeps users and auth and the per-user tables (transactions,
+# savings, goals, their rollup and outbox) are spread over SHARD_COUNT files by hashed user_id
+SHARD_COUNT = int(os.environ.get('STARTIVE_SHARDS', '1'))
+
+def connect(path):
+    """Open a connection to one database file, profiled when STARTIVE_QUERY_PROFILE is set"""
+    if query_profiler.profiling_enabled():
+        return query_profiler.connect(path)
+    return sqlite3.connect(path)
+
+def shard_path(index, shard_count=None):
+    """File of shard ``index`` in a ``shard_count``-way layout, e.g. startive.2-of-4.db"""
+    shard_count = shard_count or SHARD_COUNT
+    if shard_count <= 1:
+        return DB_PATH
+    root, ext = os.path.splitext(DB_PATH)
+    return f"{root}.{index}-of-{shard_count}{ext}"
+
+def shard_paths(shard_count=None):
+    """Every file holding per-user tables; just DB_PATH when unsharded"""
+    shard_count = shard_count or SHARD_COUNT
+    return [shard_path(i, shard_count) for i in range(max(shard_count, 1))]
+
+def shard_index(user_id, shard_count=None):
+    """Shard owning ``user_id``; a stable hash so ids that arrive in sequence still spread evenly"""
+    shard_count = shard_count or SHARD_COUNT
+    if shard_count <= 1:
+        return 0
+    digest = hashlib.blake2b(str(user_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shard_count
+
+def get_connection(user_id=None):
+    """Open a connection to the database holding ``user_id``'s rows, or the users database"""
+    if user_id is None:
+        return connect(DB_PATH)
+    return connect(shard_path(shard_index(user_id)))
+
+# Bump when the schema changes and add the matching step to init_db; databases already at
+# this version skip schema setup with a single PRAGMA read
+SCHEMA_VERSION = 7
+
+# How add_transaction's round-up posting is processed: 'thread' (background worker in the app
+# process), 'external' (a separate `python startive_worker.py work` process) or 'sync' (inline)
+QUEUE_MODE = os.environ.get('STARTIVE_QUEUE_MODE', 'thread')
+OUTBOX_BATCH_SIZE = 500
+# A job that keeps failing is parked as 'failed' after this many attempts
+OUTBOX_MAX_ATTEMPTS = 5
+
+@timed()
+def init_db():
+    """Bring the users database and every shard up to SCHEMA_VERSION; returns the lowest version found"""
+    paths = [DB_PATH] + [path for path in shard_paths() if path != DB_PATH]
+    return min(migrate(path) for path in paths)
+
+def migrate(path):
+    """Bring one database file up to SCHEMA_VERSION, recorded in PRAGMA user_version
+
+    Every file gets the full schema; tables a file doesn't own in a sharded
+    layout simply stay empty.
+    """
+    conn = connect(path)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return version
+
+        # Take the write lock, then re-check, so concurrent processes migrate only once
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            c = conn.cursor()
+            if version < 1:
+                create_tables(c)
+            if version < 2:
+                create_user_indexes(c)
+            if version < 3:
+                create_outbox(c)
+            if version < 4:
+                create_archive_summaries(c)
+            if version < 5:
+                spending_stream.create_spending_tables(c)
+            if version < 6:
+                create_savings_totals(c)
+            if version < 7:
+                create_transaction_sequence(c)
+            c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+        return max(version, SCHEMA_VERSION)
+    finally:
+        conn.close()
+
+def create_user_indexes(c):
+    """Schema version 2: every per-user read filters on user_id, so index it instead of scanning"""
+    c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions (user_id, transaction_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_savings_user_date ON savings (user_id, saving_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_goals_user ON goals (user_id)")
+
+def create_outbox(c):
+    """Schema version 3: job outbox, idempotent savings postings and the daily savings rollup"""
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        idempotency_key TEXT UNIQUE NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        processed_at TIMESTAMP
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, id)")
+
+    # The key of the job that posted a savings row, so replaying a job never double-posts
+    columns = [row[1] for row in c.execute("PRAGMA table_info(savings)").fetchall()]
+    if 'posting_key' not in columns:
+        c.execute("ALTER TABLE savings ADD COLUMN posting_key TEXT")
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_savings_posting_key ON savings (posting_key)")
+
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS savings_daily (
+        user_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        total REAL NOT NULL DEFAULT 0.0,
+        PRIMARY KEY (user_id, day)
+    )
+    ''')
+    rebuild_savings_daily(c)
+
+def create_archive_summaries(c):
+    """Schema version 4: monthly totals of rows moved to the archive by startive_archive.py"""
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS transactions_monthly (
+        user_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        category TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        roundup_amount REAL NOT NULL,
+        PRIMARY KEY (user_id, month, category)
+    )
+    ''')
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS savings_monthly (
+        user_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        allocation_type TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        PRIMARY KEY (user_id, month, allocation_type)
+    )
+    ''')
+
+def create_savings_totals(c):
+    """Schema version 6: per-user savings total and a version bumped on every posting, for caching"""
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS savings_totals (
+        user_id INTEGER PRIMARY KEY,
+        total REAL NOT NULL DEFAULT 0.0,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    rebuild_savings_totals(c)
+
+def create_transaction_sequence(c):
+    """Schema version 7: AUTOINCREMENT transaction ids, so ids freed by archival are never handed out again
+
+    Outbox idempotency keys and savings.posting_key embed the transaction id; a
+    reused id would match an old finished job and the new transaction's
+    round-up and analysis would be dropped as duplicates.
+    """
+    c.execute('''
+    CREATE TABLE transactions_v7 (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT NOT NULL,
+        description TEXT,
+        transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        roundup_amount REAL DEFAULT 0.0,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+    c.execute("""
+    INSERT INTO transactions_v7 (id, user_id, amount, category, description, transaction_date, roundup_amount)
+    SELECT id, user_id, amount, category, description, transaction_date, roundup_amount FROM transactions
+    """)
+    c.execute("DROP TABLE transactions")
+    c.execute("ALTER TABLE transactions_v7 RENAME TO transactions")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions (user_id, transaction_date)")
+
+    # Continue past every id already used in a key, including those of rows archived before this version
+    c.execute("""
+    SELECT MAX(
+        (SELECT COALESCE(MAX(id), 0) FROM transactions),
+        (SELECT COALESCE(MAX(CAST(json_extract(payload, '$.transaction_id') AS INTEGER)), 0) FROM outbox),
+        (SELECT COALESCE(MAX(CAST(substr(posting_key, instr(posting_key, ':') + 1) AS INTEGER)), 0) FROM savings)
+    )
+    """)
+    last_id = c.fetchone()[0]
+    c.execute("DELETE FROM sqlite_sequence WHERE name = 'transactions'")
+    c.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('transactions', ?)", (last_id,))
+
+def rebuild_savings_rollup(c):
+    """Recompute the per-user daily and overall savings totals from the savings table
+
+    Only valid before any savings have been archived: archived days live
+    on in savings_daily alone.
+    """
+    rebuild_savings_daily(c)
+    rebuild_savings_totals(c)
+
+def rebuild_savings_daily(c):
+    c.execute("DELETE FROM savings_daily")
+    c.execute("""
+    INSERT INTO savings_daily (user_id, day, total)
+    SELECT user_id, date(saving_date), SUM(amount)
+    FROM savings
+    GROUP BY user_id, date(saving_date)
+    """)
+
+def rebuild_savings_totals(c):
+    """Recompute the per-user savings totals from savings_daily, moving every version on"""
+    c.execute("UPDATE savings_totals SET total = 0.0, version = version + 1")
+    c.execute("""
+    INSERT INTO savings_totals (user_id, total, version)
+    SELECT user_id, SUM(total), 1 FROM savings_daily GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE SET total = excluded.total, version = version + 1
+    """)
+
+def create_tables(c):
+    """Schema version 1: users, transactions, savings and goals"""
+    # Create users table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        subscription_tier TEXT DEFAULT 'basic',
+        risk_preference TEXT DEFAULT 'moderate',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Create transactions table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT NOT NULL,
+        description TEXT,
+        transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        roundup_amount REAL DEFAULT 0.0,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+    # Create savings table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS savings (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        source TEXT,
+        saving_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        allocation_type TEXT,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+    # Create goals table
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS goals (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        target_amount REAL NOT NULL,
+        current_amount REAL DEFAULT 0.0,
+        deadline TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+# Helper functions
+def is_admin(user):
+    """Admins are listed by username in the STARTIVE_ADMINS environment variable"""
+    admins = [name.strip() for name in os.environ.get('STARTIVE_ADMINS', '').split(',') if name.strip()]
+    return user['username'] in admins
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def verify_password(stored_hash, provided_password):
+    return stored_hash == hashlib.sha256(provided_password.encode()).hexdigest()
+
+@timed()
+def register_user(username, email, password):
+    conn = get_connection()
+    c = conn.cursor()
+
+    try:
+        password_hash = hash_password(password)
+        c.execute("INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+                 (username, email, password_hash))
+        conn.commit()
+        return True
+    except sqlite3.IntegrityError:
+        return False
+    finally:
+        conn.close()
+
+@timed()
+def authenticate_user(email, password):
+    conn = get_connection()
+    c = conn.cursor()
+
+    c.execute("SELECT id, username, password_hash, subscription_tier, risk_preference FROM users WHERE email = ?", (email,))
+    user = c.fetchone()
+    conn.close()
+
+    if user and verify_password(user[2], password):
+        return {"id": user[0], "username": user[1], "subscription_tier": user[3], "risk_preference": user[4]}
+    return None
+
+def roundup_amount(amount):
+    """Spare change saved when ``amount`` is rounded up to the next whole dollar"""
+    decimal_part = amount - int(amount)
+    if decimal_part > 0:
+        return round(1 - decimal_part, 2)
+    return 0.0
+
+@timed()
+def add_transaction(user_id, amount, category, description):
+    """Record a transaction; its round-up is posted to savings by the outbox worker"""
+    conn = get_connection(user_id)
+    c = conn.cursor()
+
+    roundup = roundup_amount(amount)
+
+    c.execute("""
+    INSERT INTO transactions (user_id, amount, category, description, roundup_amount)
+    VALUES (?, ?, ?, ?, ?)
+    """, (user_id, amount, category, description, roundup))
+
+    # Queue follow-up work in the same transaction, so it happens if and only if the row exists
+    transaction_id = c.lastrowid
+    if roundup > 0:
+        enqueue_job(c, 'roundup', f"roundup:{transaction_id}", {'transaction_id': transaction_id})
+    enqueue_job(c, 'analyze', f"analyze:{transaction_id}", {'transaction_id': transaction_id})
+
+    conn.commit()
+    conn.close()
+
+    if QUEUE_MODE == 'sync':
+        process_outbox()
+
+def enqueue_job(c, kind, idempotency_key, payload):
+    """Add a job to the outbox on cursor ``c``; a job with the same key is only queued once"""
+    c.execute(
+        "INSERT OR IGNORE INTO outbox (kind, idempotency_key, payload) VALUES (?, ?, ?)",
+        (kind, idempotency_key, json.dumps(payload)),
+    )
+
+def post_roundup(c, key, payload):
+    """Outbox handler: move a transaction's round-up into savings and the daily rollup"""
+    c.execute(
+        "SELECT user_id, roundup_amount, transaction_date FROM transactions WHERE id = ?",
+        (payload['transaction_id'],),
+    )
+    row = c.fetchone()
+    if row is None or row[1] <= 0:
+        return
+    user_id, roundup, transaction_date = row
+    if SHARD_COUNT <= 1:
+        # Same file as the batch's write lock, so read through it rather than a second connection
+        c.execute("SELECT risk_preference FROM users WHERE id = ?", (user_id,))
+        risk_preference = c.fetchone()[0]
+    else:
+        risk_preference = get_user_risk_preference(user_id)
+    allocation = determine_allocation(risk_preference)
+
+    c.execute("""
+    INSERT OR IGNORE INTO savings (user_id, amount, source, saving_date, allocation_type, posting_key)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, (user_id, roundup, "roundup", transaction_date, allocation, key))
+    if c.rowcount == 1:
+        c.execute("""
+        INSERT INTO savings_daily (user_id, day, total) VALUES (?, date(?), ?)
+        ON CONFLICT (user_id, day) DO UPDATE SET total = total + excluded.total
+        """, (user_id, transaction_date, roundup))
+        c.execute("""
+        INSERT INTO savings_totals (user_id, total, version) VALUES (?, ?, 1)
+        ON CONFLICT (user_id) DO UPDATE SET total = total + excluded.total, version = version + 1
+        """, (user_id, roundup))
+
+def analyze_transaction(c, key, payload):
+    """Outbox handler: fold a transaction into the streaming spending analytics"""
+    c.execute(
+        "SELECT user_id, amount, category, description, transaction_date FROM transactions WHERE id = ?",
+        (payload['transaction_id'],),
+    )
+    row = c.fetchone()
+    if row is not None:
+        spending_stream.observe_transaction(c, *row)
+
+JOB_HANDLERS = {
+    'roundup': post_roundup,
+    'analyze': analyze_transaction,
+}
+
+@timed()
+def process_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """Apply up to ``batch_size`` pending jobs from each shard's outbox; returns the number handled"""
+    return sum(process_shard_outbox(path, batch_size) for path in shard_paths())
+
+def process_shard_outbox(path, batch_size=OUTBOX_BATCH_SIZE):
+    """Apply up to ``batch_size`` pending jobs of one database in one write transaction
+
+    Each job runs inside a savepoint, so a failing job is rolled back on its
+    own and retried on a later batch until OUTBOX_MAX_ATTEMPTS.
+    """
+    conn = connect(path)
+    conn.isolation_level = None
+    try:
+        # Idle polls only read, so an empty queue never holds up writers
+        if conn.execute("SELECT 1 FROM outbox WHERE status = 'pending' LIMIT 1").fetchone() is None:
+            return 0
+        # The write lock makes concurrent workers take turns instead of claiming the same jobs
+        conn.execute("BEGIN IMMEDIATE")
+        c = conn.cursor()
+        c.execute(
+            "SELECT id, kind, idempotency_key, payload FROM outbox WHERE status = 'pending' ORDER BY id LIMIT ?",
+            (batch_size,),
+        )
+        jobs = c.fetchall()
+        for job_id, kind, key, payload in jobs:
+            c.execute("SAVEPOINT job")
+            try:
+                JOB_HANDLERS[kind](c, key, json.loads(payload))
+            except Exception as e:
+                c.execute("ROLLBACK TO job")
+                c.execute("""
+                UPDATE outbox
+                SET attempts = attempts + 1, last_error = ?,
+                    status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END
+                WHERE id = ?
+                """, (repr(e), OUTBOX_MAX_ATTEMPTS, job_id))
+            else:
+                c.execute(
+                    "UPDATE outbox SET status = 'done', attempts = attempts + 1, processed_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (job_id,),
+                )
+            c.execute("RELEASE job")
+        conn.execute("COMMIT")
+        return len(jobs)
+    finally:
+        conn.close()
+
+def outbox_stats():
+    """Queue depth and lag across shards: pending and failed job counts and the age of the oldest pending job"""
+    stats = {'pending': 0, 'failed': 0, 'lag_seconds': 0.0}
+    for path in shard_paths():
+        conn = connect(path)
+        c = conn.cursor()
+
+        c.execute("""
+        SELECT
+            SUM(status = 'pending'),
+            SUM(status = 'failed'),
+            (julianday('now') - julianday(MIN(CASE WHEN status = 'pending' THEN created_at END))) * 86400
+        FROM outbox
+        """)
+        pending, failed, lag = c.fetchone()
+        conn.close()
+
+        stats['pending'] += pending or 0
+        stats['failed'] += failed or 0
+        stats['lag_seconds'] = max(stats['lag_seconds'], lag or 0.0)
+    return stats
+
+def prune_outbox(older_than_days=7):
+    """Delete finished jobs; savings.posting_key still guards against replays after they are gone"""
+    deleted = 0
+    for path in shard_paths():
+        conn = connect(path)
+        c = conn.cursor()
+
+        c.execute(
+            "DELETE FROM outbox WHERE status = 'done' AND processed_at < datetime('now', ?)",
+            (f"-{older_than_days} days",),
+        )
+        deleted += c.rowcount
+
+        conn.commit()
+        conn.close()
+    return deleted
+
+@timed()
+def get_user_risk_preference(user_id):
+    conn = get_connection()
+    c = conn.cursor()
+
+    c.execute("SELECT risk_preference FROM users WHERE id = ?", (user_id,))
+    risk = c.fetchone()[0]
+
+    conn.close()
+    return risk
+
+def determine_allocation(risk_preference):
+    """Determine allocation type based on user risk preference"""
+    if risk_preference == 'conservative':
+        options = ['high-yield savings'] * 7 + ['ETF'] * 3
+    elif risk_preference == 'moderate':
+        options = ['high-yield savings'] * 5 + ['ETF'] * 4 + ['crypto'] * 1
+    elif risk_preference == 'aggressive':
+        options = ['high-yield savings'] * 3 + ['ETF'] * 5 + ['crypto'] * 2
+    else:
+        options = ['high-yield savings'] * 5 + ['ETF'] * 5
+
+    return np.random.choice(options)
+
+@timed()
+def get_transactions(user_id, limit=5):
+    conn = get_connection(user_id)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    c.execute("""
+    SELECT id, amount, category, description, transaction_date, roundup_amount
+    FROM transactions
+    WHERE user_id = ?
+    ORDER BY transaction_date DESC
+    LIMIT ?
+    """, (user_id, limit))
+
+    transactions = [dict(row) for row in c.fetchall()]
+    conn.close()
+
+    return transactions
+
+@timed()
+def get_total_savings(user_id):
+    conn = get_connection(user_id)
+    c = conn.cursor()
+
+    c.execute("SELECT total FROM savings_totals WHERE user_id = ?", (user_id,))
+    row = c.fetchone()
+
+    conn.close()
+    return row[0] if row else 0
+
+@timed()
+def get_savings_version(user_id):
+    """Counter that moves whenever ``user_id``'s savings change; cache savings reads on it"""
+    conn = get_connection(user_id)
+    c = conn.cursor()
+
+    c.execute("SELECT version FROM savings_totals WHERE user_id = ?", (user_id,))
+    row = c.fetchone()
+
+    conn.close()
+    return row[0] if row else 0
+
+@timed()
+def get_savings_by_date(user_id):
+    conn = get_connection(user_id)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    c.execute("""
+    SELECT day as date, total
+    FROM savings_daily
+    WHERE user_id = ?
+    ORDER BY day
+    """, (user_id,))
+
+    savings = [dict(row) for row in c.fetchall()]
+    conn.close()
+
+    return savings
+
+@timed()
+def get_allocation_data(user_id):
+    conn = get_connection(user_id)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    # Recent rows plus the monthly totals of archived ones
+    c.execute("""
+    SELECT allocation_type, SUM(total) as total
+    FROM (
+        SELECT allocation_type, SUM(amount) as total FROM savings WHERE user_id = ? GROUP BY allocation_type
+        UNION ALL
+        SELECT allocation_type, SUM(amount) FROM savings_monthly WHERE user_id = ? GROUP BY allocation_type
+    )
+    GROUP BY allocation_type
+    """, (user_id, user_id))
+
+    allocations = [dict(row) for row in c.fetchall()]
+    conn.close()
+
+    return allocations
+
+@timed()
+def get_goals(user_id):
+    conn = get_connection(user_id)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    c.execute("""
+    SELECT id, name, target_amount, current_amount, deadline
+    FROM goals
+    WHERE user_id = ?
+    """, (user_id,))
+
+    goals = [dict(row) for row in c.fetchall()]
+
+    # Calculate progress for each goal
+    for goal in goals:
+        if goal['target_amount'] > 0:
+            goal['progress'] = (goal['current_amount'] / goal['target_amount']) * 100
+        else:
+            goal['progress'] = 0
+
+    conn.close()
+    return goals
+
+def archive_path(path):
+    """Archive file paired with database ``path``, e.g. startive.archive.db"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.archive{ext}"
+
+def iter_archived_rows(user_id, table, start=None, end=None):
+    """Yield ``user_id``'s archived rows of ``table`` as dicts, one decompressed monthly block at a time
+
+    ``start`` and ``end`` are 'YYYY-MM' months bounding the blocks read.
+    """
+    path = archive_path(shard_path(shard_index(user_id)))
+    if not os.path.exists(path):
+        return
+    conn = connect(path)
+    try:
+        c = conn.cursor()
+        c.execute("""
+        SELECT payload FROM archive_blocks
+        WHERE table_name = ? AND user_id = ? AND month >= ? AND month <= ?
+        ORDER BY month, id
+        """, (table, user_id, start or '0000-00', end or '9999-99'))
+        for (payload,) in c:
+            block = json.loads(zlib.decompress(payload))
+            for row in block['rows']:
+                yield dict(zip(block['columns'], row))
+    finally:
+        conn.close()
+
+@timed()
+def get_transaction_history(user_id):
+    """Every transaction of ``user_id``, archived and recent, oldest first; reads the archive on demand"""
+    history = list(iter_archived_rows(user_id, 'transactions'))
+
+    conn = get_connection(user_id)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+
+    c.execute("""
+    SELECT id, amount, category, description, transaction_date, roundup_amount
+    FROM transactions
+    WHERE user_id = ?
+    ORDER BY transaction_date
+    """, (user_id,))
+
+    history.extend(dict(row) for row in c.fetchall())
+    conn.close()
+    return history
+
+@timed()
+def get_savings_opportunities(user_id):
+    """Recurring charges and recent unusual spends found by the streaming analytics"""
+    conn = get_connection(user_id)
+    c = conn.cursor()
+
+    opportunities = spending_stream.savings_opportunities(c, user_id)
+
+    conn.close()
+    return opportunities
+
+@timed()
+def add_goal(user_id, name, target_amount, deadline=None):
+    conn = get_connection(user_id)
+    c = conn.cursor()
+
+    c.execute("""
+    INSERT INTO goals (user_id, name, target_amount, deadline)
+    VALUES (?, ?, ?, ?)
+    """, (user_id, name, target_amount, deadline))
+
+    conn.commit()
+    conn.close()
+
+@timed()
+def update_risk_preference(user_id, risk_preference):
+    conn = get_connection()
+    c = conn.cursor()
+
+    c.execute("UPDATE users SET risk_preference = ? WHERE id = ?", (risk_preference, user_id))
+
+    conn.commit()
+    conn.close()
+
+@timed()
+def update_subscription(user_id, tier):
+    conn = get_connection()
+    c = conn.cursor()
+
+    c.execute("UPDATE users SET subscription_tier = ? WHERE id = ?", (tier, user_id))
+
+    conn.commit()
+    conn.close()
+
+@timed()
+def ai_chatbot_response(question, user_id):
+    """Simple rule-based AI chatbot responses"""
+    question = question.lower()
+
+    if 'how much' in question and ('save' in question or 'saving' in question):
+        opportunities = get_savings_opportunities(user_id)
+        recurring, anomalies = opportunities['recurring'], opportunities['anomalies']
+        if not recurring and not anomalies:
+            total_savings = get_total_savings(user_id)
+            return f"Based on your recent transactions, you can safely save approximately ${total_savings * 0.1:.2f} per month."
+
+        advice = []
+        if recurring:
+            top = recurring[0]
+            advice.append(f"You have {len(recurring)} recurring charge(s) costing about "
+                          f"${opportunities['recurring_monthly']:.2f} per month (largest: {top['description']}, "
+                          f"${top['monthly_cost']:.2f}/month); cancelling the ones you don't use saves that every month.")
+        if anomalies:
+            advice.append(f"{len(anomalies)} purchase(s) in the last 30 days were well above your usual spending; "
+                          f"keeping them to your normal amounts would have saved ${opportunities['anomaly_excess']:.2f}.")
+        return ' '.join(advice)
+
+    elif 'investment' in question or 'invest' in question:
+        risk_preference = get_user_risk_preference(user_id)
+        if risk_preference == 'conservative':
+            return "With your conservative risk profile, I recommend focusing on high-yield savings accounts and stable ETFs."
+        elif risk_preference == 'moderate':
+            return "With your moderate risk profile, a balanced approach of ETFs and some high-yield savings would work well."
+        else:
+            return "With your aggressive risk profile, you might consider a higher allocation to ETFs and some cryptocurrency exposure."
+
+    elif 'goal' in question:
+        goals = get_goals(user_id)
+        if not goals:
+            return "You haven't set any financial goals yet. Would you like to create one?"
+
+        closest_goal = sorted(goals, key=lambda g: g['progress'])[0]
+        return f"You're making progress on your '{closest_goal['name']}' goal! You're {closest_goal['progress']:.1f}% of the way there."
+
+    else:
+        return "I'm here to help with your financial questions. You can ask about savings recommendations, investment strategies, your goals, or roundup savings."
+
+# Alternative implementation for KMeans clustering
+@timed()
+def analyze_spending(transactions):
+    """Simple spending analysis without sklearn dependency"""
+    if not transactions:
+        return "No spending data available."
+
+    # Convert to DataFrame
+    df = pd.DataFrame(transactions)
+
+    # Basic statistics
+    total_spent = df['amount'].sum()
+    avg_transaction = df['amount'].mean()
+    highest_category = df.groupby('category')['amount'].sum().idxmax()
+
+    # Simple spending clusters (low, medium, high) without KMeans
+    df['amount_percentile'] = df['amount'].rank(pct=True)
+
+    # Assign clusters based on percentiles instead of KMeans
+    conditions = [
+        df['amount_percentile'] < 0.33,
+        (df['amount_percentile'] >= 0.33) & (df['amount_percentile'] < 0.67),
+        df['amount_percentile'] >= 0.67
+    ]
+    values = ['low', 'medium', 'high']
+    df['spending_cluster'] = np.select(conditions, values, default='low')
+
+    return {
+        'data': df,
+        'summary': {
+            'total_spent': total_spent,
+            'avg_transaction': avg_transaction,
+            'highest_category': highest_category
+        }
+    }
@@ -0,0 +1,182 @@
+"""Streaming export of a user's full Startive history to CSV or Parquet
+
+Rows are read in fetchmany chunks, archived months first and then the hot
+tables, and written as they arrive, so memory stays flat however long the
+history is. The Profile page offers the same export as a download:
+
+    python startive_export.py --user-id 42 --format parquet --output exports/
+    python startive_export.py --email someone@example.com --table transactions
+"""
+
+import argparse
+import csv
+import io
+import os
+from operator import itemgetter
+import sys
+import tempfile
+
+import startive_core
+
+EXPORT_CHUNK_SIZE = 10_000
+FORMATS = ('csv', 'parquet')
+
+# Exported columns per table, their Parquet types and the column rows are ordered by
+EXPORT_TABLES = {
+    'transactions': {
+        'columns': [('id', 'int64'), ('amount', 'float64'), ('category', 'string'), ('description', 'string'),
+                    ('transaction_date', 'timestamp'), ('roundup_amount', 'float64')],
+        'order_by': 'transaction_date, id',
+        'archived': True,
+    },
+    'savings': {
+        'columns': [('id', 'int64'), ('amount', 'float64'), ('source', 'string'), ('saving_date', 'timestamp'),
+                    ('allocation_type', 'string')],
+        'order_by': 'saving_date, id',
+        'archived': True,
+    },
+    'goals': {
+        'columns': [('id', 'int64'), ('name', 'string'), ('target_amount', 'float64'), ('current_amount', 'float64'),
+                    ('deadline', 'timestamp'), ('created_at', 'timestamp')],
+        'order_by': 'id',
+        'archived': False,
+    },
+}
+
+
+def column_names(table):
+    return [name for name, _ in EXPORT_TABLES[table]['columns']]
+
+
+def iter_chunks(user_id, table, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield lists of up to ``chunk_size`` row tuples of ``user_id``'s ``table``, oldest first"""
+    spec = EXPORT_TABLES[table]
+    names = column_names(table)
+
+    if spec['archived']:
+        as_tuple = itemgetter(*names)
+        chunk = []
+        for row in startive_core.iter_archived_rows(user_id, table):
+            chunk.append(as_tuple(row))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    conn = startive_core.get_connection(user_id)
+    try:
+        c = conn.cursor()
+        c.arraysize = chunk_size
+        c.execute(f"SELECT {', '.join(names)} FROM {table} WHERE user_id = ? ORDER BY {spec['order_by']}", (user_id,))
+        while True:
+            chunk = c.fetchmany()
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        conn.close()
+
+
+def write_csv(user_id, table, fh, chunk_size=EXPORT_CHUNK_SIZE):
+    """Write ``table`` as CSV to text file ``fh``; returns the number of rows"""
+    writer = csv.writer(fh)
+    writer.writerow(column_names(table))
+    rows = 0
+    for chunk in iter_chunks(user_id, table, chunk_size):
+        writer.writerows(chunk)
+        rows += len(chunk)
+    return rows
+
+
+def parquet_schema(table):
+    import pyarrow as pa
+
+    types = {'int64': pa.int64(), 'float64': pa.float64(), 'string': pa.string(), 'timestamp': pa.timestamp('s')}
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_TABLES[table]['columns']])
+
+
+def write_parquet(user_id, table, fh, chunk_size=EXPORT_CHUNK_SIZE):
+    """Write ``table`` as Parquet to binary file ``fh``, one row group per chunk; returns the number of rows"""
+    # pyarrow ships with Streamlit but the CSV export and the rest of the data layer don't need it
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(table)
+    rows = 0
+    with pq.ParquetWriter(fh, schema, compression='zstd') as writer:
+        for chunk in iter_chunks(user_id, table, chunk_size):
+            # Timestamps are stored as text in SQLite; Arrow parses them while casting
+            arrays = [
+                pa.array(values, type=pa.string()).cast(field.type) if field.type == pa.timestamp('s')
+                else pa.array(values, type=field.type)
+                for values, field in zip(zip(*chunk), schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def export_table(user_id, table, fmt, fh, chunk_size=EXPORT_CHUNK_SIZE):
+    """Write one table to ``fh`` (text for CSV, binary for Parquet); returns the number of rows"""
+    if fmt == 'csv':
+        return write_csv(user_id, table, fh, chunk_size)
+    return write_parquet(user_id, table, fh, chunk_size)
+
+
+def export_bytes(user_id, table, fmt):
+    """The finished export as bytes, for Streamlit's download button
+
+    Rows are spooled through a temporary file, so only the encoded file is
+    held in memory, never the rows or a second copy while writing.
+    """
+    with tempfile.TemporaryFile() as fh:
+        if fmt == 'csv':
+            text = io.TextIOWrapper(fh, encoding='utf-8', newline='')
+            export_table(user_id, table, fmt, text)
+            text.flush()
+            text.detach()
+        else:
+            export_table(user_id, table, fmt, fh)
+        fh.seek(0)
+        return fh.read()
+
+
+def find_user_id(email):
+    conn = startive_core.get_connection()
+    try:
+        row = conn.execute("SELECT id FROM users WHERE email = ?", (email,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise SystemExit(f"No user with email {email}")
+    return row[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument('--user-id', type=int)
+    who.add_argument('--email')
+    parser.add_argument('--table', choices=list(EXPORT_TABLES), action='append',
+                        help='Table to export; repeat for several (default: all)')
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--output', default='.', help='Directory for the exported files')
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    user_id = args.user_id if args.user_id is not None else find_user_id(args.email)
+    os.makedirs(args.output, exist_ok=True)
+    for table in args.table or list(EXPORT_TABLES):
+        path = os.path.join(args.output, f"startive_{user_id}_{table}.{args.format}")
+        if args.format == 'csv':
+            with open(path, 'w', newline='', encoding='utf-8') as fh:
+                rows = export_table(user_id, table, args.format, fh, args.chunk_size)
+        else:
+            with open(path, 'wb') as fh:
+                rows = export_table(user_id, table, args.format, fh, args.chunk_size)
+        print(f"{path}: {rows} rows", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
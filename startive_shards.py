@@ -0,0 +1,327 @@
+"""Shard layout report and resharding tool for the Startive databases
+
+STARTIVE_SHARDS=N spreads the per-user tables over N files next to
+STARTIVE_DB_PATH (startive.0-of-N.db, ...), routed by a hash of user_id,
+while users and auth stay in STARTIVE_DB_PATH. Moving to a different shard
+count copies every user's rows into the new layout's files; stop the app
+and any external worker first:
+
+    python startive_shards.py status
+    python startive_shards.py reshard 4 --from 1
+    STARTIVE_SHARDS=4 streamlit run app.py
+
+The outbox is drained before copying and is not carried over. Row ids and
+savings posting keys are kept, so a user's history and exports read the same
+in the new layout; only when files whose ids overlap are merged does the later
+file move past the ids already copied, its archive blocks rewritten to match.
+Rollups, archive summaries, spending state and archive blocks move with their
+users.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import zlib
+
+import startive_core
+from startive_archive import create_archive_tables
+
+# Columns copied per table; ids are kept unless merged files overlap
+SHARDED_TABLES = {
+    'transactions': ['id', 'user_id', 'amount', 'category', 'description', 'transaction_date', 'roundup_amount'],
+    'savings': ['id', 'user_id', 'amount', 'source', 'saving_date', 'allocation_type', 'posting_key'],
+    'goals': ['id', 'user_id', 'name', 'target_amount', 'current_amount', 'deadline', 'created_at'],
+}
+# Per-user rollups, archive summaries and spending state, copied as they are: archived rows can't be re-derived
+SUMMARY_TABLES = {
+    'savings_daily': ['user_id', 'day', 'total'],
+    'savings_totals': ['user_id', 'total', 'version'],
+    'transactions_monthly': ['user_id', 'month', 'category', 'count', 'amount', 'roundup_amount'],
+    'savings_monthly': ['user_id', 'month', 'allocation_type', 'count', 'amount'],
+    'category_stats': ['user_id', 'category', 'count', 'mean', 'var'],
+    'merchant_stats': ['user_id', 'merchant_hash', 'description', 'category', 'count', 'mean_amount',
+                       'last_amount', 'last_date', 'mean_interval', 'interval_dev', 'period'],
+    'spending_anomalies': ['user_id', 'category', 'description', 'amount', 'expected', 'zscore', 'transaction_date'],
+}
+ARCHIVE_COLUMNS = ['table_name', 'user_id', 'month', 'row_count', 'payload', 'archived_at']
+
+
+def table_counts(path):
+    """Rows per sharded table in one database file, plus the rows held in its archive"""
+    conn = sqlite3.connect(path)
+    try:
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in SHARDED_TABLES}
+    finally:
+        conn.close()
+    counts['archived'] = 0
+    archive = startive_core.archive_path(path)
+    if os.path.exists(archive):
+        conn = sqlite3.connect(archive)
+        counts['archived'] = conn.execute("SELECT COALESCE(SUM(row_count), 0) FROM archive_blocks").fetchone()[0]
+        conn.close()
+    return counts
+
+
+def layout_counts(shard_count):
+    """Rows per sharded table summed over every file of a layout"""
+    totals = dict.fromkeys(list(SHARDED_TABLES) + ['archived'], 0)
+    for path in startive_core.shard_paths(shard_count):
+        for table, count in table_counts(path).items():
+            totals[table] += count
+    return totals
+
+
+def status(shard_count):
+    columns = list(SHARDED_TABLES) + ['archived']
+    print(f"{'file':<40} " + ' '.join(f"{column:>12}" for column in columns))
+    for path in startive_core.shard_paths(shard_count):
+        counts = table_counts(path)
+        print(f"{path:<40} " + ' '.join(f"{counts[column]:>12}" for column in columns))
+    print(f"queue: {startive_core.outbox_stats()}")
+
+
+def drain_outbox():
+    """Post every queued job in the current layout, failing if any are left over"""
+    while startive_core.process_outbox():
+        pass
+    stats = startive_core.outbox_stats()
+    if stats['pending'] or stats['failed']:
+        raise SystemExit(f"Outbox still has {stats['pending']} pending and {stats['failed']} failed jobs; "
+                         "resolve them before resharding")
+
+
+def copy_to_layout(source_paths, shard_count):
+    """Copy every sharded row from ``source_paths`` into the ``shard_count`` layout, routed by user_id
+
+    Each target file is filled from every source in turn. Its transaction
+    sequence ends past every id it has seen, hot, archived or in a posting
+    key, so no id is handed out again after the move.
+    """
+    target_paths = startive_core.shard_paths(shard_count)
+    for path in target_paths:
+        startive_core.migrate(path)
+        if any(table_counts(path).values()):
+            raise SystemExit(f"{path} already holds per-user rows; refusing to copy into it")
+    archived = any(os.path.exists(startive_core.archive_path(source)) for source in source_paths)
+
+    for index, target in enumerate(target_paths):
+        conn = sqlite3.connect(target)
+        conn.create_function('shard_index', 1, lambda user_id: startive_core.shard_index(user_id, shard_count),
+                             deterministic=True)
+        try:
+            # Ids in the target so far and those of the source being copied, per sharded table
+            conn.execute("CREATE TEMP TABLE used_ids (table_name TEXT, id INTEGER, PRIMARY KEY (table_name, id))")
+            conn.execute("CREATE TEMP TABLE source_ids (table_name TEXT, id INTEGER, PRIMARY KEY (table_name, id))")
+            if archived:
+                conn.execute("ATTACH DATABASE ? AS archive", (startive_core.archive_path(target),))
+                with conn:
+                    create_archive_tables(conn.cursor())
+
+            sequence = 0
+            for source in source_paths:
+                source_archive = startive_core.archive_path(source)
+                conn.execute("ATTACH DATABASE ? AS source", (source,))
+                if os.path.exists(source_archive):
+                    conn.execute("ATTACH DATABASE ? AS source_archive", (source_archive,))
+                with conn:
+                    offsets = id_offsets(conn, index, os.path.exists(source_archive), sequence)
+                    for table, columns in SHARDED_TABLES.items():
+                        copy_rows(conn, f"source.{table}", f"main.{table}", columns, index,
+                                  shifted_columns(table, offsets))
+                    for table, columns in SUMMARY_TABLES.items():
+                        copy_rows(conn, f"source.{table}", f"main.{table}", columns, index)
+                    if os.path.exists(source_archive):
+                        copy_archive_blocks(conn, index, offsets)
+                    # The source may have handed out ids beyond any row it still holds
+                    row = conn.execute("SELECT seq FROM source.sqlite_sequence WHERE name = 'transactions'").fetchone()
+                    sequence = max(sequence, (row[0] if row else 0) + offsets['transactions'])
+                if os.path.exists(source_archive):
+                    conn.execute("DETACH DATABASE source_archive")
+                conn.execute("DETACH DATABASE source")
+
+            with conn:
+                conn.execute("DELETE FROM main.sqlite_sequence WHERE name = 'transactions'")
+                conn.execute("""
+                INSERT INTO main.sqlite_sequence (name, seq)
+                SELECT 'transactions', MAX(?, COALESCE(MAX(id), 0)) FROM temp.used_ids WHERE table_name = 'transactions'
+                """, (sequence,))
+        finally:
+            conn.close()
+
+
+def block_ids(block, table):
+    """Ids used by the rows of an archive block: its row ids, and for savings the posted transaction ids"""
+    columns = block['columns']
+    position = columns.index('id')
+    for row in block['rows']:
+        yield table, row[position]
+    if table == 'savings':
+        key_position = columns.index('posting_key')
+        for row in block['rows']:
+            if row[key_position] is not None:
+                yield 'transactions', int(row[key_position].split(':', 1)[1])
+
+
+def id_offsets(conn, index, archived, sequence):
+    """Offset added to each table's ids from the attached source: 0 unless they collide with the target's
+
+    Colliding transaction ids also move past ``sequence``, the target's
+    transaction sequence so far.
+    """
+    conn.execute("DELETE FROM temp.source_ids")
+    for table in SHARDED_TABLES:
+        conn.execute(f"""
+        INSERT OR IGNORE INTO temp.source_ids (table_name, id)
+        SELECT ?, id FROM source.{table} WHERE shard_index(user_id) = ?
+        """, (table, index))
+    conn.execute("""
+    INSERT OR IGNORE INTO temp.source_ids (table_name, id)
+    SELECT 'transactions', CAST(substr(posting_key, instr(posting_key, ':') + 1) AS INTEGER)
+    FROM source.savings WHERE posting_key IS NOT NULL AND shard_index(user_id) = ?
+    """, (index,))
+    if archived:
+        blocks = conn.execute("""
+        SELECT table_name, payload FROM source_archive.archive_blocks WHERE shard_index(user_id) = ?
+        """, (index,))
+        for table, payload in blocks:
+            conn.executemany("INSERT OR IGNORE INTO temp.source_ids (table_name, id) VALUES (?, ?)",
+                             block_ids(json.loads(zlib.decompress(payload)), table))
+
+    offsets = {}
+    for table in SHARDED_TABLES:
+        collides = conn.execute("""
+        SELECT EXISTS (SELECT 1 FROM temp.source_ids JOIN temp.used_ids USING (table_name, id) WHERE table_name = ?)
+        """, (table,)).fetchone()[0]
+        offsets[table] = conn.execute(
+            "SELECT MAX(?, COALESCE(MAX(id), 0)) FROM temp.used_ids WHERE table_name = ?",
+            (sequence if table == 'transactions' else 0, table),
+        ).fetchone()[0] if collides else 0
+        conn.execute("""
+        INSERT OR IGNORE INTO temp.used_ids (table_name, id)
+        SELECT table_name, id + ? FROM temp.source_ids WHERE table_name = ?
+        """, (offsets[table], table))
+    return offsets
+
+
+def shifted_columns(table, offsets):
+    """Select expressions moving a table's ids, and savings posting keys, by ``offsets``"""
+    expressions = {'id': f"id + {int(offsets[table])}"}
+    if table == 'savings':
+        expressions['posting_key'] = (
+            "substr(posting_key, 1, instr(posting_key, ':')) || "
+            f"(CAST(substr(posting_key, instr(posting_key, ':') + 1) AS INTEGER) + {int(offsets['transactions'])})"
+        )
+    return expressions
+
+
+def shift_block(payload, table, offsets):
+    """Archive block ``payload`` with its ids moved like the hot rows of its table"""
+    block = json.loads(zlib.decompress(payload))
+    columns = block['columns']
+    position = columns.index('id')
+    key_position = columns.index('posting_key') if table == 'savings' else None
+    for row in block['rows']:
+        row[position] += offsets[table]
+        if key_position is not None and row[key_position] is not None:
+            prefix, transaction_id = row[key_position].split(':', 1)
+            row[key_position] = f"{prefix}:{int(transaction_id) + offsets['transactions']}"
+    return zlib.compress(json.dumps(block).encode(), 6)
+
+
+def copy_archive_blocks(conn, index, offsets):
+    """Copy the attached source archive's blocks routed to shard ``index``, rewritten if ids moved"""
+    if not offsets['transactions'] and not offsets['savings']:
+        copy_rows(conn, "source_archive.archive_blocks", "archive.archive_blocks", ARCHIVE_COLUMNS, index)
+        return
+    blocks = conn.execute(f"""
+    SELECT {', '.join(ARCHIVE_COLUMNS)} FROM source_archive.archive_blocks
+    WHERE shard_index(user_id) = ?
+    ORDER BY rowid
+    """, (index,))
+    conn.executemany(
+        f"INSERT INTO archive.archive_blocks ({', '.join(ARCHIVE_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+        ((table, user_id, month, row_count, shift_block(payload, table, offsets), archived_at)
+         for table, user_id, month, row_count, payload, archived_at in blocks),
+    )
+
+
+def copy_rows(conn, source_table, target_table, columns, index, expressions=None):
+    """Copy the rows of ``source_table`` whose user_id routes to shard ``index``
+
+    ``expressions`` replaces the selected value of some columns, e.g. to move ids.
+    """
+    expressions = expressions or {}
+    selected = ', '.join(expressions.get(column, column) for column in columns)
+    conn.execute(f"""
+    INSERT INTO {target_table} ({', '.join(columns)})
+    SELECT {selected} FROM {source_table}
+    WHERE shard_index(user_id) = ?
+    ORDER BY rowid
+    """, (index,))
+
+
+def purge(source_paths):
+    """Remove the old layout: delete shard files, and empty the sharded tables of the users database"""
+    for path in source_paths:
+        archive = startive_core.archive_path(path)
+        if os.path.exists(archive):
+            os.remove(archive)
+        if path != startive_core.DB_PATH:
+            os.remove(path)
+            continue
+        conn = sqlite3.connect(path)
+        with conn:
+            for table in list(SHARDED_TABLES) + list(SUMMARY_TABLES) + ['outbox']:
+                conn.execute(f"DELETE FROM {table}")
+        conn.execute("VACUUM")
+        conn.close()
+
+
+def reshard(source_count, target_count, purge_source=False):
+    if max(source_count, 1) == max(target_count, 1):
+        raise SystemExit("Source and target layouts are the same")
+    missing = [path for path in startive_core.shard_paths(source_count) if not os.path.exists(path)]
+    if missing:
+        raise SystemExit(f"No {source_count}-shard layout here: {', '.join(missing)} not found")
+    startive_core.SHARD_COUNT = source_count
+    startive_core.init_db()
+    drain_outbox()
+
+    source_paths = startive_core.shard_paths(source_count)
+    before = layout_counts(source_count)
+    copy_to_layout(source_paths, target_count)
+    after = layout_counts(target_count)
+    if after != before:
+        raise SystemExit(f"Row counts differ after copying: {before} -> {after}")
+    print(f"Copied {before} into {target_count} shard(s)", file=sys.stderr)
+
+    if purge_source:
+        purge(source_paths)
+    print(f"Set STARTIVE_SHARDS={target_count} to use the new layout", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    status_parser = subparsers.add_parser('status', help='Rows per shard file and queue depth')
+    status_parser.add_argument('--shards', type=int, default=startive_core.SHARD_COUNT)
+    reshard_parser = subparsers.add_parser('reshard', help='Copy all per-user rows into a new shard layout')
+    reshard_parser.add_argument('shards', type=int, help='Target shard count')
+    reshard_parser.add_argument('--from', dest='source', type=int, default=startive_core.SHARD_COUNT,
+                                help='Current shard count (default: STARTIVE_SHARDS)')
+    reshard_parser.add_argument('--purge-source', action='store_true',
+                                help='Delete the old shard files and empty the old tables after a verified copy')
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        startive_core.SHARD_COUNT = args.shards
+        startive_core.init_db()
+        status(args.shards)
+    else:
+        reshard(args.source, args.shards, args.purge_source)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Outbox worker for Startive round-up postings
+
+add_transaction only records the transaction and queues its round-up in the
+outbox table; this worker posts queued jobs to savings and the daily rollup
+in batches. It runs as a daemon thread inside the app (STARTIVE_QUEUE_MODE=thread,
+the default) or as its own process (STARTIVE_QUEUE_MODE=external):
+
+    python startive_worker.py work
+    python startive_worker.py status
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+
+import startive_core
+
+POLL_INTERVAL = 1.0
+
+log = logging.getLogger(__name__)
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def run(stop_event=None, batch_size=startive_core.OUTBOX_BATCH_SIZE, poll_interval=POLL_INTERVAL):
+    """Process outbox batches until ``stop_event`` is set, sleeping only when the queue is empty"""
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        try:
+            processed = startive_core.process_outbox(batch_size)
+        except Exception:
+            # A locked or briefly unavailable database; the jobs stay queued for the next poll
+            log.exception("outbox batch failed")
+            processed = 0
+        if processed < batch_size:
+            stop_event.wait(poll_interval)
+
+
+def start_background_worker(batch_size=startive_core.OUTBOX_BATCH_SIZE, poll_interval=POLL_INTERVAL):
+    """Start the in-process worker thread once per process; returns its stop event"""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker[0].is_alive():
+            stop_event = threading.Event()
+            thread = threading.Thread(
+                target=run, args=(stop_event, batch_size, poll_interval),
+                name='startive-outbox', daemon=True,
+            )
+            thread.start()
+            _worker = (thread, stop_event)
+        return _worker[1]
+
+
+def drain(batch_size=startive_core.OUTBOX_BATCH_SIZE):
+    """Process every pending job now; returns the number handled"""
+    total = 0
+    while True:
+        processed = startive_core.process_outbox(batch_size)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    work = subparsers.add_parser('work', help='Process the outbox until interrupted')
+    work.add_argument('--batch-size', type=int, default=startive_core.OUTBOX_BATCH_SIZE)
+    work.add_argument('--poll-interval', type=float, default=POLL_INTERVAL, help='Seconds to sleep when idle')
+    work.add_argument('--once', action='store_true', help='Drain the pending jobs and exit')
+    subparsers.add_parser('status', help='Print queue depth and lag as JSON')
+    subparsers.add_parser('prune', help='Delete jobs finished more than a week ago')
+    args = parser.parse_args(argv)
+
+    startive_core.init_db()
+    if args.command == 'status':
+        print(json.dumps(startive_core.outbox_stats()))
+    elif args.command == 'prune':
+        print(f"Deleted {startive_core.prune_outbox()} finished jobs", file=sys.stderr)
+    elif args.once:
+        print(f"Processed {drain(args.batch_size)} jobs", file=sys.stderr)
+    else:
+        logging.basicConfig(level=logging.INFO)
+        try:
+            run(batch_size=args.batch_size, poll_interval=args.poll_interval)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,46 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.figure_factory as ff
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.svm import SVC
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.neural_network import MLPClassifier
-from sklearn.metrics import accuracy_score, confusion_matrix
+import os
+import tempfile
 import time
 
+import ml_pipeline
+from ml_pipeline import (
+    best_params,
+    build_estimators,
+    cv_summary,
+    evaluate_models,
+    fit_summary,
+    split_features,
+    train_models,
+)
+from ml_sample_data import make_bank_data
+from ml_exploration import DEFAULT_PLOT_SAMPLE_SIZE, file_fingerprint, profile_frame, sample_for_plots
+from ml_charts import (
+    box_figure,
+    box_stats,
+    category_counts,
+    category_histogram_figure,
+    histogram_counts,
+    numeric_histogram_figure,
+)
+from ml_registry import ModelRegistry
+from ml_scoring import DEFAULT_SCORING_CHUNK_SIZE, score_csv
+from ml_estimators import DEFAULT_TIME_BUDGETS, MODELS
+from ml_evaluation import cross_validate_models, make_folds, prepare_folds, search_hyperparameters
+from instrumentation import flush, panel_enabled, prometheus_text, summary, timed, timer
+from ml_importance import feature_groups, permutation_importance
+from ml_metrics import confusion_matrix_figure, curves_figure
+
+# scikit-learn estimators and plotly are imported when a model is trained or a chart is drawn,
+# so the upload page renders without loading them
+
+
+@st.cache_resource
+def get_model_registry():
+    return ModelRegistry()
+
+
 st.set_page_config(page_title="ML & GenAI Analysis", layout="wide")
 
 st.title("Machine Learning & GenAI Analysis Tool")
@@ -26,12 +55,38 @@ uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
 
 if uploaded_file is not None:
     # Load data
+    @timed()
     @st.cache_data
     def load_data(file):
-        data = pd.read_csv(file)
-        return data
+        return ml_pipeline.load_data(file)
     
     df = load_data(uploaded_file)
+    # Hash each upload once; reruns reuse the fingerprint until a different file is uploaded
+    if st.session_state.get('upload_fingerprint', (None, None))[0] != uploaded_file.file_id:
+        st.session_state['upload_fingerprint'] = (uploaded_file.file_id, file_fingerprint(uploaded_file))
+    fingerprint = st.session_state['upload_fingerprint'][1]
+    
+    # Exploration statistics are computed in one streaming pass and cached per dataset
+    @timed()
+    @st.cache_data(show_spinner="Profiling dataset...")
+    def get_exploration_stats(fingerprint, _data):
+        return profile_frame(_data)
+    
+    stats = get_exploration_stats(fingerprint, df)
+    
+    plot_sample_size = st.sidebar.number_input(
+        "Rows sampled for plots", min_value=1000, value=DEFAULT_PLOT_SAMPLE_SIZE, step=1000
+    )
+    
+    # Numeric charts are aggregated server-side from a row sample, so neither the figure size nor
+    # the aggregation time grows with row count; category counts above are already exact
+    @st.cache_data(show_spinner=False)
+    def get_box_stats(fingerprint, column, sample_size, _data):
+        return box_stats(sample_for_plots(_data[column], sample_size))
+    
+    @st.cache_data(show_spinner=False)
+    def get_histogram_counts(fingerprint, column, sample_size, _data):
+        return histogram_counts(sample_for_plots(_data[column], sample_size))
     
     # Display the data
     st.header("2. Data Overview")
@@ -51,7 +106,7 @@ if uploaded_file is not None:
         info_str.append(f"- {col}: {dtype}")
     
     info_str.append("\nMissing values:")
-    for col, missing in zip(df.columns, df.isnull().sum()):
+    for col, missing in stats.missing().items():
         info_str.append(f"- {col}: {missing}")
         
     buffer.text("\n".join(info_str))
@@ -61,7 +116,7 @@ if uploaded_file is not None:
     
     # Descriptive statistics
     st.subheader("Descriptive Statistics")
-    st.dataframe(df.describe(include='all').T)
+    st.dataframe(stats.describe())
     
     # Visualizations
     st.subheader("Data Visualization")
@@ -74,17 +129,25 @@ if uploaded_file is not None:
             categorical_cols = list(df.select_dtypes(include=['object']).columns)
             hist_col = st.selectbox("Select a categorical column for histogram", categorical_cols)
             
-            fig = px.histogram(df, x=hist_col, color=hist_col, title=f"{hist_col} Distribution")
-            st.plotly_chart(fig, use_container_width=True)
+            with timer('chart.histogram'):
+                fig = category_histogram_figure(category_counts(stats.value_counts(hist_col)), hist_col)
+                st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Choose column for box plot
         if df.select_dtypes(include=['float64', 'int64']).columns.any():
             numeric_cols = list(df.select_dtypes(include=['float64', 'int64']).columns)
-            box_col = st.selectbox("Select a numerical column for box plot", numeric_cols)
+            box_col = st.selectbox("Select a numerical column for box plot and histogram", numeric_cols)
+            
+            with timer('chart.box'):
+                fig = box_figure(get_box_stats(fingerprint, box_col, plot_sample_size, df), box_col)
+                st.plotly_chart(fig, use_container_width=True)
             
-            fig = px.box(df, y=box_col, title=f"{box_col} Distribution")
-            st.plotly_chart(fig, use_container_width=True)
+            with timer('chart.numeric_histogram'):
+                counts, edges = get_histogram_counts(fingerprint, box_col, plot_sample_size, df)
+                st.plotly_chart(numeric_histogram_figure(counts, edges, box_col), use_container_width=True)
+            if len(df) > plot_sample_size:
+                st.caption(f"Numeric charts use a random sample of {plot_sample_size:,} of {len(df):,} rows.")
     
     # Data Preprocessing
     st.header("4. Data Preprocessing")
@@ -99,37 +162,19 @@ if uploaded_file is not None:
         
         preprocess = st.checkbox("Apply one-hot encoding to categorical columns (drop first to avoid multicollinearity)", value=True)
         
+        preprocess_options = {'one_hot': preprocess, 'drop_first': True}
+        
         if preprocess:
             # Preprocess the data
+            @timed()
             @st.cache_data
             def preprocess_data(data, target, drop_first=True):
-                # Create a copy of the dataframe
-                df_processed = data.copy()
-                
-                # Get categorical columns (excluding target if it's categorical)
-                cat_cols = df_processed.select_dtypes(include=['object']).columns
-                cat_cols = [col for col in cat_cols if col != target]
-                
-                # One-hot encode categorical variables
-                for col in cat_cols:
-                    df_processed = pd.concat([
-                        df_processed, 
-                        pd.get_dummies(df_processed[col], prefix=col, drop_first=drop_first)
-                    ], axis=1)
-                    df_processed = df_processed.drop(col, axis=1)
-                
-                # Handle target column if it's categorical
-                if df_processed[target].dtype == 'object':
-                    st.info(f"Converting target column '{target}' to numerical format.")
-                    df_processed[f"{target}_encoded"] = pd.factorize(df_processed[target])[0]
-                    target_encoded = f"{target}_encoded"
-                else:
-                    target_encoded = target
-                
-                return df_processed, target_encoded
+                return ml_pipeline.preprocess_data(data, target, drop_first)
             
             with st.spinner("Preprocessing data..."):
                 df_processed, target_encoded = preprocess_data(df, target_col)
+            if target_encoded != target_col:
+                st.info(f"Converting target column '{target_col}' to numerical format.")
                 
             st.success("Data preprocessing completed!")
             st.dataframe(df_processed.head())
@@ -137,6 +182,7 @@ if uploaded_file is not None:
             df_processed = df
             target_encoded = target_col
     else:
+        preprocess_options = {'one_hot': False, 'drop_first': True}
         df_processed = df
         target_encoded = target_col
     
@@ -163,166 +209,222 @@ if uploaded_file is not None:
         use_svc = st.checkbox("Support Vector Machine", value=False)
         use_mlp = st.checkbox("Neural Network (MLP)", value=False)
     
+    # Time budgets for the slow models; large datasets also switch to scalable engines
+    with st.expander("Training time budgets"):
+        time_budgets = {
+            name: st.number_input(f"{name} budget (seconds)", min_value=1, value=budget, step=10)
+            for name, budget in DEFAULT_TIME_BUDGETS.items()
+        }
+    
+    # Hyperparameters for each model live in ml_estimators.MODELS
+    selections = {
+        'Logistic Regression': use_lr,
+        'Decision Tree': use_dt,
+        'Random Forest': use_rf,
+        'Gradient Boosting': use_gb,
+        'SVM': use_svc,
+        'Neural Network': use_mlp,
+    }
+    selected_models = [name for name in MODELS if selections[name]]
+    
+    # The registry key pins the data, split and hyperparameters, so it identifies the importance result too
+    @timed()
+    @st.cache_data(show_spinner=False)
+    def get_permutation_importance(registry_key, _model, _X, _y, _groups):
+        return permutation_importance(_model, _X, _y, _groups, random_state=random_state)
+    
+    # Keep showing results after unrelated widget changes; models come back from the registry
+    training_signature = (fingerprint, target_col, preprocess_options, test_size, random_state, tuple(selected_models),
+                          tuple(time_budgets.items()))
     if st.button("Train Selected Models"):
+        st.session_state['training_signature'] = training_signature
+    
+    if st.session_state.get('training_signature') == training_signature:
         # Check if any model is selected
-        if not any([use_lr, use_dt, use_rf, use_gb, use_svc, use_mlp]):
+        if not selected_models:
             st.error("Please select at least one model to train.")
         else:
             # Prepare data for modeling
-            X = df_processed.drop([target_col, target_encoded] if target_col != target_encoded else [target_encoded], axis=1)
-            y = df_processed[target_encoded]
+            X, y = split_features(df_processed, target_col, target_encoded)
             
             # Check if X has any columns
             if X.shape[1] == 0:
                 st.error("No features available for training. Make sure your data preprocessing steps are correct.")
             else:
                 # Train-test split
+                from sklearn.model_selection import train_test_split
                 X_train, X_test, y_train, y_test = train_test_split(
                     X, y, test_size=test_size, random_state=random_state
                 )
                 
                 st.info(f"Training set: {X_train.shape[0]} samples, Test set: {X_test.shape[0]} samples")
                 
-                # Initialize models dictionary
+                # Train selected models, reusing fitted estimators from the registry when possible
                 models = {}
-                accuracies = {}
-                confusion_matrices = {}
-                
-                # Train selected models
+                fit_infos = {}
+                session_models = st.session_state.setdefault('session_models', {})
                 with st.spinner("Training models... This may take a while depending on your data size."):
-                    # Logistic Regression
-                    if use_lr:
-                        lr = LogisticRegression(max_iter=500, random_state=random_state)
-                        lr.fit(X_train, y_train)
-                        y_pred = lr.predict(X_test)
-                        accuracies['Logistic Regression'] = accuracy_score(y_test, y_pred) * 100
-                        confusion_matrices['Logistic Regression'] = confusion_matrix(y_test, y_pred)
-                        models['Logistic Regression'] = lr
-                    
-                    # Decision Tree
-                    if use_dt:
-                        dt = DecisionTreeClassifier(random_state=random_state)
-                        dt.fit(X_train, y_train)
-                        y_pred = dt.predict(X_test)
-                        accuracies['Decision Tree'] = accuracy_score(y_test, y_pred) * 100
-                        confusion_matrices['Decision Tree'] = confusion_matrix(y_test, y_pred)
-                        models['Decision Tree'] = dt
-                    
-                    # Random Forest
-                    if use_rf:
-                        rf = RandomForestClassifier(n_estimators=100, random_state=random_state)
-                        rf.fit(X_train, y_train)
-                        y_pred = rf.predict(X_test)
-                        accuracies['Random Forest'] = accuracy_score(y_test, y_pred) * 100
-                        confusion_matrices['Random Forest'] = confusion_matrix(y_test, y_pred)
-                        models['Random Forest'] = rf
-                    
-                    # Gradient Boosting
-                    if use_gb:
-                        gb = GradientBoostingClassifier(random_state=random_state)
-                        gb.fit(X_train, y_train)
-                        y_pred = gb.predict(X_test)
-                        accuracies['Gradient Boosting'] = accuracy_score(y_test, y_pred) * 100
-                        confusion_matrices['Gradient Boosting'] = confusion_matrix(y_test, y_pred)
-                        models['Gradient Boosting'] = gb
-                    
-                    # SVC (can be slow on large datasets)
-                    if use_svc:
-                        with st.spinner("Training SVM... This might take longer than other models"):
-                            svc = SVC(kernel='linear', random_state=random_state)
-                            svc.fit(X_train, y_train)
-                            y_pred = svc.predict(X_test)
-                            accuracies['SVM'] = accuracy_score(y_test, y_pred) * 100
-                            confusion_matrices['SVM'] = confusion_matrix(y_test, y_pred)
-                            models['SVM'] = svc
-                    
-                    # MLP
-                    if use_mlp:
-                        with st.spinner("Training Neural Network... This might take longer than other models"):
-                            mlp = MLPClassifier(hidden_layer_sizes=(100, 100), max_iter=300, random_state=random_state)
-                            mlp.fit(X_train, y_train)
-                            y_pred = mlp.predict(X_test)
-                            accuracies['Neural Network'] = accuracy_score(y_test, y_pred) * 100
-                            confusion_matrices['Neural Network'] = confusion_matrix(y_test, y_pred)
-                            models['Neural Network'] = mlp
+                    for model_name, registry_key, entry in train_models(
+                        get_model_registry(), selected_models, df, target_col, target_encoded,
+                        X_train, y_train, fingerprint, preprocess_options, test_size, random_state, time_budgets,
+                    ):
+                        models[model_name] = entry['model']
+                        fit_infos[model_name] = entry['fit_info']
+                        fitted_preprocessor = entry['preprocessor']
+                        session_models[model_name] = registry_key
+                
+                results = evaluate_models(models, X_test, y_test, fitted_preprocessor.target_classes)
                 
                 # Display results
                 st.header("6. Model Results")
                 
                 # Accuracy comparison
                 st.subheader("Model Accuracy Comparison")
-                accuracy_df = pd.DataFrame({
-                    'Model': list(accuracies.keys()),
-                    'Accuracy (%)': list(accuracies.values())
-                })
-                accuracy_df = accuracy_df.sort_values('Accuracy (%)', ascending=False).reset_index(drop=True)
+                accuracy_df = results['accuracy']
                 
                 # Display as table and chart
                 st.dataframe(accuracy_df)
                 
-                fig = px.bar(
-                    accuracy_df, 
-                    x='Model', 
-                    y='Accuracy (%)', 
-                    title='Model Accuracy Comparison',
-                    color='Model'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                # Which estimator actually ran, and why it stopped
+                st.write("**Training engines**")
+                st.dataframe(fit_summary(fit_infos))
                 
-                # Confusion matrices
+                with timer('chart.accuracy'):
+                    import plotly.express as px
+                    fig = px.bar(
+                        accuracy_df, 
+                        x='Model', 
+                        y='Accuracy (%)', 
+                        title='Model Accuracy Comparison',
+                        color='Model'
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                # Confusion matrices and per-class metrics for all models from one stacked pass
                 st.subheader("Confusion Matrices")
                 
-                # Create 2 columns for confusion matrices
-                cols = st.columns(2)
-                col_idx = 0
+                normalize_cm = st.checkbox("Normalize confusion matrices by actual class", value=len(results['classes']) > 2)
+                with timer('chart.confusion_matrices'):
+                    fig = confusion_matrix_figure(
+                        results['model_names'], results['labels'], results['confusion_matrices'], normalize=normalize_cm
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
                 
-                for model_name, cm in confusion_matrices.items():
-                    with cols[col_idx]:
-                        fig = ff.create_annotated_heatmap(
-                            z=cm, 
-                            x=['Predicted 0', 'Predicted 1'], 
-                            y=['Actual 0', 'Actual 1'],
-                            colorscale='Viridis'
-                        )
-                        fig.update_layout(title=f'Confusion Matrix for {model_name}')
-                        st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Switch to next column (or back to first if we've used them all)
-                    col_idx = (col_idx + 1) % 2
+                st.subheader("Per-Class Metrics")
+                st.dataframe(results['class_metrics'].pivot(index='Class', columns='Model', values=['Precision', 'Recall', 'F1']))
                 
-                # Feature importance for applicable models
+                # ROC and precision-recall curves, one-vs-rest for each class
+                if results['curves'] is not None:
+                    st.subheader("ROC and Precision-Recall Curves")
+                    with timer('chart.curves'):
+                        st.plotly_chart(curves_figure(results['curves']), use_container_width=True)
+                    st.dataframe(results['auc'])
+                
+                # Permutation importance for every model, with one-hot dummies grouped under their source column
                 st.subheader("Feature Importance")
+                st.caption("Drop in test accuracy when each original feature is randomly shuffled.")
+                
+                groups = feature_groups(list(X.columns), fitted_preprocessor.categories)
                 
                 for model_name, model in models.items():
-                    if model_name in ['Logistic Regression', 'Decision Tree', 'Random Forest', 'Gradient Boosting']:
-                        st.write(f"**{model_name} Feature Importance**")
-                        
-                        if model_name == 'Logistic Regression':
-                            importances = model.coef_[0]
-                        else:
-                            importances = model.feature_importances_
-                        
-                        feature_importances = pd.DataFrame({
-                            'Feature': X.columns,
-                            'Importance': abs(importances) if model_name == 'Logistic Regression' else importances
-                        })
-                        
-                        feature_importances = feature_importances.sort_values('Importance', ascending=False).head(15)
-                        
+                    st.write(f"**{model_name} Feature Importance**")
+                    
+                    with st.spinner(f"Computing permutation importance for {model_name}..."):
+                        feature_importances = get_permutation_importance(
+                            session_models[model_name], _model=model, _X=X_test, _y=y_test, _groups=groups
+                        )
+                    feature_importances = feature_importances.head(15).iloc[::-1]
+                    
+                    with timer('chart.feature_importance'):
+                        import plotly.express as px
                         fig = px.bar(
                             feature_importances, 
                             x='Importance', 
                             y='Feature', 
+                            error_x='Std',
                             orientation='h',
                             title=f'Top 15 Features ({model_name})'
                         )
                         st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Add a divider
-                        st.markdown("---")
+                    
+                    # Add a divider
+                    st.markdown("---")
+
+    # Cross-validation and hyperparameter search
+    st.header("7. Cross-Validation & Tuning")
+    st.markdown("A single train/test split gives a noisy ranking. Cross-validation scores every selected model on k folds in parallel across all cores.")
+    
+    @st.cache_data(show_spinner=False)
+    def get_cv_folds(fingerprint, target, preprocessing, n_splits, random_state, _y):
+        return make_folds(_y, n_splits, random_state)
+    
+    # Preprocessed fold arrays are shared by every model, so keep one copy rather than re-pickling them
+    @st.cache_resource(show_spinner=False, max_entries=1)
+    def get_prepared_folds(fingerprint, target, preprocessing, n_splits, random_state, _X, _y, _folds):
+        return prepare_folds(_X, _y, _folds)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_splits = st.number_input("Number of folds", min_value=2, max_value=20, value=5, step=1)
+    with col2:
+        search_strategy = st.selectbox("Hyperparameter search", ["None", "Randomized search", "Successive halving"])
+    with col3:
+        n_candidates = st.number_input("Candidates per model", min_value=2, value=20, step=1)
+    
+    if st.button("Run Cross-Validation"):
+        if not selected_models:
+            st.error("Please select at least one model to evaluate.")
+        else:
+            X, y = split_features(df_processed, target_col, target_encoded)
+            folds = get_cv_folds(fingerprint, target_col, preprocess_options, n_splits, random_state, y)
+            prepared = get_prepared_folds(fingerprint, target_col, preprocess_options, n_splits, random_state, X, y, folds)
+            
+            # Same engine choice and time budgets as training, applied to every fold and search candidate
+            estimators = build_estimators(selected_models, len(folds[0][0]), random_state)
+            
+            # Redraw the fold-score distribution as each fold finishes
+            progress = st.progress(0.0)
+            chart = st.empty()
+            fold_scores = []
+            total_tasks = len(estimators) * len(prepared)
+            
+            def show_fold(model_name, fold_index, score, seconds):
+                fold_scores.append({'Model': model_name, 'Fold': fold_index + 1, 'Accuracy (%)': score * 100})
+                progress.progress(len(fold_scores) / total_tasks, text=f"{len(fold_scores)}/{total_tasks} folds complete")
+                with timer('chart.cv_scores'):
+                    import plotly.express as px
+                    fig = px.box(pd.DataFrame(fold_scores), x='Model', y='Accuracy (%)', points='all',
+                                 title=f'{n_splits}-Fold Cross-Validation Accuracy')
+                    chart.plotly_chart(fig, use_container_width=True)
+            
+            with timer('cross_validation'):
+                cv_scores = cross_validate_models(estimators, prepared, on_result=show_fold, time_budgets=time_budgets)
+            st.dataframe(cv_summary(cv_scores))
+            
+            if search_strategy != "None":
+                strategy = 'halving' if search_strategy == "Successive halving" else 'randomized'
+                search_results = []
+                for model_name, estimator in estimators.items():
+                    with st.spinner(f"Searching hyperparameters for {model_name}..."):
+                        search = search_hyperparameters(
+                            estimator, X.to_numpy(dtype=float), y.to_numpy(), folds,
+                            strategy=strategy, n_iter=n_candidates, random_state=random_state,
+                            time_budget=time_budgets.get(model_name),
+                        )
+                    if search is None:
+                        continue
+                    tuned = best_params(search)
+                    search_results.append({
+                        'Model': model_name,
+                        'Best CV Accuracy (%)': search.best_score_ * 100,
+                        'Best Parameters': str(tuned),
+                    })
+                    st.write(f"**{model_name}**: {search.best_score_ * 100:.2f}% with {tuned}")
+                if search_results:
+                    st.dataframe(pd.DataFrame(search_results))
 
     # Add GenAI section if needed
-    st.header("7. Generative AI (Optional)")
+    st.header("8. Generative AI (Optional)")
     st.markdown("""
     This section demonstrates how to use the OpenAI API for text generation. 
     To use this feature, you would need to provide your own OpenAI API key.
@@ -368,21 +470,7 @@ else:
     # Sample data option
     if st.button("Or use sample bank marketing data"):
         # Create sample data similar to what might be in the bank dataset
-        data = {
-            'age': np.random.randint(18, 95, 100),
-            'job': np.random.choice(['admin', 'blue-collar', 'technician', 'services', 'management'], 100),
-            'marital': np.random.choice(['married', 'single', 'divorced'], 100),
-            'education': np.random.choice(['primary', 'secondary', 'tertiary'], 100),
-            'balance': np.random.randint(-1000, 50000, 100),
-            'housing': np.random.choice(['yes', 'no'], 100),
-            'loan': np.random.choice(['yes', 'no'], 100),
-            'contact': np.random.choice(['cellular', 'telephone'], 100),
-            'duration': np.random.randint(0, 5000, 100),
-            'campaign': np.random.randint(1, 50, 100),
-            'deposit': np.random.choice(['yes', 'no'], 100)
-        }
-        
-        sample_df = pd.DataFrame(data)
+        sample_df = make_bank_data(100)
         
         # Save to a temporary file and "upload" it
         sample_file = "sample_bank_data.csv"
@@ -392,6 +480,72 @@ else:
         st.session_state['use_sample'] = True
         st.experimental_rerun()
 
+# Batch scoring works from the registry alone, so saved models can score files without a training upload
+st.header("Batch Scoring")
+st.markdown("Apply a trained model to a new CSV. The file is processed in chunks, so large files don't need to fit in memory.")
+
+registry = get_model_registry()
+scoring_choices = {
+    f"{name} (this session)": key for name, key in st.session_state.get('session_models', {}).items()
+}
+for saved in registry.list_models():
+    if saved['key'] not in scoring_choices.values():
+        label = f"{saved['model_name']} -> {saved['target']} (saved {saved['trained_at']})"
+        scoring_choices[label] = saved['key']
+
+if not scoring_choices:
+    st.info("Train a model above to enable batch scoring.")
+else:
+    scoring_model = st.selectbox("Model to apply", list(scoring_choices))
+    scoring_file = st.file_uploader("CSV to score", type="csv", key="scoring_file")
+    chunk_size = st.number_input("Rows per chunk", min_value=1000, value=DEFAULT_SCORING_CHUNK_SIZE, step=1000)
+    
+    if scoring_file is not None and st.button("Score File"):
+        entry = registry.get(scoring_choices[scoring_model])
+        if entry is None:
+            st.error("This model is no longer in the registry. Please train it again.")
+        else:
+            progress_text = st.empty()
+            
+            def report_progress(rows, elapsed):
+                progress_text.text(f"Scored {rows:,} rows ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+            
+            # One directory per session, removed with the session state (or at exit), so concurrent
+            # users never share an output file; each run replaces the session's previous predictions
+            if 'scoring_dir' not in st.session_state:
+                st.session_state['scoring_dir'] = tempfile.TemporaryDirectory(prefix='predictions-')
+            output_path = os.path.join(st.session_state['scoring_dir'].name, 'predictions.csv')
+            with st.spinner("Scoring..."), open(output_path, 'w', newline='') as output:
+                rows, elapsed = score_csv(
+                    entry['model'], entry['preprocessor'], scoring_file, output,
+                    chunk_size=chunk_size, progress=report_progress,
+                )
+            st.session_state['scoring_result'] = {'path': output_path, 'rows': rows, 'elapsed': elapsed}
+    
+    scoring_result = st.session_state.get('scoring_result')
+    if scoring_result is not None and os.path.exists(scoring_result['path']):
+        rows, elapsed = scoring_result['rows'], scoring_result['elapsed']
+        st.success(f"Scored {rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+        
+        def read_predictions(path=scoring_result['path']):
+            with open(path, 'rb') as fh:
+                return fh.read()
+        
+        # Passing a callable defers reading the file until the button is clicked, instead of on every rerun
+        st.download_button("Download predictions", read_predictions, file_name="predictions.csv", mime="text/csv")
+        st.caption(f"Predictions ({os.path.getsize(scoring_result['path']) / 1e6:,.1f} MB) are kept on the server "
+                   "until this session ends. Streamlit reads the whole file into memory when you download it.")
+
+# Timing panel for operators, enabled with PERF_PANEL=1
+if panel_enabled():
+    with st.sidebar.expander("Performance"):
+        perf = summary()
+        if perf.empty:
+            st.write("No timings recorded yet.")
+        else:
+            st.dataframe(perf[['operation', 'calls', 'p50_ms', 'p95_ms', 'p99_ms']])
+            st.download_button("Download Prometheus metrics", prometheus_text(), file_name="ml_metrics.prom")
+
 st.markdown("---")
 st.markdown("### About This App")
 st.markdown("""
@@ -404,3 +558,6 @@ It allows you to:
 
 The original notebook used libraries like Pandas for data manipulation, Plotly for visualization, and Scikit-learn for machine learning.
 """)
+
+# Refresh the Prometheus export file, if configured
+flush()
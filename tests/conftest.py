@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# The modules live flat in the repository root, as the benchmarks import them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    """startive_core on a fresh single-file database with round-ups posted inline"""
+    import startive_core
+    monkeypatch.setattr(startive_core, 'DB_PATH', str(tmp_path / 'startive.db'))
+    monkeypatch.setattr(startive_core, 'SHARD_COUNT', 1)
+    monkeypatch.setattr(startive_core, 'QUEUE_MODE', 'sync')
+    startive_core.init_db()
+    return startive_core
+
+
+@pytest.fixture
+def user_id(core):
+    core.register_user('alice', 'alice@example.com', 'pw')
+    return core.authenticate_user('alice@example.com', 'pw')['id']
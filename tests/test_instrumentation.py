@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import instrumentation
+
+
+@pytest.fixture
+def export_path(tmp_path, monkeypatch):
+    path = tmp_path / 'perf.jsonl'
+    monkeypatch.setattr(instrumentation, 'EXPORT_PATH', str(path))
+    monkeypatch.setattr(instrumentation, 'EXPORT_FORMAT', 'jsonl')
+    instrumentation.reset()
+    yield path
+    instrumentation.write_jsonl(str(path))
+    instrumentation.reset()
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def test_samples_are_written_in_batches_by_flush(export_path):
+    for seconds in (0.1, 0.2, 0.3):
+        instrumentation.record('op', seconds)
+    assert read_lines(export_path) == []
+
+    instrumentation.flush()
+    assert [row['seconds'] for row in read_lines(export_path)] == [0.1, 0.2, 0.3]
+    instrumentation.flush()
+    assert len(read_lines(export_path)) == 3
+
+
+def test_full_batch_is_written_without_flush(export_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, 'JSONL_BATCH_SIZE', 2)
+    instrumentation.record('op', 0.1)
+    instrumentation.record('op', 0.2)
+    assert [row['operation'] for row in read_lines(export_path)] == ['op', 'op']
+
+
+def test_summary_percentiles(export_path):
+    for ms in range(1, 101):
+        with instrumentation.timer('noop'):
+            pass
+        instrumentation.record('fixed', ms / 1000)
+    row = instrumentation.summary().set_index('operation').loc['fixed']
+    assert row['calls'] == 100
+    assert row['p50_ms'] == pytest.approx(50.5)
+    assert row['max_ms'] == pytest.approx(100)
+
+
+def test_reset_drops_samples_not_yet_written(export_path):
+    instrumentation.record('op', 0.1)
+    instrumentation.reset()
+    instrumentation.flush()
+    assert read_lines(export_path) == []
+    assert instrumentation.summary().empty
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from ml_charts import box_stats, histogram_counts
+from ml_exploration import sample_for_plots
+
+
+def test_numeric_aggregates_have_a_fixed_size():
+    values = pd.Series(np.random.default_rng(0).normal(size=200_000))
+    counts, edges = histogram_counts(sample_for_plots(values, 10_000))
+    assert counts.sum() == 10_000
+    assert len(edges) == len(counts) + 1 == 51
+    stats = box_stats(values, max_outliers=100)
+    assert stats['outliers'].size == 100 < stats['n_outliers']
+    assert stats['q1'] < stats['median'] < stats['q3']
+
+
+def test_small_frames_are_plotted_whole():
+    df = pd.DataFrame({'x': range(10)})
+    assert sample_for_plots(df, 1000) is df
+    counts, edges = histogram_counts([np.nan])
+    assert counts.tolist() == [0]
@@ -0,0 +1,80 @@
+import pytest
+from sklearn.datasets import make_classification
+
+from ml_estimators import build_estimator, fit_with_budget, model_spec
+
+
+@pytest.fixture(scope='module')
+def noisy_data():
+    return make_classification(n_samples=2000, n_features=20, flip_y=0.2, random_state=0)
+
+
+def make_model(model_name, n_samples, **overrides):
+    estimator_cls, params = model_spec(model_name)
+    model, _ = build_estimator(model_name, estimator_cls, {**params, **overrides}, n_samples, random_state=0)
+    return model
+
+
+@pytest.mark.parametrize('model_name, overrides', [
+    ('Gradient Boosting', {'n_estimators': 500}),
+    ('Neural Network', {}),
+])
+def test_budgeted_fit_stops_early_where_plain_fit_does(noisy_data, model_name, overrides):
+    X, y = noisy_data
+    plain = make_model(model_name, len(X), **overrides).fit(X, y)
+    plain_iterations = getattr(plain, 'n_estimators_', None) or plain.n_iter_
+
+    budgeted = make_model(model_name, len(X), **overrides)
+    info = fit_with_budget(budgeted, X, y, time_budget=600)
+
+    assert info['stopped_by'] == 'early stopping'
+    assert info['iterations'] == plain_iterations
+    assert plain_iterations < (overrides.get('n_estimators') or plain.max_iter)
+
+
+def test_large_gradient_boosting_engine_keeps_early_stopping():
+    X, y = make_classification(n_samples=12_000, n_features=20, flip_y=0.2, random_state=0)
+    plain = make_model('Gradient Boosting', len(X), n_estimators=500).fit(X, y)
+    budgeted = make_model('Gradient Boosting', len(X), n_estimators=500)
+    info = fit_with_budget(budgeted, X, y, time_budget=600)
+    assert type(budgeted).__name__ == 'HistGradientBoostingClassifier'
+    assert info['stopped_by'] == 'early stopping'
+    assert info['iterations'] == plain.n_iter_
+
+
+def test_time_budget_stops_gradient_boosting(noisy_data):
+    X, y = noisy_data
+    model = make_model('Gradient Boosting', len(X), n_estimators=100_000, n_iter_no_change=None)
+    info = fit_with_budget(model, X, y, time_budget=0.2)
+    assert info['stopped_by'] == 'time budget'
+    assert info['iterations'] < 100_000
+    # The configured limit is left untouched for the registry key and later refits
+    assert model.n_estimators == 100_000
+
+
+def test_time_budget_caps_mlp_epochs(noisy_data):
+    X, y = noisy_data
+    model = make_model('Neural Network', len(X), max_iter=100_000, early_stopping=False, n_iter_no_change=100_000)
+    info = fit_with_budget(model, X, y, time_budget=0.5)
+    assert info['stopped_by'] == 'time budget'
+    assert info['iterations'] < 100_000
+    assert model.max_iter == 100_000
+
+
+def test_time_budget_caps_svc_iterations(noisy_data):
+    X, y = noisy_data
+    # An unscaled feature leaves SMO far from converged after a second
+    X = X.copy()
+    X[:, 0] *= 1000
+    model = make_model('SVM', len(X))
+    info = fit_with_budget(model, X, y, time_budget=1.0)
+    assert info['stopped_by'] == 'time budget'
+    assert info['seconds'] < 3
+    assert model.max_iter == -1
+
+
+def test_unbudgeted_models_are_only_timed(noisy_data):
+    X, y = noisy_data
+    info = fit_with_budget(make_model('Decision Tree', len(X)), X, y, time_budget=5)
+    assert info['stopped_by'] == 'completed'
+    assert info['iterations'] is None
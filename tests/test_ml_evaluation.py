@@ -0,0 +1,45 @@
+import time
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.neural_network import MLPClassifier
+
+from ml_evaluation import cross_validate_models, make_folds, prepare_folds, search_hyperparameters
+from ml_pipeline import best_params
+
+
+def data():
+    return make_classification(n_samples=1500, n_features=10, flip_y=0.2, random_state=0)
+
+
+def test_cross_validation_keeps_time_budgets():
+    X, y = data()
+    folds = make_folds(y, n_splits=3)
+    endless = GradientBoostingClassifier(n_estimators=100_000, random_state=0)
+    start = time.perf_counter()
+    scores = cross_validate_models({'Gradient Boosting': endless}, prepare_folds(X, y, folds), n_jobs=1,
+                                   time_budgets={'Gradient Boosting': 0.2})
+    assert time.perf_counter() - start < 10
+    assert len(scores['Gradient Boosting']) == 3
+    assert not np.isnan(scores['Gradient Boosting']).any()
+
+
+def test_search_candidates_keep_time_budget():
+    X, y = data()
+    folds = make_folds(y, n_splits=3)
+    endless = MLPClassifier(max_iter=100_000, n_iter_no_change=100_000, random_state=0)
+    start = time.perf_counter()
+    search = search_hyperparameters(endless, X, y, folds, n_iter=2, n_jobs=1, time_budget=0.3)
+    # 2 candidates x 3 folds plus the refit, each within the budget and its probe
+    assert time.perf_counter() - start < 20
+    assert search.best_estimator_.fit_info_['stopped_by'] == 'time budget'
+    assert set(best_params(search)) == {'alpha', 'learning_rate_init'}
+
+
+def test_search_without_budget_uses_the_estimator_directly():
+    X, y = data()
+    folds = make_folds(y, n_splits=3)
+    search = search_hyperparameters(GradientBoostingClassifier(n_estimators=20, random_state=0), X, y, folds,
+                                    n_iter=2, n_jobs=1)
+    assert isinstance(search.best_estimator_, GradientBoostingClassifier)
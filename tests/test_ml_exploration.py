@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_exploration import QuantileSketch, profile_frame
+
+
+def test_sketch_memory_stays_bounded():
+    sketch = QuantileSketch(k=256)
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        sketch.update(rng.normal(size=100_000))
+        assert sketch.size() <= 3 * sketch.k + 2 * len(sketch.levels)
+
+
+@pytest.mark.parametrize('q', [0.01, 0.25, 0.5, 0.75, 0.99])
+def test_sketch_quantile_rank_error_is_small(q):
+    values = np.random.default_rng(1).lognormal(size=1_000_000)
+    sketch = QuantileSketch()
+    for chunk in np.array_split(values, 8):
+        sketch.update(chunk)
+    estimate = sketch.quantiles([q])[0]
+    rank = np.searchsorted(np.sort(values), estimate) / values.size
+    assert abs(rank - q) < 0.005
+
+
+def test_sketch_ignores_nan_and_handles_empty_input():
+    sketch = QuantileSketch()
+    assert np.isnan(sketch.quantiles([0.5])).all()
+    sketch.update([np.nan, 1.0, 2.0, 3.0])
+    assert sketch.quantiles([0.0, 0.5, 1.0]) == [1.0, 2.0, 3.0]
+
+
+def test_streamed_stats_match_pandas():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        'amount': rng.normal(100, 15, 10_000),
+        'job': rng.choice(['admin', 'technician', 'services'], 10_000),
+    })
+    df.loc[::7, 'amount'] = np.nan
+    stats = profile_frame(df, chunk_size=1_000)
+
+    pd.testing.assert_series_equal(stats.missing(), df.isnull().sum(), check_names=False)
+    described = stats.describe()
+    expected = df['amount'].describe()
+    for column in ('count', 'mean', 'std', 'min', 'max'):
+        assert described.loc['amount', column] == pytest.approx(expected[column])
+    assert described.loc['job', 'unique'] == 3
+    assert stats.value_counts('job').to_dict() == df['job'].value_counts().to_dict()
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+from ml_importance import feature_groups, permutation_importance
+from ml_pipeline import preprocess_data, split_features
+from ml_sample_data import make_bank_data
+
+
+def test_dummies_group_back_under_their_column_with_drop_first():
+    data = make_bank_data(200, seed=0)
+    # A numeric column sharing a category column's prefix stays on its own
+    data['job_years'] = np.arange(len(data)) % 30
+    processed, target_encoded = preprocess_data(data, 'deposit', drop_first=True)
+    X, _ = split_features(processed, 'deposit', target_encoded)
+    columns = list(X.columns)
+    categories = {'job': sorted(data['job'].unique()), 'marital': sorted(data['marital'].unique())}
+
+    groups = feature_groups(columns, categories)
+
+    # drop_first removed the first level, so one dummy fewer than there are jobs
+    assert [columns[i] for i in groups['job']] == [f"job_{job}" for job in categories['job'][1:]]
+    assert len(groups['marital']) == len(categories['marital']) - 1
+    assert groups['job_years'] == [columns.index('job_years')]
+    assert groups['age'] == [columns.index('age')]
+    assert sorted(i for indices in groups.values() for i in indices) == list(range(len(columns)))
+
+
+def test_feature_the_model_ignores_scores_zero():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'signal': rng.normal(size=2000), 'noise': rng.normal(size=2000)})
+    y = (X['signal'] > 0).astype(int)
+    # A single split can only use one column
+    model = DecisionTreeClassifier(max_depth=1, random_state=0).fit(X, y)
+
+    importances = permutation_importance(model, X, y, feature_groups(list(X.columns)), n_jobs=1)
+
+    by_feature = importances.set_index('Feature')
+    assert list(importances['Feature']) == ['signal', 'noise']
+    assert by_feature.loc['signal', 'Importance'] > 0.4
+    assert by_feature.loc['noise', 'Importance'] == 0.0
+    assert by_feature.loc['noise', 'Std'] == 0.0
@@ -0,0 +1,69 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.metrics import confusion_matrix, precision_recall_fscore_support, roc_auc_score, roc_curve
+from sklearn.tree import DecisionTreeClassifier
+
+from ml_metrics import confusion_matrices, one_vs_rest_curves, per_class_metrics, stack_predictions
+from ml_pipeline import evaluate_models
+
+
+def tree_scores(n_classes):
+    # A shallow tree's leaf probabilities give heavily tied scores
+    X, y = make_classification(n_samples=600, n_features=8, n_informative=4, n_classes=n_classes,
+                               flip_y=0.1, random_state=0)
+    model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(X[:300], y[:300])
+    return model, X[300:], y[300:]
+
+
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_auc_with_tied_scores_matches_sklearn(n_classes):
+    model, X, y = tree_scores(n_classes)
+    scores = model.predict_proba(X)
+    _, auc = one_vs_rest_curves(y, scores, model.classes_, model.classes_)
+    expected = [roc_auc_score(y == c, scores[:, j]) for j, c in enumerate(model.classes_)]
+    np.testing.assert_allclose(auc, expected)
+
+
+def test_fully_tied_scores_give_chance_auc():
+    y = np.array([0, 1, 0, 1, 1, 0, 0, 1])
+    scores = np.full((y.size, 2), 0.5)
+    curves, auc = one_vs_rest_curves(y, scores, [0, 1], ['a', 'b'])
+    np.testing.assert_allclose(auc, [0.5, 0.5])
+    roc = curves[(curves['Curve'] == 'ROC') & (curves['Class'] == 'b')]
+    assert roc[['x', 'y']].values.tolist() == [[0.0, 0.0], [1.0, 1.0]]
+
+
+def test_roc_points_match_sklearn():
+    model, X, y = tree_scores(2)
+    scores = model.predict_proba(X)
+    curves, _ = one_vs_rest_curves(y, scores, model.classes_, ['neg', 'pos'])
+    roc = curves[(curves['Curve'] == 'ROC') & (curves['Class'] == 'pos')]
+    fpr, tpr, _ = roc_curve(y, scores[:, 1], drop_intermediate=False)
+    np.testing.assert_allclose(roc['x'], fpr)
+    np.testing.assert_allclose(roc['y'], tpr)
+
+
+def test_confusion_matrices_and_class_metrics_match_sklearn():
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 4, 500)
+    predictions = {'a': rng.integers(0, 4, 500), 'b': np.where(rng.random(500) < 0.7, y_true, 0)}
+    classes, y_true_idx, pred_idx = stack_predictions(y_true, predictions)
+    cms = confusion_matrices(y_true_idx, pred_idx, len(classes))
+    precision, recall, f1, support = per_class_metrics(cms)
+    for m, y_pred in enumerate(predictions.values()):
+        np.testing.assert_array_equal(cms[m], confusion_matrix(y_true, y_pred, labels=classes))
+        expected = precision_recall_fscore_support(y_true, y_pred, labels=classes, zero_division=0)
+        np.testing.assert_allclose(np.vstack([precision[m], recall[m], f1[m], support[m]]), np.vstack(expected))
+
+
+def test_evaluate_binary_models_without_pandas_warnings():
+    model, X, y = tree_scores(2)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        results = evaluate_models({'Tree': model}, pd.DataFrame(X), pd.Series(y))
+    assert results['auc'].index.tolist() == ['1']
+    assert set(results['curves']['Model']) == {'Tree'}
@@ -0,0 +1,74 @@
+import os
+
+import ml_registry
+from ml_registry import ModelRegistry, make_key
+
+
+def stored_keys(registry):
+    return [os.path.basename(path)[:-len('.joblib')] for path, _, _ in registry.entries()]
+
+
+def set_last_used(registry, key, timestamp):
+    os.utime(os.path.join(registry.root, f"{key}.joblib"), (timestamp, timestamp))
+
+
+def test_make_key_is_stable_and_covers_the_config(monkeypatch):
+    key = make_key(dataset='abc', model='SVM', params={'kernel': 'linear', 'C': 1.0}, test_size=0.2)
+    assert key == make_key(test_size=0.2, params={'C': 1.0, 'kernel': 'linear'}, model='SVM', dataset='abc')
+    assert key != make_key(dataset='abc', model='SVM', params={'kernel': 'linear', 'C': 1.0}, test_size=0.3)
+    monkeypatch.setattr(ml_registry, 'SKLEARN_VERSION', '0.0.0')
+    assert key != make_key(dataset='abc', model='SVM', params={'kernel': 'linear', 'C': 1.0}, test_size=0.2)
+
+
+def test_round_trip_and_missing_entries(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.put('a', {'model': [1, 2, 3]})
+    assert registry.get('a') == {'model': [1, 2, 3]}
+    assert registry.get('missing') is None
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    entry = b'x' * 10_000
+    registry = ModelRegistry(str(tmp_path), max_bytes=25_000)
+    registry.put('a', entry)
+    registry.put('b', entry)
+    set_last_used(registry, 'a', 1_000)
+    set_last_used(registry, 'b', 2_000)
+
+    # Reading 'a' makes 'b' the least recently used
+    assert registry.get('a') == entry
+    registry.put('c', entry)
+    assert sorted(stored_keys(registry)) == ['a', 'c']
+
+
+def test_newest_entry_is_kept_even_over_the_limit(tmp_path):
+    registry = ModelRegistry(str(tmp_path), max_bytes=100)
+    registry.put('small', b'x')
+    registry.put('big', b'x' * 10_000)
+    assert stored_keys(registry) == ['big']
+    assert registry.get('big') == b'x' * 10_000
+
+
+def test_list_models_reads_metadata_most_recent_first(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.put('old', 1, metadata={'model_name': 'SVM'})
+    registry.put('new', 2, metadata={'model_name': 'Decision Tree'})
+    registry.put('bare', 3)
+    set_last_used(registry, 'old', 1_000)
+    set_last_used(registry, 'new', 2_000)
+
+    assert registry.list_models() == [
+        {'model_name': 'Decision Tree', 'key': 'new'},
+        {'model_name': 'SVM', 'key': 'old'},
+    ]
+
+
+def test_unreadable_entry_is_a_miss_and_removed(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.put('a', {'model': 1}, metadata={'model_name': 'SVM'})
+    with open(tmp_path / 'a.joblib', 'wb') as fh:
+        fh.write(b'not a pickle')
+
+    assert registry.get('a') is None
+    assert registry.entries() == []
+    assert not (tmp_path / 'a.json').exists()
@@ -0,0 +1,73 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from ml_pipeline import preprocess_data, split_features
+from ml_sample_data import make_bank_data
+from ml_scoring import FittedPreprocessor, score_csv
+
+TARGET = 'deposit'
+
+
+@pytest.fixture(scope='module')
+def bank_data():
+    data = make_bank_data(300, extra_categorical=1, cardinality=8, seed=0)
+    data.loc[[3, 50, 51], 'job'] = np.nan
+    data.loc[[7], 'cat_0'] = np.nan
+    return data
+
+
+def fitted(data, drop_first=True):
+    processed, target_encoded = preprocess_data(data, TARGET, drop_first=drop_first)
+    X, y = split_features(processed, TARGET, target_encoded)
+    preprocessor = FittedPreprocessor.from_training(data, TARGET, X.columns, drop_first=drop_first,
+                                                    encode_target=target_encoded != TARGET)
+    return X, y, preprocessor
+
+
+@pytest.mark.parametrize('drop_first', [True, False])
+def test_transform_matches_training_preprocessing(bank_data, drop_first):
+    X, _, preprocessor = fitted(bank_data, drop_first)
+    # Small chunks miss most categories, so their dummies must come from the frozen categories
+    transformed = pd.concat(
+        [preprocessor.transform(bank_data.iloc[i:i + 7]) for i in range(0, len(bank_data), 7)]
+    )
+    assert list(transformed.columns) == list(X.columns)
+    pd.testing.assert_frame_equal(transformed.astype(float), X.astype(float))
+
+
+def test_unseen_categories_encode_as_all_zero(bank_data):
+    X, _, preprocessor = fitted(bank_data)
+    chunk = bank_data.iloc[:2].copy()
+    chunk['job'] = 'astronaut'
+    transformed = preprocessor.transform(chunk)
+    assert list(transformed.columns) == list(X.columns)
+    job_columns = [col for col in X.columns if col.startswith('job_')]
+    assert not transformed[job_columns].to_numpy().any()
+
+
+def test_score_csv_round_trip(bank_data, tmp_path):
+    X, _, _ = fitted(bank_data)
+    # Trained on integer codes, as preprocess_data leaves an object target
+    preprocessor = FittedPreprocessor.from_training(bank_data, TARGET, X.columns, encode_target=True)
+    y = pd.factorize(bank_data[TARGET])[0]
+    model = DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y)
+    source = io.StringIO(bank_data.drop(columns=[TARGET]).to_csv(index=False))
+    progress = []
+
+    with open(tmp_path / 'predictions.csv', 'w', newline='') as output:
+        rows, _ = score_csv(model, preprocessor, source, output, chunk_size=64,
+                            progress=lambda done, elapsed: progress.append(done))
+
+    scored = pd.read_csv(tmp_path / 'predictions.csv')
+    assert rows == len(bank_data) == len(scored)
+    assert progress == [64, 128, 192, 256, 300]
+    assert list(scored['row']) == list(range(len(bank_data)))
+    assert list(scored.columns) == ['row', 'prediction'] + [f"proba_{label}" for label in preprocessor.target_classes]
+    # Predictions come back as the original labels, not their codes
+    assert set(scored['prediction']) <= set(bank_data[TARGET])
+    assert list(scored['prediction']) == list(preprocessor.decode(model.predict(X)))
+    np.testing.assert_allclose(scored.filter(like='proba_').sum(axis=1), 1.0)
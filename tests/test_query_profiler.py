@@ -0,0 +1,67 @@
+import pytest
+
+import query_profiler
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(query_profiler, 'LOG_PATH', str(tmp_path / 'profile.jsonl'))
+    monkeypatch.setattr(query_profiler, '_explained', set())
+    conn = query_profiler.connect(str(tmp_path / 'profiled.db'))
+    conn.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, user_id INTEGER, amount REAL)")
+    conn.execute("CREATE INDEX idx_transactions_user ON transactions (user_id)")
+    conn.executemany("INSERT INTO transactions (user_id, amount) VALUES (?, ?)", [(i % 3, i) for i in range(10)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def logged(sql):
+    queries, plans = query_profiler.load_log(query_profiler.LOG_PATH)
+    key = query_profiler.normalize_sql(sql)
+    return [q for q in queries if q['sql'] == key], plans.get(key)
+
+
+def test_full_scans_flags_unindexed_scans_of_watched_tables():
+    plan = [
+        'SCAN transactions',
+        'SCAN TABLE savings',
+        'SEARCH transactions USING INDEX idx_transactions_user_date (user_id=?)',
+        'SCAN savings USING COVERING INDEX idx_savings_user_date',
+        'SCAN users',
+    ]
+    assert query_profiler.full_scans(plan) == ['transactions', 'savings']
+
+
+def test_plan_is_captured_once_per_statement(conn):
+    sql = "SELECT amount FROM transactions WHERE amount > ?"
+    for threshold in (1, 2, 3):
+        # Whitespace differences still count as the same statement
+        conn.execute(f"  {sql}\n", (threshold,)).fetchall()
+    indexed = "SELECT amount FROM transactions WHERE user_id = ?"
+    conn.execute(indexed, (1,)).fetchall()
+
+    runs, plan = logged(sql)
+    assert len(runs) == 3
+    assert plan['full_scans'] == ['transactions']
+    with open(query_profiler.LOG_PATH) as fh:
+        assert sum('"type": "plan"' in line and 'amount >' in line for line in fh) == 1
+    assert logged(indexed)[1]['full_scans'] == []
+
+
+@pytest.mark.parametrize('read, expected', [
+    (lambda c: [c.fetchone(), c.fetchone()], 2),
+    (lambda c: c.fetchmany(3), 3),
+    (lambda c: c.fetchall(), 10),
+    (lambda c: list(c), 10),
+])
+def test_rows_are_counted_however_they_are_fetched(conn, read, expected):
+    sql = "SELECT id, amount FROM transactions ORDER BY id"
+    c = conn.cursor()
+    c.execute(sql)
+    assert len(read(c)) == expected
+    c.close()
+
+    runs, _ = logged(sql)
+    assert [run['rows'] for run in runs] == [expected]
+    assert runs[0]['duration_ms'] >= 0
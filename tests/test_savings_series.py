@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+import savings_series
+
+
+def savings_rows(days, start='2020-01-01'):
+    dates = pd.date_range(start, periods=days, freq='D')
+    return [(d.strftime('%Y-%m-%d'), 0.5 + (i % 7) * 0.1) for i, d in enumerate(dates)]
+
+
+def test_lttb_keeps_endpoints_and_respects_threshold():
+    x = np.arange(10_000)
+    y = np.sin(x / 300.0)
+    picked = savings_series.lttb(x, y, 200)
+    assert len(picked) == 200
+    assert picked[0] == 0 and picked[-1] == len(x) - 1
+    assert np.all(np.diff(picked) > 0)
+
+
+def test_lttb_keeps_a_lone_spike():
+    y = np.zeros(5_000)
+    y[3_217] = 100.0
+    picked = savings_series.lttb(np.arange(len(y)), y, 50)
+    assert 3_217 in picked
+
+
+def test_lttb_returns_everything_below_threshold():
+    assert list(savings_series.lttb([0, 1, 2], [1, 2, 3], 10)) == [0, 1, 2]
+
+
+def test_growth_points_are_bounded_and_end_on_the_total():
+    df = savings_series.daily_series(savings_rows(3_000))
+    points = savings_series.growth_points(df, max_points=400)
+    assert len(points) == 400
+    assert points['cumulative'].iloc[-1] == df['cumulative'].iloc[-1]
+    assert points['date'].iloc[0] == df['date'].iloc[0]
+
+
+def test_bar_resolution_coarsens_with_the_range():
+    assert savings_series.bar_resolution(None, days=30) == ('D', 'Daily')
+    assert savings_series.bar_resolution(None, days=365) == ('W', 'Weekly')
+    df = savings_series.daily_series(savings_rows(3_000))
+    assert savings_series.bar_resolution(df) == ('M', 'Monthly')
+
+
+def test_period_totals_keep_the_sum():
+    df = savings_series.daily_series(savings_rows(3_000))
+    totals, label = savings_series.period_totals(df)
+    assert label == 'Monthly'
+    assert len(totals) <= savings_series.MAX_BARS
+    assert np.isclose(totals['total'].sum(), df['total'].sum())
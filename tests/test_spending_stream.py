@@ -0,0 +1,51 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import spending_stream
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(':memory:')
+    c = conn.cursor()
+    spending_stream.create_spending_tables(c)
+    yield c
+    conn.close()
+
+
+def days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def charge_monthly(c, last_charge_days_ago, charges=6, description='NETFLIX.COM'):
+    for i in reversed(range(charges)):
+        spending_stream.observe_transaction(c, 1, 15.99, 'Entertainment', f"{description} {i:04d}",
+                                            days_ago(last_charge_days_ago + 30 * i))
+
+
+def recurring(c):
+    return [r['period'] for r in spending_stream.savings_opportunities(c, 1)['recurring']]
+
+
+def test_steady_monthly_charge_is_recurring(cursor):
+    charge_monthly(cursor, last_charge_days_ago=5)
+    assert recurring(cursor) == ['monthly']
+
+
+def test_cancelled_subscription_expires(cursor):
+    # Still listed while the next charge is due, gone once it is half an interval overdue
+    charge_monthly(cursor, last_charge_days_ago=40)
+    assert recurring(cursor) == ['monthly']
+    cursor.execute("DELETE FROM merchant_stats")
+    charge_monthly(cursor, last_charge_days_ago=50)
+    assert recurring(cursor) == []
+
+
+def test_outsized_spend_is_an_anomaly(cursor):
+    for i in range(10):
+        spending_stream.observe_transaction(cursor, 1, 20 + i % 3, 'Dining', 'lunch', days_ago(20 - i))
+    spending_stream.observe_transaction(cursor, 1, 400, 'Dining', 'banquet', days_ago(1))
+    anomalies = spending_stream.savings_opportunities(cursor, 1)['anomalies']
+    assert [a['description'] for a in anomalies] == ['banquet']
@@ -0,0 +1,63 @@
+import sqlite3
+
+import startive_archive
+
+
+def transaction_ids(core):
+    conn = core.get_connection()
+    ids = [row[0] for row in conn.execute("SELECT id FROM transactions ORDER BY id")]
+    conn.close()
+    return ids
+
+
+def test_archive_moves_rows_and_keeps_totals(core, user_id):
+    for amount in (3.25, 10.60, 7.99):
+        core.add_transaction(user_id, amount, 'Dining', 'coffee')
+    total = core.get_total_savings(user_id)
+
+    moved = startive_archive.run(days=-1)
+
+    assert moved == {core.DB_PATH: {'transactions': 3, 'savings': 3}}
+    assert transaction_ids(core) == []
+    assert core.get_total_savings(user_id) == total
+    assert [row['amount'] for row in core.iter_archived_rows(user_id, 'transactions')] == [3.25, 10.60, 7.99]
+
+
+def test_new_transaction_after_archiving_everything_keeps_its_jobs(core, user_id):
+    core.add_transaction(user_id, 3.25, 'Dining', 'coffee')
+    startive_archive.run(days=-1)
+
+    core.add_transaction(user_id, 4.50, 'Dining', 'coffee')
+
+    # The archived row's id is not handed out again, so the new round-up isn't taken for a replay
+    assert transaction_ids(core) == [2]
+    assert core.get_total_savings(user_id) == 1.25
+    assert core.outbox_stats()['pending'] == 0
+    conn = core.get_connection()
+    jobs = conn.execute("SELECT idempotency_key, status FROM outbox ORDER BY id").fetchall()
+    conn.close()
+    assert jobs == [('roundup:2', 'done'), ('analyze:2', 'done')]
+
+
+def test_migration_continues_ids_past_archived_jobs(core, user_id, tmp_path):
+    # A version 6 file where archival already freed the newest id but its finished jobs remain
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    core.create_tables(c)
+    core.create_user_indexes(c)
+    core.create_outbox(c)
+    c.execute("INSERT INTO users (id, username, email, password_hash) VALUES (1, 'bob', 'bob@example.com', 'x')")
+    c.execute("INSERT INTO transactions (user_id, amount, category, roundup_amount) VALUES (1, 3.25, 'Dining', 0.75)")
+    core.enqueue_job(c, 'roundup', 'roundup:1', {'transaction_id': 1})
+    c.execute("UPDATE outbox SET status = 'done'")
+    c.execute("DELETE FROM transactions")
+    c.execute("PRAGMA user_version = 6")
+    conn.commit()
+    conn.close()
+
+    assert core.migrate(path) == core.SCHEMA_VERSION
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO transactions (user_id, amount, category) VALUES (1, 4.50, 'Dining')")
+    assert conn.execute("SELECT id FROM transactions").fetchall() == [(2,)]
+    conn.close()
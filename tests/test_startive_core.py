@@ -0,0 +1,114 @@
+import sqlite3
+
+
+def user_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_init_db_migrates_once(core):
+    assert user_version(core.DB_PATH) == core.SCHEMA_VERSION
+    # Already current: a single PRAGMA read and no schema statements
+    assert core.init_db() == core.SCHEMA_VERSION
+
+
+def test_version_1_database_is_migrated_with_its_data(core, tmp_path):
+    path = str(tmp_path / 'v1.db')
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    core.create_tables(c)
+    c.execute("INSERT INTO users (id, username, email, password_hash) VALUES (1, 'bob', 'bob@example.com', 'x')")
+    c.execute("INSERT INTO transactions (user_id, amount, category, transaction_date, roundup_amount) "
+              "VALUES (1, 3.25, 'Dining', '2024-01-05 10:00:00', 0.75)")
+    c.executemany("INSERT INTO savings (user_id, amount, source, saving_date) VALUES (1, ?, 'roundup', ?)",
+                  [(0.75, '2024-01-05 10:00:00'), (0.25, '2024-01-05 18:00:00'), (0.5, '2024-01-06 09:00:00')])
+    conn.commit()
+    conn.close()
+
+    assert core.migrate(path) == core.SCHEMA_VERSION
+    assert user_version(path) == core.SCHEMA_VERSION
+
+    conn = sqlite3.connect(path)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'idx_transactions_user_date', 'idx_savings_user_date', 'idx_savings_posting_key'} <= indexes
+    assert conn.execute("SELECT day, total FROM savings_daily ORDER BY day").fetchall() == [
+        ('2024-01-05', 1.0), ('2024-01-06', 0.5)]
+    assert conn.execute("SELECT total FROM savings_totals WHERE user_id = 1").fetchone() == (1.5,)
+    assert conn.execute("SELECT amount FROM transactions").fetchall() == [(3.25,)]
+    conn.close()
+
+
+def test_migrate_leaves_newer_databases_alone(core, tmp_path):
+    path = str(tmp_path / 'future.db')
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA user_version = {core.SCHEMA_VERSION + 1}")
+    conn.close()
+    assert core.migrate(path) == core.SCHEMA_VERSION + 1
+
+
+def test_round_up_is_posted_through_the_outbox(core, user_id):
+    core.add_transaction(user_id, 4.25, 'Dining', 'lunch')
+    core.add_transaction(user_id, 10.0, 'Shopping', 'even amount')
+    assert core.get_total_savings(user_id) == 0.75
+    assert core.outbox_stats() == {'pending': 0, 'failed': 0, 'lag_seconds': 0.0}
+
+    conn = sqlite3.connect(core.DB_PATH)
+    # No round-up on a whole-dollar amount, so only one roundup job was queued
+    assert conn.execute("SELECT kind, COUNT(*) FROM outbox GROUP BY kind ORDER BY kind").fetchall() == [
+        ('analyze', 2), ('roundup', 1)]
+    conn.close()
+
+
+def test_replayed_job_does_not_post_twice(core, user_id):
+    core.add_transaction(user_id, 4.25, 'Dining', 'lunch')
+    conn = sqlite3.connect(core.DB_PATH)
+    conn.execute("UPDATE outbox SET status = 'pending'")
+    conn.commit()
+    conn.close()
+
+    assert core.process_outbox() == 2
+    assert core.get_total_savings(user_id) == 0.75
+    conn = sqlite3.connect(core.DB_PATH)
+    assert conn.execute("SELECT COUNT(*) FROM savings").fetchone() == (1,)
+    assert conn.execute("SELECT total FROM savings_daily").fetchall() == [(0.75,)]
+    conn.close()
+
+
+def test_failing_job_is_parked_after_max_attempts(core, user_id, monkeypatch):
+    def fail(c, key, payload):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(core.JOB_HANDLERS, 'analyze', fail)
+    core.add_transaction(user_id, 4.25, 'Dining', 'lunch')
+    # The round-up still lands: each job is rolled back on its own
+    assert core.get_total_savings(user_id) == 0.75
+    assert core.outbox_stats()['pending'] == 1
+
+    for _ in range(core.OUTBOX_MAX_ATTEMPTS - 1):
+        core.process_outbox()
+    stats = core.outbox_stats()
+    assert (stats['pending'], stats['failed']) == (0, 1)
+
+    conn = sqlite3.connect(core.DB_PATH)
+    assert conn.execute("SELECT attempts, last_error FROM outbox WHERE status = 'failed'").fetchone() == (
+        core.OUTBOX_MAX_ATTEMPTS, "RuntimeError('boom')")
+    conn.close()
+    assert core.process_outbox() == 0
+
+
+def test_prune_outbox_keeps_recent_and_unfinished_jobs(core, user_id):
+    core.add_transaction(user_id, 4.25, 'Dining', 'lunch')
+    core.add_transaction(user_id, 2.5, 'Dining', 'coffee')
+    conn = sqlite3.connect(core.DB_PATH)
+    conn.execute("UPDATE outbox SET processed_at = datetime('now', '-30 days') WHERE payload LIKE '%: 1}'")
+    conn.execute("UPDATE outbox SET status = 'failed' WHERE kind = 'analyze' AND payload LIKE '%: 1}'")
+    conn.commit()
+    conn.close()
+
+    assert core.prune_outbox(older_than_days=7) == 1
+    conn = sqlite3.connect(core.DB_PATH)
+    assert conn.execute("SELECT COUNT(*) FROM outbox").fetchone() == (3,)
+    conn.close()
@@ -0,0 +1,60 @@
+import csv
+import io
+
+import pyarrow.parquet as pq
+
+import startive_archive
+import startive_export
+
+AMOUNTS = [3.25, 10.60, 7.99, 1.50, 2.20]
+
+
+def add_history(core, user_id):
+    """Three archived transactions followed by two still in the hot table"""
+    for amount in AMOUNTS[:3]:
+        core.add_transaction(user_id, amount, 'Dining', 'coffee')
+    startive_archive.run(days=-1)
+    for amount in AMOUNTS[3:]:
+        core.add_transaction(user_id, amount, 'Shopping', 'socks')
+
+
+def test_chunks_cover_archived_then_hot_rows(core, user_id):
+    add_history(core, user_id)
+    chunks = list(startive_export.iter_chunks(user_id, 'transactions', chunk_size=2))
+    # Archived and hot rows are chunked separately, each at most chunk_size long
+    assert [len(chunk) for chunk in chunks] == [2, 1, 2]
+    rows = [row for chunk in chunks for row in chunk]
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+    assert [row[1] for row in rows] == AMOUNTS
+
+
+def test_csv_export_round_trips(core, user_id):
+    add_history(core, user_id)
+    data = startive_export.export_bytes(user_id, 'transactions', 'csv')
+    rows = list(csv.DictReader(io.StringIO(data.decode('utf-8'))))
+    assert list(rows[0]) == startive_export.column_names('transactions')
+    assert [float(row['amount']) for row in rows] == AMOUNTS
+    assert [row['category'] for row in rows] == ['Dining'] * 3 + ['Shopping'] * 2
+
+
+def test_parquet_export_round_trips(core, user_id):
+    add_history(core, user_id)
+    data = startive_export.export_bytes(user_id, 'savings', 'parquet')
+    table = pq.read_table(io.BytesIO(data))
+    assert table.column_names == startive_export.column_names('savings')
+    assert table.column('amount').to_pylist() == [core.roundup_amount(amount) for amount in AMOUNTS]
+    assert table.column('saving_date').null_count == 0
+
+
+def test_empty_table_still_has_a_header(core, user_id):
+    data = startive_export.export_bytes(user_id, 'goals', 'csv')
+    assert data.decode('utf-8').splitlines() == [','.join(startive_export.column_names('goals'))]
+
+
+def test_cli_writes_one_file_per_table(core, user_id, tmp_path, capsys):
+    add_history(core, user_id)
+    startive_export.main(['--email', 'alice@example.com', '--format', 'parquet', '--output', str(tmp_path / 'out')])
+    files = sorted(path.name for path in (tmp_path / 'out').iterdir())
+    assert files == [f"startive_{user_id}_{table}.parquet" for table in ('goals', 'savings', 'transactions')]
+    assert pq.read_table(tmp_path / 'out' / f"startive_{user_id}_transactions.parquet").num_rows == 5
+    assert f"startive_{user_id}_transactions.parquet: 5 rows" in capsys.readouterr().err
@@ -0,0 +1,115 @@
+import sqlite3
+
+import pytest
+
+import startive_archive
+import startive_shards
+
+
+def connection_file(conn):
+    try:
+        return conn.execute("PRAGMA database_list").fetchone()[2]
+    finally:
+        conn.close()
+
+
+def snapshot(core, user_ids):
+    """Each user's full history, savings total and goals as the app reads them"""
+    return {
+        user_id: (
+            [(row['id'], row['amount'], row['category']) for row in core.get_transaction_history(user_id)],
+            core.get_total_savings(user_id),
+            [goal['name'] for goal in core.get_goals(user_id)],
+        )
+        for user_id in user_ids
+    }
+
+
+def register(core, count):
+    for i in range(count):
+        core.register_user(f'user{i}', f'user{i}@example.com', 'pw')
+    return [core.authenticate_user(f'user{i}@example.com', 'pw')['id'] for i in range(count)]
+
+
+def add_history(core, user_ids):
+    """Archived transactions followed by recent ones and a goal, for every user"""
+    for i, user_id in enumerate(user_ids):
+        for amount in (3.25, 10.60 + i):
+            core.add_transaction(user_id, amount, 'Dining', 'coffee')
+    startive_archive.run(days=-1)
+    for i, user_id in enumerate(user_ids):
+        core.add_transaction(user_id, 7.99 + i, 'Shopping', 'socks')
+        core.add_goal(user_id, f'goal {i}', 100.0)
+
+
+def test_shard_index_is_stable_and_spreads_users(core):
+    assert {core.shard_index(user_id, 1) for user_id in range(50)} == {0}
+    indexes = [core.shard_index(user_id, 4) for user_id in range(1, 201)]
+    assert indexes == [core.shard_index(user_id, 4) for user_id in range(1, 201)]
+    assert set(indexes) == {0, 1, 2, 3}
+    assert min(indexes.count(i) for i in range(4)) > 30
+
+
+def test_sharded_connections_route_by_user(core, monkeypatch):
+    monkeypatch.setattr(core, 'SHARD_COUNT', 4)
+    assert connection_file(core.get_connection()) == core.DB_PATH
+    for user_id in (1, 2, 3, 42):
+        expected = core.shard_path(core.shard_index(user_id))
+        assert expected.endswith(f".{core.shard_index(user_id)}-of-4.db")
+        assert connection_file(core.get_connection(user_id)) == expected
+
+
+def test_reshard_round_trip_keeps_history_totals_and_ids(core, monkeypatch):
+    user_ids = register(core, 6)
+    add_history(core, user_ids)
+    before = snapshot(core, user_ids)
+
+    startive_shards.reshard(1, 3, purge_source=True)
+    monkeypatch.setattr(core, 'SHARD_COUNT', 3)
+    assert len({core.shard_index(user_id) for user_id in user_ids}) > 1
+    assert snapshot(core, user_ids) == before
+
+    startive_shards.reshard(3, 1, purge_source=True)
+    monkeypatch.setattr(core, 'SHARD_COUNT', 1)
+    assert snapshot(core, user_ids) == before
+
+    # New transactions continue past every id, archived ones included, and still post their round-ups
+    core.add_transaction(user_ids[0], 4.50, 'Dining', 'coffee')
+    history = core.get_transaction_history(user_ids[0])
+    all_ids = [row[0] for user in before.values() for row in user[0]]
+    assert history[-1]['id'] > max(all_ids)
+    assert core.get_total_savings(user_ids[0]) == pytest.approx(before[user_ids[0]][1] + 0.5)
+
+
+def test_merging_shards_with_overlapping_ids_moves_them_apart(core, monkeypatch):
+    # Each shard file numbers its transactions from 1, so merged ids collide unless moved
+    monkeypatch.setattr(core, 'SHARD_COUNT', 2)
+    core.init_db()
+    user_ids = register(core, 6)
+    assert {core.shard_index(user_id) for user_id in user_ids} == {0, 1}
+    add_history(core, user_ids)
+    before = snapshot(core, user_ids)
+
+    startive_shards.reshard(2, 1, purge_source=True)
+    monkeypatch.setattr(core, 'SHARD_COUNT', 1)
+    after = snapshot(core, user_ids)
+
+    ids = [row[0] for user in after.values() for row in user[0]]
+    assert len(ids) == len(set(ids))
+    for user_id in user_ids:
+        # Same rows and totals, with one shard's ids shifted by a constant
+        assert [row[1:] for row in after[user_id][0]] == [row[1:] for row in before[user_id][0]]
+        assert after[user_id][1:] == before[user_id][1:]
+        shifts = {new[0] - old[0] for new, old in zip(after[user_id][0], before[user_id][0])}
+        assert len(shifts) == 1
+
+    # Archived savings still point at their (moved) transactions
+    conn = sqlite3.connect(core.DB_PATH)
+    keys = [row[0] for row in conn.execute("SELECT posting_key FROM savings")]
+    conn.close()
+    archived_keys = [row['posting_key'] for user_id in user_ids for row in core.iter_archived_rows(user_id, 'savings')]
+    posted = {int(key.split(':')[1]) for key in keys + archived_keys}
+    assert posted <= set(ids)
+
+    core.add_transaction(user_ids[0], 4.50, 'Dining', 'coffee')
+    assert core.get_transaction_history(user_ids[0])[-1]['id'] > max(ids)